@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..core.settings import BAR_CACHE_ROOT
+
+logger = logging.getLogger(__name__)
+
+BAR_CACHE_VERSION = 1
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Source files hold 5-minute bars; the others are resampled from them.
+BASE_TIMEFRAME = "5m"
+TIMEFRAME_SECONDS = {"5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+
+# Fixed-size header: magic, format version, row count. Columns follow as
+# contiguous little-endian blocks: int64 epoch seconds, then float64 OHLCV.
+_MAGIC = b"XUABARS1"
+_HEADER = np.dtype([("magic", "S8"), ("version", "<u8"), ("rows", "<u8"), ("reserved", "<u8")])
+_TIMESTAMP_DTYPE = np.dtype("<i8")
+_PRICE_DTYPE = np.dtype("<f8")
+_HASH_CHUNK_BYTES = 1 << 20
+
+# Backtrader stores datetimes as days since 0001-01-01 (ordinal 1 == day 1.0).
+_EPOCH_ORDINAL = 719163.0
+_SECONDS_PER_DAY = 86400.0
+
+
+@dataclass(frozen=True)
+class BarSet:
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def slice(self, start: int, stop: int) -> "BarSet":
+        return BarSet(
+            timestamps=self.timestamps[start:stop],
+            open=self.open[start:stop],
+            high=self.high[start:stop],
+            low=self.low[start:stop],
+            close=self.close[start:stop],
+            volume=self.volume[start:stop],
+        )
+
+    def bounds(self, fromdate: datetime | None, todate: datetime | None) -> tuple[int, int]:
+        """Return the ``[start, stop)`` row range inside ``[fromdate, todate]``.
+
+        Matches the ``fromdate``/``todate`` semantics of Backtrader feeds:
+        bars strictly before ``fromdate`` and strictly after ``todate`` are
+        dropped.
+        """
+        start = 0
+        stop = len(self)
+        if fromdate is not None:
+            start = int(np.searchsorted(self.timestamps, to_epoch(fromdate), side="left"))
+        if todate is not None:
+            stop = int(np.searchsorted(self.timestamps, to_epoch(todate), side="right"))
+        return start, max(start, stop)
+
+    def between(self, fromdate: datetime | None, todate: datetime | None) -> "BarSet":
+        return self.slice(*self.bounds(fromdate, todate))
+
+    def bt_datetimes(self) -> np.ndarray:
+        return self.timestamps / _SECONDS_PER_DAY + _EPOCH_ORDINAL
+
+
+def to_epoch(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def cache_path_for(source: Path, cache_root: Path = BAR_CACHE_ROOT, timeframe: str = BASE_TIMEFRAME) -> Path:
+    resolved = source.resolve()
+    stat = resolved.stat()
+    path_digest = hashlib.sha1(str(resolved).encode("utf-8")).hexdigest()[:12]
+    # Resampled entries get their own prefix so rebuilding one timeframe
+    # never removes another's file.
+    key = path_digest if timeframe == BASE_TIMEFRAME else f"{path_digest}@{timeframe}"
+    return cache_root / f"{resolved.stem}-{key}-{stat.st_size}-{stat.st_mtime_ns}.bars"
+
+
+def parse_csv_bars(source: Path) -> BarSet:
+    """Parse a ``Date,Time,Open,High,Low,Close,Volume`` CSV into columns.
+
+    The layout is the one ``GenericCSVData`` was configured with before the
+    cache existed: ``%Y%m%d`` dates, ``%H:%M:%S`` times and a header row.
+    """
+    with source.open("r", newline="") as handle:
+        reader = csv.reader(handle)
+        next(reader, None)
+        return _parse_rows(reader)
+
+
+def _parse_rows(rows: Iterable[list[str]]) -> BarSet:
+    timestamps: list[int] = []
+    columns: list[list[float]] = [[] for _ in PRICE_COLUMNS]
+    day_offsets: dict[str, int] = {}
+
+    for row in rows:
+        if len(row) < 7:
+            continue
+
+        day = row[0].strip()
+        day_offset = day_offsets.get(day)
+        if day_offset is None:
+            ordinal = date(int(day[0:4]), int(day[4:6]), int(day[6:8])).toordinal()
+            day_offset = (ordinal - int(_EPOCH_ORDINAL)) * 86400
+            day_offsets[day] = day_offset
+
+        hours, minutes, seconds = row[1].strip().split(":")
+        timestamps.append(day_offset + int(hours) * 3600 + int(minutes) * 60 + int(seconds))
+        for column, raw in zip(columns, row[2:7]):
+            column.append(_parse_float(raw))
+
+    return BarSet(
+        np.asarray(timestamps, dtype=_TIMESTAMP_DTYPE),
+        *(np.asarray(column, dtype=_PRICE_DTYPE) for column in columns),
+    )
+
+
+def concat_bars(head: BarSet, tail: BarSet) -> BarSet:
+    return BarSet(
+        *(
+            np.concatenate((np.asarray(getattr(head, name)), np.asarray(getattr(tail, name))))
+            for name in ("timestamps",) + PRICE_COLUMNS
+        )
+    )
+
+
+def resample_bars(bars: BarSet, seconds: int) -> BarSet:
+    """Aggregate bars into ``seconds``-long buckets aligned to the UTC epoch.
+
+    Each bucket is stamped with its start time, like the source bars. Empty
+    buckets (weekends, session gaps) produce no bar; NaN prices are skipped.
+    """
+    if len(bars) == 0:
+        return bars
+    buckets = np.asarray(bars.timestamps) // seconds * seconds
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(bars)])) - 1
+    return BarSet(
+        timestamps=np.ascontiguousarray(buckets[starts], dtype=_TIMESTAMP_DTYPE),
+        open=np.asarray(bars.open)[starts],
+        high=np.fmax.reduceat(np.asarray(bars.high), starts),
+        low=np.fmin.reduceat(np.asarray(bars.low), starts),
+        close=np.asarray(bars.close)[ends],
+        volume=np.add.reduceat(np.nan_to_num(np.asarray(bars.volume)), starts),
+    )
+
+
+def _parse_float(raw: str) -> float:
+    try:
+        return float(raw)
+    except ValueError:
+        return math.nan
+
+
+def write_bar_file(path: Path, bars: BarSet) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    header = np.zeros(1, dtype=_HEADER)
+    header["magic"] = _MAGIC
+    header["version"] = BAR_CACHE_VERSION
+    header["rows"] = len(bars)
+
+    with tmp_path.open("wb") as handle:
+        header.tofile(handle)
+        np.ascontiguousarray(bars.timestamps, dtype=_TIMESTAMP_DTYPE).tofile(handle)
+        for name in PRICE_COLUMNS:
+            np.ascontiguousarray(getattr(bars, name), dtype=_PRICE_DTYPE).tofile(handle)
+    os.replace(tmp_path, path)
+
+
+def read_bar_file(path: Path) -> BarSet:
+    header = np.fromfile(path, dtype=_HEADER, count=1)
+    if header.shape[0] != 1 or header["magic"][0] != _MAGIC or int(header["version"][0]) != BAR_CACHE_VERSION:
+        raise ValueError(f"Unrecognised bar cache file: {path}")
+
+    rows = int(header["rows"][0])
+    if rows == 0:
+        empty = np.empty(0, dtype=_PRICE_DTYPE)
+        return BarSet(np.empty(0, dtype=_TIMESTAMP_DTYPE), *(empty for _ in PRICE_COLUMNS))
+
+    offset = _HEADER.itemsize
+    timestamps = np.memmap(path, dtype=_TIMESTAMP_DTYPE, mode="r", offset=offset, shape=(rows,))
+    offset += rows * _TIMESTAMP_DTYPE.itemsize
+    prices = []
+    for _ in PRICE_COLUMNS:
+        prices.append(np.memmap(path, dtype=_PRICE_DTYPE, mode="r", offset=offset, shape=(rows,)))
+        offset += rows * _PRICE_DTYPE.itemsize
+    return BarSet(timestamps, *prices)
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+
+def _generation(path: Path) -> str:
+    """The ``<size>-<mtime>`` of the source version a cache entry was built from."""
+    return "-".join(path.name[: -len(".bars")].rsplit("-", 2)[1:])
+
+
+def write_cache_meta(path: Path, meta: dict[str, Any]) -> None:
+    """Sidecar of a cache entry: how it was built and which rows carried over.
+
+    ``extends`` names the previous source version when the entry was built by
+    appending to it, and ``stable_rows`` how many leading rows are unchanged
+    from that version's entry (derived caches recompute from there).
+    """
+    tmp_path = path.with_name(f"{path.name}.meta.tmp-{os.getpid()}")
+    tmp_path.write_text(json.dumps(meta))
+    os.replace(tmp_path, _meta_path(path))
+
+
+def read_cache_meta(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(_meta_path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def cache_meta(source: Path, cache_root: Path = BAR_CACHE_ROOT, timeframe: str = BASE_TIMEFRAME) -> dict | None:
+    return read_cache_meta(cache_path_for(source, cache_root, timeframe))
+
+
+def _remove_stale_entries(path: Path) -> None:
+    # Rebuilding the 5-minute entry also sweeps resampled entries of older
+    # source versions; those of the current version share its suffix.
+    prefix, size, mtime = path.name[: -len(".bars")].rsplit("-", 2)
+    for stale in path.parent.glob(f"{prefix}[-@]*.bars"):
+        if stale.name.endswith(f"-{size}-{mtime}.bars"):
+            continue
+        try:
+            stale.unlink()
+            _meta_path(stale).unlink(missing_ok=True)
+        except OSError:
+            # Still mapped by another process (Windows); retried next rebuild.
+            pass
+
+
+def _previous_entry(cache_path: Path) -> tuple[Path, dict] | None:
+    """Newest other 5-minute entry of the same source that can be appended to."""
+    prefix = cache_path.name[: -len(".bars")].rsplit("-", 2)[0]
+    candidates = sorted(
+        (path for path in cache_path.parent.glob(f"{prefix}-*.bars") if path != cache_path),
+        key=lambda path: path.stat().st_mtime_ns,
+        reverse=True,
+    )
+    for path in candidates:
+        meta = read_cache_meta(path)
+        if meta is not None and "sha1" in meta:
+            return path, meta
+    return None
+
+
+def _append_to_previous(source: Path, previous: Path, meta: dict) -> tuple[BarSet, dict] | None:
+    """Parse only rows appended since ``previous`` was built.
+
+    The first ``source_bytes`` of the file must hash to the recorded SHA-1
+    and end on a line break, and the new rows must come after the old ones;
+    otherwise ``None`` asks for a full rebuild.
+    """
+    prefix_bytes = int(meta["source_bytes"])
+    digest = hashlib.sha1()
+    with source.open("rb") as handle:
+        remaining = prefix_bytes
+        last_byte = b""
+        while remaining:
+            chunk = handle.read(min(_HASH_CHUNK_BYTES, remaining))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+            last_byte = chunk[-1:]
+        if digest.hexdigest() != meta["sha1"] or last_byte != b"\n":
+            return None
+        tail = handle.read()
+
+    digest.update(tail)
+    appended = _parse_rows(csv.reader(io.StringIO(tail.decode("utf-8"), newline="")))
+    old = read_bar_file(previous)
+    if len(appended) and len(old) and appended.timestamps[0] <= old.timestamps[-1]:
+        return None
+
+    bars = concat_bars(old, appended)
+    return bars, {
+        "source_bytes": prefix_bytes + len(tail),
+        "sha1": digest.hexdigest(),
+        "rows": len(bars),
+        "extends": _generation(previous),
+        "stable_rows": len(old),
+    }
+
+
+def _ingest_source(source: Path, cache_path: Path) -> tuple[BarSet, dict]:
+    previous = _previous_entry(cache_path)
+    if previous is not None:
+        appended = _append_to_previous(source, *previous)
+        if appended is not None:
+            return appended
+        logger.info("%s changed before its last cached row; rebuilding the bar cache", source)
+
+    bars = parse_csv_bars(source)
+    digest = hashlib.sha1()
+    size = 0
+    with source.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return bars, {"source_bytes": size, "sha1": digest.hexdigest(), "rows": len(bars), "extends": None, "stable_rows": 0}
+
+
+def _extend_resampled(cache_path: Path, bars: BarSet, extends: str) -> None:
+    """Carry the previous version's resampled entries over to the appended bars.
+
+    Only the last bucket of each old entry can have gained bars, so it is
+    dropped and everything from its start is resampled again.
+    """
+    prefix = cache_path.name[: -len(".bars")].rsplit("-", 2)[0]
+    generation = _generation(cache_path)
+    for timeframe, seconds in TIMEFRAME_SECONDS.items():
+        previous = cache_path.with_name(f"{prefix}@{timeframe}-{extends}.bars")
+        if timeframe == BASE_TIMEFRAME or not previous.exists():
+            continue
+        old = read_bar_file(previous)
+        stable = max(len(old) - 1, 0)
+        start = int(np.searchsorted(bars.timestamps, old.timestamps[stable])) if len(old) else 0
+        resampled = concat_bars(old.slice(0, stable), resample_bars(bars.slice(start, len(bars)), seconds))
+        path = cache_path.with_name(f"{prefix}@{timeframe}-{generation}.bars")
+        try:
+            write_bar_file(path, resampled)
+            write_cache_meta(path, {"rows": len(resampled), "extends": extends, "stable_rows": stable})
+        except OSError as exc:
+            logger.warning("Unable to write bar cache %s: %s", path, exc)
+
+
+@lru_cache(maxsize=8)
+def _open_cached(cache_path: str) -> BarSet:
+    return read_bar_file(Path(cache_path))
+
+
+def load_bars(source: Path, cache_root: Path = BAR_CACHE_ROOT, timeframe: str = BASE_TIMEFRAME) -> BarSet:
+    """Return the bars of ``source``, converting the CSV into the cache once.
+
+    Cache entries are named after the resolved path, size and mtime of the
+    source, so an edited file gets a fresh entry and old ones are dropped.
+    When the file only had rows appended, just the new tail is parsed onto
+    the previous entry (and its resampled entries). Within a process the
+    memory-mapped columns are reused across runs. Other timeframes are
+    resampled from the 5-minute entry into their own cache files.
+    """
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    cache_path = cache_path_for(source, cache_root, timeframe)
+    if not cache_path.exists():
+        if timeframe == BASE_TIMEFRAME:
+            bars, meta = _ingest_source(source, cache_path)
+        else:
+            bars = resample_bars(load_bars(source, cache_root), TIMEFRAME_SECONDS[timeframe])
+            meta = {"rows": len(bars), "extends": None, "stable_rows": 0}
+        try:
+            write_bar_file(cache_path, bars)
+            write_cache_meta(cache_path, meta)
+        except OSError as exc:
+            logger.warning("Unable to write bar cache %s: %s", cache_path, exc)
+            return bars
+        if meta["extends"] is not None:
+            _extend_resampled(cache_path, bars, meta["extends"])
+        _remove_stale_entries(cache_path)
+        logger.info(
+            "Built bar cache %s (%d bars, %d reused)", cache_path, len(bars), meta["stable_rows"]
+        )
+
+    return _open_cached(str(cache_path))
@@ -1,59 +1,109 @@
 from __future__ import annotations
 
-from datetime import datetime
-from pathlib import Path
+from functools import lru_cache
 
 import backtrader as bt
+import numpy as np
 
-from ..core.settings import DEFAULT_DATA_FILE, ORIGINAL_DATA_ROOT
+from .bar_cache import BASE_TIMEFRAME, BarSet, load_bars
+from .data_paths import parse_date, resolve_data_file
+from .indicator_store import IndicatorSpec, load_indicators
 
 
-def parse_date(value: str | None) -> datetime | None:
-    if not value:
-        return None
-    return datetime.strptime(value, "%Y-%m-%d")
+class ArrayBarFeed(bt.feed.DataBase):
+    """Backtrader feed replaying pre-parsed columnar bars.
 
+    ``indicators`` maps extra line names (declared by ``indicator_feed_class``)
+    to series aligned with ``bars``.
+    """
 
-def resolve_data_file(data_file: str | None) -> Path:
-    if not data_file:
-        return DEFAULT_DATA_FILE
+    params = (("bars", None), ("indicators", None))
 
-    candidate = Path(data_file)
-    if candidate.is_absolute():
-        return candidate
+    def start(self) -> None:
+        super().start()
+        bars: BarSet = self.p.bars
+        indicators: dict[str, np.ndarray] = self.p.indicators or {}
+        self._rows = list(
+            zip(
+                bars.bt_datetimes().tolist(),
+                bars.open.tolist(),
+                bars.high.tolist(),
+                bars.low.tolist(),
+                bars.close.tolist(),
+                bars.volume.tolist(),
+            )
+        )
+        self._extra_lines = [getattr(self.lines, name) for name in indicators]
+        self._extra_rows = list(zip(*(np.asarray(values).tolist() for values in indicators.values())))
+        self._cursor = 0
 
-    in_original_data = ORIGINAL_DATA_ROOT / data_file
-    if in_original_data.exists():
-        return in_original_data
+    def _load(self) -> bool:
+        if self._cursor >= len(self._rows):
+            return False
 
-    return candidate
+        dt, open_, high, low, close, volume = self._rows[self._cursor]
+        lines = self.lines
+        lines.datetime[0] = dt
+        lines.open[0] = open_
+        lines.high[0] = high
+        lines.low[0] = low
+        lines.close[0] = close
+        lines.volume[0] = volume
+        lines.openinterest[0] = 0.0
+        if self._extra_lines:
+            for line, value in zip(self._extra_lines, self._extra_rows[self._cursor]):
+                line[0] = value
+        self._cursor += 1
+        return True
 
 
-def load_feed(data_file: str | None, start_date: str | None, end_date: str | None) -> bt.feeds.GenericCSVData:
+# Backtrader (timeframe, compression) of each supported bar size.
+BACKTRADER_TIMEFRAMES = {
+    "5m": (bt.TimeFrame.Minutes, 5),
+    "15m": (bt.TimeFrame.Minutes, 15),
+    "1h": (bt.TimeFrame.Minutes, 60),
+    "4h": (bt.TimeFrame.Minutes, 240),
+    "1d": (bt.TimeFrame.Days, 1),
+}
+
+
+@lru_cache(maxsize=None)
+def indicator_feed_class(line_names: tuple[str, ...]) -> type[ArrayBarFeed]:
+    """``ArrayBarFeed`` subclass exposing ``line_names`` as extra data lines."""
+    if not line_names:
+        return ArrayBarFeed
+    return type("IndicatorBarFeed", (ArrayBarFeed,), {"lines": line_names})
+
+
+def load_feed(
+    data_file: str | None,
+    start_date: str | None,
+    end_date: str | None,
+    indicators: dict[str, IndicatorSpec] | None = None,
+    limit_bars: int = 0,
+    timeframe: str = BASE_TIMEFRAME,
+) -> ArrayBarFeed:
+    """Build the feed for a run; ``indicators`` adds precomputed series as data lines.
+
+    ``limit_bars > 0`` keeps only the first that many bars of the date range.
+    ``timeframe`` reads the cached resampled bars instead of the 5-minute ones.
+    Indicator lines are slices of the full-file series (see ``load_indicator``).
+    """
     resolved = resolve_data_file(data_file)
     if not resolved.exists():
         raise FileNotFoundError(f"Data file not found: {resolved}")
 
-    feed_kwargs = {
-        "dataname": str(resolved),
-        "dtformat": "%Y%m%d",
-        "tmformat": "%H:%M:%S",
-        "datetime": 0,
-        "time": 1,
-        "open": 2,
-        "high": 3,
-        "low": 4,
-        "close": 5,
-        "volume": 6,
-        "timeframe": bt.TimeFrame.Minutes,
-        "compression": 5,
-    }
-
-    fromdate = parse_date(start_date)
-    todate = parse_date(end_date)
-    if fromdate:
-        feed_kwargs["fromdate"] = fromdate
-    if todate:
-        feed_kwargs["todate"] = todate
-
-    return bt.feeds.GenericCSVData(**feed_kwargs)
+    all_bars = load_bars(resolved, timeframe=timeframe)
+    start, stop = all_bars.bounds(parse_date(start_date), parse_date(end_date))
+    if limit_bars > 0:
+        stop = min(stop, start + limit_bars)
+    series = {name: values[start:stop] for name, values in load_indicators(resolved, indicators or {}, timeframe).items()}
+    feed_class = indicator_feed_class(tuple(series))
+    bt_timeframe, compression = BACKTRADER_TIMEFRAMES[timeframe]
+    return feed_class(
+        bars=all_bars.slice(start, stop),
+        indicators=series,
+        name=resolved.stem,
+        timeframe=bt_timeframe,
+        compression=compression,
+    )
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+from ..core.settings import DEFAULT_DATA_FILE, ORIGINAL_DATA_ROOT
+
+
+def parse_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def resolve_data_file(data_file: str | None) -> Path:
+    if not data_file:
+        return DEFAULT_DATA_FILE
+
+    candidate = Path(data_file)
+    if candidate.is_absolute():
+        return candidate
+
+    in_original_data = ORIGINAL_DATA_ROOT / data_file
+    if in_original_data.exists():
+        return in_original_data
+
+    return candidate
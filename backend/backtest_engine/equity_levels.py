@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+# Zoom levels precomputed at save time, in points. The full-resolution curve
+# is always stored as the last level.
+EQUITY_LEVEL_POINTS = (500, 2000, 8000, 32000)
+
+
+def to_epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def parse_timestamp_ms(value: str) -> int:
+    return to_epoch_ms(datetime.fromisoformat(value))
+
+
+def format_timestamp_ms(value: int) -> str:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def equity_curve_to_arrays(equity_curve: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    timestamps = np.fromiter(
+        (parse_timestamp_ms(point["timestamp"]) for point in equity_curve),
+        dtype=np.int64,
+        count=len(equity_curve),
+    )
+    values = np.fromiter((point["value"] for point in equity_curve), dtype=np.float64, count=len(equity_curve))
+    return timestamps, values
+
+
+def level_arrays(level: dict[str, list]) -> tuple[np.ndarray, np.ndarray]:
+    return np.asarray(level["t"], dtype=np.int64), np.asarray(level["v"], dtype=np.float64)
+
+
+def equity_arrays(equity_curve: dict[str, list] | list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    """Arrays of a stored equity curve, columnar (``{"t", "v"}``) or one dict per point."""
+    if isinstance(equity_curve, dict):
+        return level_arrays(equity_curve)
+    return equity_curve_to_arrays(equity_curve)
+
+
+def equity_columns(equity_curve: dict[str, list] | list[dict[str, Any]]) -> dict[str, Any]:
+    """Columnar ``{"t": [epoch ms], "v": [value]}`` form of a stored equity curve."""
+    if isinstance(equity_curve, dict):
+        return {"t": equity_curve["t"], "v": equity_curve["v"]}
+    timestamps, values = equity_curve_to_arrays(equity_curve)
+    return {"t": timestamps, "v": values}
+
+
+def equity_rows(equity_curve: dict[str, list] | list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """One ``{"timestamp", "value"}`` dict per point, the default API form."""
+    if isinstance(equity_curve, dict):
+        return arrays_to_equity_curve(*level_arrays(equity_curve))
+    return equity_curve
+
+
+def arrays_to_equity_curve(timestamps: np.ndarray, values: np.ndarray) -> list[dict[str, Any]]:
+    return [
+        {"timestamp": format_timestamp_ms(ts), "value": value}
+        for ts, value in zip(timestamps.tolist(), values.tolist())
+    ]
+
+
+def minmax_downsample(timestamps: np.ndarray, values: np.ndarray, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a curve to at most ``points`` samples, keeping its extremes.
+
+    The series is cut into equal-count buckets and each bucket keeps both its
+    lowest and highest sample, in time order, so drawdown troughs and equity
+    peaks survive any amount of zooming out. First and last points are kept.
+    """
+    n = int(timestamps.shape[0])
+    if n <= points or points < 4:
+        return timestamps, values
+
+    buckets = (points - 2) // 2
+    bucket_ids = (np.arange(n, dtype=np.int64) * buckets) // n
+    order = np.lexsort((values, bucket_ids))
+    sorted_buckets = bucket_ids[order]
+    bucket_starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    bucket_ends = np.r_[bucket_starts[1:], n] - 1
+
+    keep = np.unique(np.concatenate(([0, n - 1], order[bucket_starts], order[bucket_ends])))
+    return timestamps[keep], values[keep]
+
+
+def build_equity_levels(equity_curve: dict[str, list] | list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Precompute the stored zoom levels for an equity curve in either stored form.
+
+    Each level is ``{"points", "start_ms", "end_ms", "t", "v"}`` where ``t``
+    holds epoch milliseconds and ``v`` the matching portfolio values, as
+    NumPy arrays.
+    """
+    if not equity_curve:
+        return []
+    return build_equity_levels_from_arrays(*equity_arrays(equity_curve))
+
+
+def build_equity_levels_from_arrays(timestamps: np.ndarray, values: np.ndarray) -> list[dict[str, Any]]:
+    if timestamps.shape[0] == 0:
+        return []
+
+    start_ms = int(timestamps[0])
+    end_ms = int(timestamps[-1])
+    levels = []
+    for target in EQUITY_LEVEL_POINTS:
+        if target >= timestamps.shape[0]:
+            break
+        level_t, level_v = minmax_downsample(timestamps, values, target)
+        levels.append({"points": target, "start_ms": start_ms, "end_ms": end_ms, "t": level_t, "v": level_v})
+    levels.append(
+        {"points": int(timestamps.shape[0]), "start_ms": start_ms, "end_ms": end_ms, "t": timestamps, "v": values}
+    )
+    return levels
+
+
+def choose_level(
+    levels: list[dict[str, Any]],
+    points: int,
+    from_ms: int | None,
+    to_ms: int | None,
+) -> int | None:
+    """Pick the coarsest stored level that still yields ``points`` in range.
+
+    ``levels`` only needs ``points``, ``start_ms`` and ``end_ms``; bars are
+    evenly spaced, so the share of a level falling inside the requested range
+    is proportional to the share of time it covers.
+    """
+    if not levels:
+        return None
+
+    ordered = sorted(levels, key=lambda level: level["points"])
+    start_ms = ordered[-1]["start_ms"]
+    end_ms = ordered[-1]["end_ms"]
+    span = max(end_ms - start_ms, 1)
+    range_start = max(from_ms if from_ms is not None else start_ms, start_ms)
+    range_end = min(to_ms if to_ms is not None else end_ms, end_ms)
+    fraction = max(range_end - range_start, 0) / span
+
+    for level in ordered:
+        if level["points"] * fraction >= points:
+            return level["points"]
+    return ordered[-1]["points"]
+
+
+def slice_level(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    from_ms: int | None,
+    to_ms: int | None,
+    points: int | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    start = 0 if from_ms is None else int(np.searchsorted(timestamps, from_ms, side="left"))
+    stop = timestamps.shape[0] if to_ms is None else int(np.searchsorted(timestamps, to_ms, side="right"))
+    timestamps, values = timestamps[start:stop], values[start:stop]
+    if points is not None:
+        timestamps, values = minmax_downsample(timestamps, values, points)
+    return timestamps, values
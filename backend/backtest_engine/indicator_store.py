@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ..core.settings import BAR_CACHE_ROOT, INDICATOR_CACHE_ROOT
+from .bar_cache import BASE_TIMEFRAME, TIMEFRAME_SECONDS, BarSet, cache_meta, cache_path_for, load_bars
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_CACHE_VERSION = 1
+
+# Strategy params that size an EMA of the close (``ema_<name>_length``) or
+# the ATR; the angle filter scale is any ``*angle_scale_factor`` param.
+_EMA_PARAM = re.compile(r"ema_(\w+?)_(?:length|period)")
+_ATR_PARAMS = ("atr_length", "atr_period")
+_ANGLE_SCALE_SUFFIX = "angle_scale_factor"
+_ANGLE_SOURCES = ("ema_confirm", "ema_fast")
+
+# Largest block for the vectorized smoothing recurrence.
+_MAX_BLOCK = 512
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """One precomputable series: ``kind`` is ``ema``, ``atr`` or ``angle``."""
+
+    kind: str
+    period: int
+    scale: float = 0.0
+
+    @property
+    def key(self) -> str:
+        suffix = f"-{self.scale:g}" if self.kind == "angle" else ""
+        return f"{self.kind}-{self.period}{suffix}"
+
+
+def strategy_indicator_specs(strategy_kwargs: dict) -> dict[str, IndicatorSpec]:
+    """Map data-line names to the indicator series a strategy's params imply.
+
+    ``ema_fast_length=5`` yields an ``ema_fast`` line, ``atr_length=10`` an
+    ``atr`` line, and an ``*angle_scale_factor`` param an ``angle`` line: the
+    slope of the confirm (or fast) EMA in degrees, ``atan(delta * scale)``.
+    """
+    specs: dict[str, IndicatorSpec] = {}
+    for name, value in sorted(strategy_kwargs.items()):
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            continue
+        match = _EMA_PARAM.fullmatch(name)
+        if match:
+            specs[f"ema_{match.group(1)}"] = IndicatorSpec("ema", value)
+        elif name in _ATR_PARAMS:
+            specs["atr"] = IndicatorSpec("atr", value)
+
+    scale = next(
+        (value for name, value in sorted(strategy_kwargs.items()) if name.endswith(_ANGLE_SCALE_SUFFIX)),
+        None,
+    )
+    source = next((specs[name] for name in _ANGLE_SOURCES if name in specs), None)
+    if isinstance(scale, (int, float)) and not isinstance(scale, bool) and source is not None:
+        specs["angle"] = IndicatorSpec("angle", source.period, float(scale))
+    return specs
+
+
+def _smooth(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """Solve ``y[t] = (1 - alpha) * y[t - 1] + alpha * x[t]`` from ``y[-1] = initial``.
+
+    The recurrence is evaluated in fixed-size blocks: within a block it is a
+    scaled cumulative sum over a 2-D array, and only the last value of each
+    block is carried into the next one.
+    """
+    n = int(values.shape[0])
+    decay = 1.0 - alpha
+    if n == 0 or decay <= 0.0:
+        return np.array(values, dtype=np.float64)
+
+    # Keep decay ** -block well inside float64 range.
+    block = int(min(_MAX_BLOCK, max(1, 250 // -math.log10(decay))))
+    rows = -(-n // block)
+    padded = np.zeros(rows * block, dtype=np.float64)
+    padded[:n] = values * alpha
+    powers = decay ** np.arange(block, dtype=np.float64)
+    local = np.cumsum(padded.reshape(rows, block) / powers, axis=1) * powers
+
+    carry_weights = powers * decay
+    previous = initial
+    for row in local:
+        row += carry_weights * previous
+        previous = row[-1]
+    return local.ravel()[:n]
+
+
+def exponential_moving_average(close: np.ndarray, period: int) -> np.ndarray:
+    """Backtrader's EMA: seeded with the simple mean of the first ``period`` values."""
+    out = np.full(close.shape[0], np.nan)
+    if close.shape[0] < period:
+        return out
+    seed = float(np.mean(close[:period]))
+    out[period - 1] = seed
+    out[period:] = _smooth(close[period:], 2.0 / (period + 1.0), seed)
+    return out
+
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Backtrader's ATR: Wilder smoothing of the true range, seeded with its mean."""
+    out = np.full(close.shape[0], np.nan)
+    if close.shape[0] <= period:
+        return out
+    prev_close = close[:-1]
+    true_range = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+    seed = float(np.mean(true_range[:period]))
+    out[period] = seed
+    out[period + 1 :] = _smooth(true_range[period:], 1.0 / period, seed)
+    return out
+
+
+def ema_angle(ema: np.ndarray, scale: float) -> np.ndarray:
+    out = np.full(ema.shape[0], np.nan)
+    out[1:] = np.degrees(np.arctan((ema[1:] - ema[:-1]) * scale))
+    return out
+
+
+def compute_indicator(bars: BarSet, spec: IndicatorSpec) -> np.ndarray:
+    close = np.asarray(bars.close, dtype=np.float64)
+    if spec.kind == "ema":
+        return exponential_moving_average(close, spec.period)
+    if spec.kind == "atr":
+        return average_true_range(
+            np.asarray(bars.high, dtype=np.float64), np.asarray(bars.low, dtype=np.float64), close, spec.period
+        )
+    if spec.kind == "angle":
+        return ema_angle(exponential_moving_average(close, spec.period), spec.scale)
+    raise ValueError(f"Unknown indicator kind: {spec.kind}")
+
+
+def indicator_dir_for(
+    source: Path,
+    bar_cache_root: Path = BAR_CACHE_ROOT,
+    cache_root: Path = INDICATOR_CACHE_ROOT,
+    timeframe: str = BASE_TIMEFRAME,
+) -> Path:
+    # Named after the bar cache entry, so it is invalidated together with it.
+    return cache_root / f"{cache_path_for(source, bar_cache_root, timeframe).stem}-v{INDICATOR_CACHE_VERSION}"
+
+
+def extend_indicator(bars: BarSet, spec: IndicatorSpec, previous: np.ndarray, stable: int) -> np.ndarray:
+    """``spec`` over ``bars`` when its first ``stable`` values are ``previous[:stable]``.
+
+    EMA and ATR continue their smoothing from the last stable value; the
+    angle series (and anything still in its warm-up) is computed again.
+    """
+    close = np.asarray(bars.close, dtype=np.float64)
+    out = np.full(close.shape[0], np.nan)
+    out[:stable] = previous[:stable]
+    if spec.kind == "ema" and stable >= spec.period:
+        out[stable:] = _smooth(close[stable:], 2.0 / (spec.period + 1.0), float(previous[stable - 1]))
+    elif spec.kind == "atr" and stable >= spec.period + 1:
+        high = np.asarray(bars.high[stable:], dtype=np.float64)
+        low = np.asarray(bars.low[stable:], dtype=np.float64)
+        prev_close = close[stable - 1 : -1]
+        true_range = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+        out[stable:] = _smooth(true_range, 1.0 / spec.period, float(previous[stable - 1]))
+    else:
+        return compute_indicator(bars, spec)
+    return out
+
+
+def _parse_key(key: str) -> IndicatorSpec | None:
+    kind, _, rest = key.partition("-")
+    period, _, scale = rest.partition("-")
+    if kind not in ("ema", "atr", "angle"):
+        return None
+    try:
+        return IndicatorSpec(kind, int(period), float(scale) if kind == "angle" else 0.0)
+    except ValueError:
+        return None
+
+
+def _carry_over(source: Path, cache_root: Path, bar_cache_root: Path = BAR_CACHE_ROOT) -> None:
+    """Extend the previous source version's series when its bars were appended to.
+
+    Runs for every timeframe at once, since creating one new directory sweeps
+    the old directories of all of them.
+    """
+    for timeframe in TIMEFRAME_SECONDS:
+        meta = cache_meta(source, bar_cache_root, timeframe)
+        if not meta or not meta.get("extends"):
+            continue
+        directory = indicator_dir_for(source, bar_cache_root, cache_root, timeframe)
+        prefix = directory.name.rsplit("-", 3)[0]
+        previous_dir = directory.with_name(f"{prefix}-{meta['extends']}-v{INDICATOR_CACHE_VERSION}")
+        if not previous_dir.is_dir():
+            continue
+
+        bars = load_bars(source, bar_cache_root, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        for previous_path in previous_dir.glob("*.npy"):
+            spec = _parse_key(previous_path.stem)
+            path = directory / previous_path.name
+            if ".tmp-" in previous_path.name or spec is None or path.exists():
+                continue
+            values = extend_indicator(bars, spec, np.load(previous_path, mmap_mode="r"), int(meta["stable_rows"]))
+            tmp_path = directory / f"{spec.key}.tmp-{os.getpid()}.npy"
+            np.save(tmp_path, values)
+            os.replace(tmp_path, path)
+
+
+def _remove_stale_dirs(directory: Path) -> None:
+    prefix, *current = directory.name.rsplit("-", 3)
+    for stale in directory.parent.glob(f"{prefix}[-@]*"):
+        if not stale.name.endswith("-" + "-".join(current)) and stale.is_dir():
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def load_indicator(
+    source: Path,
+    spec: IndicatorSpec,
+    cache_root: Path = INDICATOR_CACHE_ROOT,
+    timeframe: str = BASE_TIMEFRAME,
+    bar_cache_root: Path = BAR_CACHE_ROOT,
+) -> np.ndarray:
+    """Return ``spec`` over every bar of ``source``, computing and storing it once.
+
+    Series cover the full file (aligned with ``load_bars`` at ``timeframe``)
+    and are saved as ``.npy`` files next to the bar cache, then memory-mapped.
+    Their warm-up therefore starts at the file's first bar, not at the first
+    bar of a run's date range or ``limit_bars`` slice. When the source only
+    had rows appended, the previous version's series are extended into the
+    new directory instead of being recomputed.
+    """
+    directory = indicator_dir_for(source, bar_cache_root, cache_root, timeframe)
+    path = directory / f"{spec.key}.npy"
+    if path.exists():
+        return np.load(path, mmap_mode="r")
+
+    try:
+        if not directory.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            _carry_over(source, cache_root, bar_cache_root)
+            _remove_stale_dirs(directory)
+            if path.exists():
+                return np.load(path, mmap_mode="r")
+    except OSError as exc:
+        logger.warning("Unable to write indicator cache %s: %s", directory, exc)
+
+    values = compute_indicator(load_bars(source, bar_cache_root, timeframe), spec)
+    try:
+        tmp_path = directory / f"{spec.key}.tmp-{os.getpid()}.npy"
+        np.save(tmp_path, values)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Unable to write indicator cache %s: %s", path, exc)
+        return values
+    return np.load(path, mmap_mode="r")
+
+
+def load_indicators(
+    source: Path, specs: dict[str, IndicatorSpec], timeframe: str = BASE_TIMEFRAME
+) -> dict[str, np.ndarray]:
+    return {name: load_indicator(source, spec, timeframe=timeframe) for name, spec in specs.items()}
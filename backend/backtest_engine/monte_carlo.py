@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+HISTOGRAM_BINS = 50
+
+# Upper bound on simulation-matrix cells per chunk (~32 MiB of float64), so
+# large runs stay vectorized without allocating the whole matrix at once.
+_CHUNK_CELLS = 4_000_000
+
+
+def _distribution(values: np.ndarray) -> dict[str, Any]:
+    low, high = float(values.min()), float(values.max())
+    if high - low <= 1e-9 * max(abs(low), 1.0):
+        # Shuffled paths share one final equity; give the histogram a width.
+        low, high = low - 0.5, high + 0.5
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS, range=(low, high))
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "percentiles": {str(p): float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+        "histogram": {"counts": counts.tolist(), "edges": edges.tolist()},
+    }
+
+
+def simulate_trade_paths(
+    pnls: np.ndarray,
+    initial_cash: float,
+    simulations: int,
+    method: str = "bootstrap",
+    ruin_pct: float = 50.0,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Monte Carlo over a trade PnL sequence.
+
+    Each simulation is a row of a ``simulations x trades`` matrix: trades are
+    either drawn with replacement (``bootstrap``) or reordered (``shuffle``),
+    then cumulated from ``initial_cash``. Ruin means equity touching
+    ``initial_cash * (1 - ruin_pct / 100)`` at any point of the path.
+    """
+    pnls = np.asarray(pnls, dtype=np.float64)
+    trades = int(pnls.shape[0])
+    if trades == 0:
+        raise ValueError("Backtest has no closed trades to simulate")
+
+    rng = np.random.default_rng(seed)
+    ruin_level = initial_cash * (1.0 - ruin_pct / 100.0)
+    final_equity = np.empty(simulations, dtype=np.float64)
+    max_drawdown = np.empty(simulations, dtype=np.float64)
+    ruined = np.empty(simulations, dtype=bool)
+
+    chunk = max(1, _CHUNK_CELLS // trades)
+    for start in range(0, simulations, chunk):
+        rows = min(chunk, simulations - start)
+        if method == "shuffle":
+            paths = rng.permuted(np.broadcast_to(pnls, (rows, trades)).copy(), axis=1)
+        else:
+            paths = np.take(pnls, rng.integers(0, trades, size=(rows, trades), dtype=np.int32))
+
+        np.cumsum(paths, axis=1, out=paths)
+        paths += initial_cash
+        peaks = np.maximum.accumulate(paths, axis=1)
+        np.maximum(peaks, initial_cash, out=peaks)
+
+        stop = start + rows
+        final_equity[start:stop] = paths[:, -1]
+        ruined[start:stop] = paths.min(axis=1) <= ruin_level
+        # Drawdown as 1 - equity / running peak, computed in place.
+        np.divide(paths, peaks, out=paths)
+        max_drawdown[start:stop] = (1.0 - paths.min(axis=1)) * 100.0
+
+    return {
+        "trades": trades,
+        "final_equity": _distribution(final_equity),
+        "max_drawdown_pct": _distribution(max_drawdown),
+        "risk_of_ruin_pct": float(ruined.mean() * 100.0),
+        "probability_of_loss_pct": float((final_equity < initial_cash).mean() * 100.0),
+    }
@@ -0,0 +1,262 @@
+"""Check the vectorized engine against an event-driven Backtrader run.
+
+Usage::
+
+    python -m backend.backtest_engine.parity --start 2024-01-01 --end 2024-02-01
+
+``--strategy reference`` (default) runs ``PullbackWindowReference``, a plain
+Backtrader strategy that implements the rules in ``vectorized.simulate`` with
+real stop/limit orders. ``--strategy original`` runs the configured strategy
+through the normal runner instead; that only makes sense for a strategy that
+declares ``vectorized_rules``, and others are reported as unsupported. Exits
+non-zero when the engines disagree. ``backend/tests/test_vectorized_parity.py``
+runs the same comparison under pytest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import replace
+from typing import Any
+
+import backtrader as bt
+
+from .bar_cache import TIMEFRAME_SECONDS
+from .data_loader import load_feed
+from .original_strategy import get_sunrise_ogle_class
+from .runner import _add_common_analyzers, _build_strategy_kwargs, default_backtest_config_kwargs, run_backtest
+from .vectorized import (
+    LEVERAGE,
+    RULE_DEFAULTS,
+    VECTORIZED_RULES,
+    enabled_sides,
+    rule_params,
+    run_vectorized,
+    supports_vectorized,
+)
+from ..models.backtest import BacktestConfig, ExecutionArtifacts
+
+
+class PullbackWindowReference(bt.Strategy):
+    """Event-driven implementation of the pullback-window rules."""
+
+    vectorized_rules = VECTORIZED_RULES
+    params = tuple(RULE_DEFAULTS.items())
+
+    def __init__(self) -> None:
+        self.ema_fast = bt.ind.EMA(self.data.close, period=self.p.ema_fast_length)
+        self.ema_slow = bt.ind.EMA(self.data.close, period=self.p.ema_slow_length)
+        self.atr = bt.ind.ATR(self.data, period=self.p.atr_length)
+        self.sides = {side.direction: side for side in enabled_sides(dict(self.p._getkwargs()))}
+        self.trade_reports: list[dict[str, Any]] = []
+        self._timestamps = []
+        self._portfolio_values = []
+        self._state = "idle"
+        self._direction = 0
+        self._signal_bar = 0
+        self._counter_candles = 0
+        self._window_bar = 0
+        self._window_atr = 0.0
+        self._entry_order = None
+        self._exit_orders: tuple = ()
+        self._report: dict[str, Any] | None = None
+
+    def _cross(self) -> int:
+        fast_prev, slow_prev = self.ema_fast[-1], self.ema_slow[-1]
+        fast, slow = self.ema_fast[0], self.ema_slow[0]
+        if fast_prev <= slow_prev and fast > slow:
+            return 1
+        if fast_prev >= slow_prev and fast < slow:
+            return -1
+        return 0
+
+    def next(self) -> None:
+        self._timestamps.append(self.data.datetime.datetime(0))
+        self._portfolio_values.append(self.broker.getvalue())
+        bar = len(self.data) - 1
+        cross = self._cross()
+
+        if self._state == "window":
+            if bar >= self._window_bar + self.sides[self._direction].window:
+                self.cancel(self._entry_order)
+                self._state = "idle"
+            return
+        if self._state == "armed":
+            self._advance_setup(bar, cross)
+            return
+        if self._state == "idle" and cross in self.sides:
+            self._state = "armed"
+            self._direction = cross
+            self._signal_bar = bar
+            self._counter_candles = 0
+
+    def _advance_setup(self, bar: int, cross: int) -> None:
+        d = self._direction
+        side = self.sides[d]
+        if cross == -d:
+            self._state = "idle"
+            return
+        counter = self.data.close[0] < self.data.open[0] if d > 0 else self.data.close[0] > self.data.open[0]
+        self._counter_candles = self._counter_candles + 1 if counter else 0
+        if bar < self._signal_bar + side.pullback or self._counter_candles < side.pullback:
+            return
+
+        atr = self.atr[0]
+        if not atr > 0:
+            self._state = "idle"
+            return
+        size = self.broker.getvalue() * self.p.risk_percent / (atr * side.sl_multiplier)
+        if d > 0:
+            self._entry_order = self.buy(exectype=bt.Order.Stop, price=self.data.high[0], size=size)
+        else:
+            self._entry_order = self.sell(exectype=bt.Order.Stop, price=self.data.low[0], size=size)
+        self._state = "window"
+        self._window_bar = bar
+        self._window_atr = atr
+
+    def notify_order(self, order) -> None:
+        if order.status in (order.Margin, order.Rejected) and order == self._entry_order:
+            self._state = "idle"
+            return
+        if order.status != order.Completed:
+            return
+
+        d = self._direction
+        if order == self._entry_order:
+            side = self.sides[d]
+            price = order.executed.price
+            size = abs(order.executed.size)
+            stop_price = price - d * self._window_atr * side.sl_multiplier
+            target_price = price + d * self._window_atr * side.tp_multiplier
+            exit_order = self.sell if d > 0 else self.buy
+            stop = exit_order(exectype=bt.Order.Stop, price=stop_price, size=size)
+            target = exit_order(exectype=bt.Order.Limit, price=target_price, size=size, oco=stop)
+            self._exit_orders = (stop, target)
+            self._state = "position"
+            self._report = {
+                "entry_time": bt.num2date(order.executed.dt),
+                "direction": "LONG" if d > 0 else "SHORT",
+                "entry_price": price,
+                "size": size,
+            }
+        elif order in self._exit_orders and self._report is not None:
+            price = order.executed.price
+            self._report.update(
+                exit_time=bt.num2date(order.executed.dt),
+                exit_price=price,
+                pnl=d * self._report["size"] * (price - self._report["entry_price"]),
+                exit_reason="STOP_LOSS" if order == self._exit_orders[0] else "TAKE_PROFIT",
+            )
+            self.trade_reports.append(self._report)
+            self._report = None
+            self._exit_orders = ()
+            self._state = "idle"
+
+
+def run_reference(config: BacktestConfig, strategy_kwargs: dict) -> ExecutionArtifacts:
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(load_feed(config.data_file, config.start_date, config.end_date, timeframe=config.timeframe))
+    cerebro.broker.setcash(config.initial_cash)
+    cerebro.broker.setcommission(leverage=LEVERAGE)
+    cerebro.addstrategy(PullbackWindowReference, **rule_params(strategy_kwargs))
+    _add_common_analyzers(cerebro, use_daily_sharpe=False)
+    strategy = cerebro.run()[0]
+    return ExecutionArtifacts(
+        final_value=strategy.broker.getvalue(),
+        analyzers={
+            name: strategy.analyzers.getbyname(name).get_analysis()
+            for name in ("sharpe", "drawdown", "trades", "returns")
+        },
+        strategy_instance=strategy,
+        used_config=config,
+        used_params=strategy_kwargs,
+    )
+
+
+def _close(a: Any, b: Any, tolerance: float) -> bool:
+    if a is None or b is None:
+        return a is b
+    return abs(float(a) - float(b)) <= tolerance * max(1.0, abs(float(a)), abs(float(b)))
+
+
+def compare_engines(expected: ExecutionArtifacts, actual: ExecutionArtifacts, tolerance: float = 1e-6) -> list[str]:
+    """Describe every difference between two runs; an empty list means parity."""
+    problems = []
+    expected_trades = expected.strategy_instance.trade_reports
+    actual_trades = actual.strategy_instance.trade_reports
+    if len(expected_trades) != len(actual_trades):
+        problems.append(f"closed trades: {len(expected_trades)} != {len(actual_trades)}")
+    for index, (left, right) in enumerate(zip(expected_trades, actual_trades)):
+        for key in ("entry_time", "exit_time", "direction", "exit_reason"):
+            if left.get(key) != right.get(key):
+                problems.append(f"trade {index} {key}: {left.get(key)} != {right.get(key)}")
+        for key in ("entry_price", "exit_price", "size", "pnl"):
+            if not _close(left.get(key), right.get(key), tolerance):
+                problems.append(f"trade {index} {key}: {left.get(key)} != {right.get(key)}")
+        if len(problems) > 20:
+            break
+
+    if not _close(expected.final_value, actual.final_value, tolerance):
+        problems.append(f"final value: {expected.final_value} != {actual.final_value}")
+    expected_total = expected.analyzers["trades"].get("total", {}).get("total", 0)
+    actual_total = actual.analyzers["trades"].get("total", {}).get("total", 0)
+    if expected_total != actual_total:
+        problems.append(f"total trades: {expected_total} != {actual_total}")
+    expected_dd = expected.analyzers["drawdown"].get("max", {}).get("drawdown")
+    actual_dd = actual.analyzers["drawdown"].get("max", {}).get("drawdown")
+    if not _close(expected_dd, actual_dd, tolerance):
+        problems.append(f"max drawdown: {expected_dd} != {actual_dd}")
+    expected_sharpe = expected.analyzers["sharpe"].get("sharperatio")
+    actual_sharpe = actual.analyzers["sharpe"].get("sharperatio")
+    if not _close(expected_sharpe, actual_sharpe, tolerance):
+        problems.append(f"sharpe ratio: {expected_sharpe} != {actual_sharpe}")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-file", default=None)
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--timeframe", choices=tuple(TIMEFRAME_SECONDS), default="5m")
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--strategy", choices=("reference", "original"), default="reference")
+    args = parser.parse_args(argv)
+
+    defaults = default_backtest_config_kwargs()
+    config = BacktestConfig(
+        symbol="XAUUSD",
+        timeframe=args.timeframe,
+        start_date=args.start,
+        end_date=args.end,
+        data_file=args.data_file,
+        initial_cash=defaults["initial_cash"],
+        limit_bars=0,
+        run_dual_cerebro=False,
+        use_forex_position_calc=defaults["use_forex_position_calc"],
+    )
+    strategy_kwargs = _build_strategy_kwargs(config)
+    if args.strategy == "original" and not supports_vectorized(get_sunrise_ogle_class()):
+        name = get_sunrise_ogle_class().__name__
+        print(f"{name} does not declare vectorized_rules; the vectorized engine cannot run it")
+        return 2
+    if args.strategy == "reference":
+        expected = run_reference(config, strategy_kwargs)
+    else:
+        expected = run_backtest(replace(config, engine="backtrader"))
+    actual = run_vectorized(replace(config, engine="vectorized"), strategy_kwargs)
+
+    problems = compare_engines(expected, actual, args.tolerance)
+    print(
+        f"trades: {len(expected.strategy_instance.trade_reports)} closed, "
+        f"final value {expected.final_value:.2f} (backtrader) vs {actual.final_value:.2f} (vectorized)"
+    )
+    for problem in problems:
+        print(f"MISMATCH {problem}")
+    print("parity OK" if not problems else f"{len(problems)} mismatches")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
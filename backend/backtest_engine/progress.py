@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+import backtrader as bt
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+# Context manager factory timing a named part of a run, e.g. ``PhaseTimer.phase``.
+PhaseCallback = Callable[[str], AbstractContextManager[None]]
+
+
+def no_phase(name: str) -> AbstractContextManager[None]:
+    return nullcontext()
+
+# Bars between clock reads; keeps the per-bar overhead to a counter increment.
+_CLOCK_CHECK_BARS = 256
+
+
+class ProgressAnalyzer(bt.Analyzer):
+    """Reports run progress to ``callback`` at most every ``interval`` seconds.
+
+    The offsets and ``started`` let consecutive runs (sequential dual legs)
+    report against one combined total and clock. A final report is always
+    sent when the run stops.
+    """
+
+    params = (
+        ("callback", None),
+        ("total_bars", 0),
+        ("bar_offset", 0),
+        ("trade_offset", 0),
+        ("started", None),
+        ("interval", 1.0),
+    )
+
+    def start(self) -> None:
+        self._bars = 0
+        self._trades = 0
+        self._started = self.p.started if self.p.started is not None else time.monotonic()
+        self._last_report = time.monotonic()
+
+    def next(self) -> None:
+        self._bars += 1
+        if self._bars % _CLOCK_CHECK_BARS:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= self.p.interval:
+            self._last_report = now
+            self._report(now)
+
+    def notify_trade(self, trade) -> None:
+        if trade.isclosed:
+            self._trades += 1
+
+    def stop(self) -> None:
+        self._report(time.monotonic())
+
+    def _report(self, now: float) -> None:
+        if self.p.callback is None:
+            return
+        current_date = self.strategy.datetime.datetime(0).isoformat() if self._bars else None
+        self.p.callback(
+            {
+                "bars_processed": self.p.bar_offset + self._bars,
+                "total_bars": self.p.total_bars,
+                "current_date": current_date,
+                "trades": self.p.trade_offset + self._trades,
+                "equity": self.strategy.broker.getvalue(),
+                "elapsed_seconds": now - self._started,
+            }
+        )
+
+    def get_analysis(self) -> dict[str, Any]:
+        return {"bars": self._bars, "trades": self._trades}
+
+
+class StopAnalyzer(bt.Analyzer):
+    """Calls ``should_stop`` at most every ``interval`` seconds and halts the run.
+
+    Cerebro finishes the current bar and then stops; ``reason`` records why.
+    """
+
+    params = (("should_stop", None), ("interval", 0.25))
+
+    def start(self) -> None:
+        self._bars = 0
+        self._last_check = time.monotonic()
+        self.reason: str | None = None
+
+    def next(self) -> None:
+        self._bars += 1
+        if self._bars % _CLOCK_CHECK_BARS or self.reason is not None:
+            return
+        now = time.monotonic()
+        if now - self._last_check >= self.p.interval:
+            self._last_check = now
+            self.reason = self.p.should_stop()
+            if self.reason is not None:
+                self.strategy.env.runstop()
@@ -4,7 +4,13 @@ import math
 from datetime import datetime
 from typing import Any
 
+import numpy as np
+
 from ..models.backtest import BacktestResult, ExecutionArtifacts
+from .equity_levels import format_timestamp_ms, parse_timestamp_ms, to_epoch_ms
+
+TRADE_FIELDS = ("entry_time", "exit_time", "direction", "entry_price", "exit_price", "size", "pnl", "exit_reason")
+_TIME_FIELDS = ("entry_time", "exit_time")
 
 
 def _normalize_drawdown(drawdown_raw: float | int | None) -> float:
@@ -28,40 +34,52 @@ def _safe_float(value: Any) -> float | None:
     return None
 
 
-def _extract_trade_list(strategy_instance: Any) -> list[dict[str, Any]]:
+def _extract_trade_columns(strategy_instance: Any) -> dict[str, list]:
+    """Closed trades as one list per ``TRADE_FIELDS`` entry, times as epoch milliseconds."""
     trade_reports = getattr(strategy_instance, "trade_reports", []) or []
-    trades: list[dict[str, Any]] = []
-
-    for trade in trade_reports:
-        entry_time = trade.get("entry_time")
-        exit_time = trade.get("exit_time")
-        trades.append(
-            {
-                "entry_time": entry_time.isoformat() if isinstance(entry_time, datetime) else None,
-                "exit_time": exit_time.isoformat() if isinstance(exit_time, datetime) else None,
-                "direction": trade.get("direction"),
-                "entry_price": trade.get("entry_price"),
-                "exit_price": trade.get("exit_price"),
-                "size": trade.get("size"),
-                "pnl": trade.get("pnl"),
-                "exit_reason": trade.get("exit_reason"),
-            }
-        )
-
-    return trades
-
-
-def _extract_equity_curve(strategy_instance: Any) -> list[dict[str, Any]]:
+    columns = {name: [trade.get(name) for trade in trade_reports] for name in TRADE_FIELDS}
+    for name in _TIME_FIELDS:
+        columns[name] = [to_epoch_ms(value) if isinstance(value, datetime) else None for value in columns[name]]
+    return columns
+
+
+def trade_columns(trades: dict[str, list] | list[dict[str, Any]]) -> dict[str, list]:
+    """Columnar form of a stored trade list: one list per field, times as epoch milliseconds.
+
+    Results are stored this way already; lists of one dict per trade (saved
+    by older versions) are converted.
+    """
+    if isinstance(trades, dict):
+        return trades
+    columns = {name: [trade.get(name) for trade in trades] for name in TRADE_FIELDS}
+    for name in _TIME_FIELDS:
+        columns[name] = [parse_timestamp_ms(value) if value else None for value in columns[name]]
+    return columns
+
+
+def trade_rows(trades: dict[str, list] | list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """One dict per trade with ISO times, the default API form."""
+    if not isinstance(trades, dict):
+        return trades
+    columns = dict(trades)
+    for name in _TIME_FIELDS:
+        columns[name] = [format_timestamp_ms(value) if value is not None else None for value in columns[name]]
+    return [dict(zip(TRADE_FIELDS, values)) for values in zip(*(columns[name] for name in TRADE_FIELDS))]
+
+
+def _extract_equity_arrays(strategy_instance: Any) -> tuple[np.ndarray, np.ndarray]:
+    """Equity curve as (epoch ms, value) arrays, converted in bulk rather than per point."""
     timestamps = getattr(strategy_instance, "_timestamps", []) or []
     values = getattr(strategy_instance, "_portfolio_values", []) or []
-
-    points: list[dict[str, Any]] = []
-    for ts, value in zip(timestamps, values):
-        if not isinstance(ts, datetime):
-            continue
-        points.append({"timestamp": ts.isoformat(), "value": float(value)})
-
-    return points
+    count = min(len(timestamps), len(values))
+    if not all(isinstance(ts, datetime) for ts in timestamps[:count]):
+        keep = [index for index in range(count) if isinstance(timestamps[index], datetime)]
+        timestamps = [timestamps[index] for index in keep]
+        values = [values[index] for index in keep]
+        count = len(keep)
+    # Backtrader datetimes are naive UTC, which NumPy reads as UTC.
+    epoch_ms = np.array(timestamps[:count], dtype="datetime64[ms]").astype(np.int64)
+    return epoch_ms, np.asarray(values[:count], dtype=np.float64)
 
 
 def build_backtest_result(backtest_id: str, artifacts: ExecutionArtifacts) -> BacktestResult:
@@ -80,6 +98,7 @@ def build_backtest_result(backtest_id: str, artifacts: ExecutionArtifacts) -> Ba
     net_profit = final_value - initial_cash
     total_return_pct = (net_profit / initial_cash) * 100 if initial_cash else 0.0
     win_rate_pct = (won_trades / total_trades) * 100 if total_trades else 0.0
+    equity_timestamps, equity_values = _extract_equity_arrays(artifacts.strategy_instance)
 
     return BacktestResult(
         backtest_id=backtest_id,
@@ -95,7 +114,8 @@ def build_backtest_result(backtest_id: str, artifacts: ExecutionArtifacts) -> Ba
         sharpe_ratio=sharpe_value,
         total_trades=total_trades,
         win_rate_pct=win_rate_pct,
-        trade_list=_extract_trade_list(artifacts.strategy_instance),
-        equity_curve=_extract_equity_curve(artifacts.strategy_instance),
+        trade_list=_extract_trade_columns(artifacts.strategy_instance),
+        equity_timestamps=equity_timestamps,
+        equity_values=equity_values,
         strategy_params=artifacts.used_params,
     )
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+import multiprocessing
+import os
+import time
 
 import backtrader as bt
 
+from .bar_cache import load_bars
 from .data_loader import load_feed
+from .data_paths import parse_date, resolve_data_file
+from .indicator_store import IndicatorSpec, load_indicators, strategy_indicator_specs
 from .original_strategy import (
     get_strategy_runtime_config,
     get_sunrise_ogle_class,
     get_strategy_default_params,
 )
-from ..models.backtest import BacktestConfig, ExecutionArtifacts
+from .progress import PhaseCallback, ProgressAnalyzer, ProgressCallback, StopAnalyzer, no_phase
+from .stopping import JobStopped, StopCheck
+from .vectorized import LEVERAGE, report_completion, run_vectorized, run_vectorized_leg, supports_vectorized
+from ..core.settings import DUAL_EXECUTION, PROGRESS_INTERVAL_SECONDS, STOP_CHECK_INTERVAL_SECONDS
+from ..models.backtest import BacktestConfig, ExecutionArtifacts, LegResult
 
 
 def _build_strategy_kwargs(config: BacktestConfig) -> dict:
@@ -18,13 +27,16 @@ def _build_strategy_kwargs(config: BacktestConfig) -> dict:
     params = get_strategy_default_params()
     params.update(config.strategy_params)
 
-    # Convenience aliases requested by API payload
+    # Convenience aliases requested by API payload; the strategy itself only
+    # knows the long/short specific names.
     if "risk_percent" in config.strategy_params:
         params["risk_percent"] = config.strategy_params["risk_percent"]
     if "atr_multiplier" in config.strategy_params:
+        params.pop("atr_multiplier", None)
         params["long_atr_sl_multiplier"] = config.strategy_params["atr_multiplier"]
         params["short_atr_sl_multiplier"] = config.strategy_params["atr_multiplier"]
     if "pullback_window" in config.strategy_params:
+        params.pop("pullback_window", None)
         params["long_entry_window_periods"] = config.strategy_params["pullback_window"]
         params["short_entry_window_periods"] = config.strategy_params["pullback_window"]
 
@@ -50,36 +62,88 @@ def _add_common_analyzers(cerebro: bt.Cerebro, use_daily_sharpe: bool) -> None:
     cerebro.addanalyzer(bt.analyzers.Returns, _name="returns")
 
 
-def _run_single_cerebro(config: BacktestConfig, strategy_kwargs: dict, use_daily_sharpe: bool) -> tuple:
+def precomputed_indicator_specs(strategy_class: type, strategy_kwargs: dict) -> dict[str, IndicatorSpec]:
+    """Indicator lines to attach to the feed; only for strategies that opt in.
+
+    A strategy sets ``use_precomputed_indicators = True`` and reads e.g.
+    ``self.data.atr`` / ``self.data.ema_fast`` instead of building its own
+    Backtrader indicators.
+    """
+    if not getattr(strategy_class, "use_precomputed_indicators", False):
+        return {}
+    return strategy_indicator_specs(strategy_kwargs)
+
+
+def warm_data_caches(configs: list[BacktestConfig]) -> None:
+    """Build the bar and indicator caches before fanning runs out to workers."""
+    strategy_class = get_sunrise_ogle_class()
+    specs_by_file: dict[tuple[str | None, str], dict[str, IndicatorSpec]] = {}
+    for config in configs:
+        specs = precomputed_indicator_specs(strategy_class, _build_strategy_kwargs(config))
+        key = (config.data_file, config.timeframe)
+        specs_by_file.setdefault(key, {}).update({spec.key: spec for spec in specs.values()})
+    for (data_file, timeframe), specs in specs_by_file.items():
+        resolved = resolve_data_file(data_file)
+        load_bars(resolved, timeframe=timeframe)
+        load_indicators(resolved, specs, timeframe)
+
+
+def available_engines() -> list[str]:
+    """Engines that can run the configured strategy."""
+    if supports_vectorized(get_sunrise_ogle_class()):
+        return ["backtrader", "vectorized"]
+    return ["backtrader"]
+
+
+def check_engine(config: BacktestConfig) -> None:
+    if config.engine not in available_engines():
+        raise ValueError(
+            f"engine={config.engine!r} cannot run strategy {get_sunrise_ogle_class().__name__}: the vectorized "
+            "engine only implements strategies that declare vectorized_rules; use engine='backtrader'"
+        )
+
+
+def count_bars(config: BacktestConfig) -> int:
+    bars = load_bars(resolve_data_file(config.data_file), timeframe=config.timeframe).between(
+        parse_date(config.start_date), parse_date(config.end_date)
+    )
+    return min(len(bars), config.limit_bars) if config.limit_bars > 0 else len(bars)
+
+
+def _run_single_cerebro(
+    config: BacktestConfig,
+    strategy_kwargs: dict,
+    use_daily_sharpe: bool,
+    progress: dict | None = None,
+    should_stop: StopCheck | None = None,
+    phase: PhaseCallback = no_phase,
+) -> tuple:
     cerebro = bt.Cerebro(stdstats=False)
     strategy_class = get_sunrise_ogle_class()
-    data = load_feed(config.data_file, config.start_date, config.end_date)
+    indicators = precomputed_indicator_specs(strategy_class, strategy_kwargs)
+    with phase("feed_load"):
+        data = load_feed(
+            config.data_file,
+            config.start_date,
+            config.end_date,
+            indicators=indicators,
+            limit_bars=config.limit_bars,
+            timeframe=config.timeframe,
+        )
     cerebro.adddata(data)
     cerebro.broker.setcash(config.initial_cash)
-    cerebro.broker.setcommission(leverage=30.0)
+    cerebro.broker.setcommission(leverage=LEVERAGE)
     cerebro.addstrategy(strategy_class, **strategy_kwargs)
     _add_common_analyzers(cerebro, use_daily_sharpe=use_daily_sharpe)
+    if progress is not None:
+        cerebro.addanalyzer(ProgressAnalyzer, _name="progress", interval=PROGRESS_INTERVAL_SECONDS, **progress)
+    if should_stop is not None:
+        cerebro.addanalyzer(StopAnalyzer, _name="stop", should_stop=should_stop, interval=STOP_CHECK_INTERVAL_SECONDS)
 
-    original_next: Callable | None = None
-    limit_bars = config.limit_bars
-    if limit_bars > 0:
-        original_next = strategy_class.next
-
-        def limited_next(self):
-            if len(self.data) >= limit_bars:
-                self.env.runstop()
-                return
-            original_next(self)
-
-        strategy_class.next = limited_next
-
-    try:
-        results = cerebro.run()
-    finally:
-        if original_next is not None:
-            strategy_class.next = original_next
-
-    return cerebro, results[0]
+    strategy = cerebro.run()[0]
+    if should_stop is not None and strategy.analyzers.getbyname("stop").reason is not None:
+        raise JobStopped(strategy.analyzers.getbyname("stop").reason)
+    return cerebro, strategy
 
 
 def _build_execution_artifacts(
@@ -103,7 +167,199 @@ def _build_execution_artifacts(
     )
 
 
-def run_backtest(config: BacktestConfig) -> ExecutionArtifacts:
+class CombinedStrategyProxy:
+    """Merged view of the dual-mode legs for serializer compatibility."""
+
+    def __init__(self, trade_reports: list, timestamps: list, portfolio_values: list) -> None:
+        self.trade_reports = trade_reports
+        self._timestamps = timestamps
+        self._portfolio_values = portfolio_values
+
+
+def _plain(value):
+    # Analyzer results are AutoOrderedDicts; flatten them so leg results can
+    # cross process boundaries without dragging Backtrader types along.
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def _run_leg(
+    config: BacktestConfig,
+    strategy_kwargs: dict,
+    progress: dict | None = None,
+    should_stop: StopCheck | None = None,
+    phase: PhaseCallback = no_phase,
+) -> LegResult:
+    _, strategy = _run_single_cerebro(
+        config, strategy_kwargs, use_daily_sharpe=True, progress=progress, should_stop=should_stop, phase=phase
+    )
+    return LegResult(
+        final_value=strategy.broker.getvalue(),
+        analyzers={
+            name: _plain(strategy.analyzers.getbyname(name).get_analysis())
+            for name in ("sharpe", "drawdown", "trades", "returns")
+        },
+        trade_reports=list(getattr(strategy, "trade_reports", []) or []),
+        timestamps=list(getattr(strategy, "_timestamps", []) or []),
+        portfolio_values=list(getattr(strategy, "_portfolio_values", []) or []),
+    )
+
+
+def _leg_context() -> multiprocessing.context.BaseContext:
+    # Forked legs inherit the already mapped bar cache and loaded strategy
+    # module; platforms without fork re-map the same cache file instead.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+# Seconds a stopped short leg gets to notice ``stop_event`` before it is killed.
+_LEG_STOP_GRACE_SECONDS = 1.0
+
+
+def _closed_trades(leg: LegResult) -> int:
+    return int(leg.analyzers["trades"].get("total", {}).get("closed", 0) or 0)
+
+
+def _run_legs(
+    config: BacktestConfig,
+    long_kwargs: dict,
+    short_kwargs: dict,
+    progress: ProgressCallback | None = None,
+    should_stop: StopCheck | None = None,
+    phase: PhaseCallback = no_phase,
+) -> tuple[LegResult, LegResult]:
+    with phase("feed_load"):
+        total_bars = count_bars(config) if progress is not None else 0
+
+    if config.dual_execution != "parallel" or (os.cpu_count() or 1) < 2:
+        long_progress = short_progress = None
+        if progress is not None:
+            started = time.monotonic()
+            long_progress = {"callback": progress, "total_bars": 2 * total_bars, "started": started}
+        long_leg = _run_leg(config, long_kwargs, long_progress, should_stop, phase)
+        if long_progress is not None:
+            short_progress = {
+                **long_progress,
+                "bar_offset": total_bars,
+                "trade_offset": _closed_trades(long_leg),
+            }
+        return long_leg, _run_leg(config, short_kwargs, short_progress, should_stop, phase)
+
+    # The forked child then starts from the cached bars and indicators.
+    with phase("feed_load"):
+        warm_data_caches([config])
+    context = _leg_context()
+    receiver, sender = context.Pipe(duplex=False)
+    stop_event = context.Event()
+    short_process = context.Process(
+        target=_leg_process, args=(config, short_kwargs, stop_event, sender), name="backtest-short-leg"
+    )
+    short_process.start()
+    sender.close()
+    try:
+        # Both legs walk the same bars, so the in-process leg stands in for
+        # overall progress; callbacks cannot cross into the child process.
+        long_progress = {"callback": progress, "total_bars": total_bars} if progress is not None else None
+        long_leg = _run_leg(config, long_kwargs, long_progress, should_stop, phase)
+        short_leg = _receive_leg(receiver, short_process, should_stop)
+    finally:
+        # The child polls ``stop_event`` like any stop check; one that does
+        # not react in time (or is blocked sending its result) is killed.
+        stop_event.set()
+        short_process.join(_LEG_STOP_GRACE_SECONDS)
+        if short_process.is_alive():
+            short_process.terminate()
+            short_process.join()
+        receiver.close()
+    return long_leg, short_leg
+
+
+def _leg_process(config: BacktestConfig, strategy_kwargs: dict, stop_event, sender) -> None:
+    # Child side of a parallel dual run; sends ``(leg, None)`` or ``(None, error)``.
+    try:
+        leg = _run_leg(config, strategy_kwargs, should_stop=lambda: "cancelled" if stop_event.is_set() else None)
+        sender.send((leg, None))
+    except Exception as exc:
+        sender.send((None, f"{type(exc).__name__}: {exc}"))
+    finally:
+        sender.close()
+
+
+def _receive_leg(receiver, process, should_stop: StopCheck | None) -> LegResult:
+    """Wait for the child's leg, still honouring ``should_stop`` meanwhile."""
+    while not receiver.poll(STOP_CHECK_INTERVAL_SECONDS):
+        if should_stop is not None:
+            reason = should_stop()
+            if reason is not None:
+                raise JobStopped(reason)
+        if not process.is_alive() and not receiver.poll():
+            raise RuntimeError(f"Short leg process exited with code {process.exitcode}")
+    leg, error = receiver.recv()
+    if error is not None:
+        raise RuntimeError(f"Short leg failed: {error}")
+    return leg
+
+
+def _merge_legs(config: BacktestConfig, long_leg: LegResult, short_leg: LegResult, strategy_kwargs: dict) -> ExecutionArtifacts:
+    combined_value = config.initial_cash + (
+        (long_leg.final_value - config.initial_cash) + (short_leg.final_value - config.initial_cash)
+    )
+
+    merged_timestamps = long_leg.timestamps[: min(len(long_leg.timestamps), len(short_leg.timestamps))]
+    merged_values = []
+    for lv, sv in zip(long_leg.portfolio_values, short_leg.portfolio_values):
+        merged_values.append((lv + sv) - config.initial_cash)
+
+    proxy = CombinedStrategyProxy(
+        trade_reports=long_leg.trade_reports + short_leg.trade_reports,
+        timestamps=merged_timestamps[: len(merged_values)],
+        portfolio_values=merged_values,
+    )
+
+    def _trade_count(leg: LegResult, key: str) -> int:
+        return int(leg.analyzers["trades"].get(key, {}).get("total", 0) or 0)
+
+    combined_analyzers = {
+        "total": {"total": _trade_count(long_leg, "total") + _trade_count(short_leg, "total")},
+        "won": {"total": _trade_count(long_leg, "won") + _trade_count(short_leg, "won")},
+    }
+
+    max_dd_long = long_leg.analyzers["drawdown"].get("max", {}).get("drawdown", 0)
+    max_dd_short = short_leg.analyzers["drawdown"].get("max", {}).get("drawdown", 0)
+
+    sharpe_long = long_leg.analyzers["sharpe"].get("sharperatio")
+    sharpe_short = short_leg.analyzers["sharpe"].get("sharperatio")
+    sharpe_values = [x for x in [sharpe_long, sharpe_short] if isinstance(x, (int, float))]
+
+    return ExecutionArtifacts(
+        final_value=combined_value,
+        analyzers={
+            "trades": combined_analyzers,
+            "drawdown": {"max": {"drawdown": max(max_dd_long, max_dd_short)}},
+            "sharpe": {"sharperatio": (sum(sharpe_values) / len(sharpe_values)) if sharpe_values else None},
+            "returns": {},
+        },
+        strategy_instance=proxy,
+        used_config=config,
+        used_params=strategy_kwargs,
+    )
+
+
+def run_backtest(
+    config: BacktestConfig,
+    progress: ProgressCallback | None = None,
+    should_stop: StopCheck | None = None,
+    phase: PhaseCallback = no_phase,
+) -> ExecutionArtifacts:
+    """Run the configured backtest; ``progress`` receives throttled status reports.
+
+    Backtrader runs poll ``should_stop`` between bars and raise ``JobStopped``
+    when it returns a reason. Vectorized runs are not interrupted. Loading
+    the data feed runs inside ``phase("feed_load")``.
+    """
+    check_engine(config)
     strategy_kwargs = _build_strategy_kwargs(config)
     run_dual = config.run_dual_cerebro
 
@@ -114,68 +370,27 @@ def run_backtest(config: BacktestConfig) -> ExecutionArtifacts:
         short_kwargs = dict(strategy_kwargs)
         short_kwargs.update({"long_enabled": False, "short_enabled": True})
 
-        cerebro_long, strategy_long = _run_single_cerebro(config, long_kwargs, use_daily_sharpe=True)
-        cerebro_short, strategy_short = _run_single_cerebro(config, short_kwargs, use_daily_sharpe=True)
-
-        long_value = cerebro_long.broker.getvalue()
-        short_value = cerebro_short.broker.getvalue()
-        combined_value = config.initial_cash + ((long_value - config.initial_cash) + (short_value - config.initial_cash))
-
-        # Build a merged proxy object for serializer compatibility
-        class CombinedStrategyProxy:
-            pass
-
-        proxy = CombinedStrategyProxy()
-        proxy.trade_reports = (getattr(strategy_long, "trade_reports", []) or []) + (
-            getattr(strategy_short, "trade_reports", []) or []
-        )
-
-        long_timestamps = getattr(strategy_long, "_timestamps", []) or []
-        short_timestamps = getattr(strategy_short, "_timestamps", []) or []
-        long_values = getattr(strategy_long, "_portfolio_values", []) or []
-        short_values = getattr(strategy_short, "_portfolio_values", []) or []
-
-        merged_timestamps = long_timestamps[: min(len(long_timestamps), len(short_timestamps))]
-        merged_values = []
-        for lv, sv in zip(long_values, short_values):
-            merged_values.append((lv + sv) - config.initial_cash)
-        proxy._timestamps = merged_timestamps[: len(merged_values)]
-        proxy._portfolio_values = merged_values
-
-        combined_analyzers = {
-            "total": {
-                "total": int((strategy_long.analyzers.trades.get_analysis().get("total", {}).get("total", 0) or 0))
-                + int((strategy_short.analyzers.trades.get_analysis().get("total", {}).get("total", 0) or 0))
-            },
-            "won": {
-                "total": int((strategy_long.analyzers.trades.get_analysis().get("won", {}).get("total", 0) or 0))
-                + int((strategy_short.analyzers.trades.get_analysis().get("won", {}).get("total", 0) or 0))
-            },
-        }
-
-        drawdown_long = strategy_long.analyzers.drawdown.get_analysis()
-        drawdown_short = strategy_short.analyzers.drawdown.get_analysis()
-        max_dd_long = drawdown_long.get("max", {}).get("drawdown", 0)
-        max_dd_short = drawdown_short.get("max", {}).get("drawdown", 0)
-
-        sharpe_long = strategy_long.analyzers.sharpe.get_analysis().get("sharperatio")
-        sharpe_short = strategy_short.analyzers.sharpe.get_analysis().get("sharperatio")
-        sharpe_values = [x for x in [sharpe_long, sharpe_short] if isinstance(x, (int, float))]
-
-        return ExecutionArtifacts(
-            final_value=combined_value,
-            analyzers={
-                "trades": combined_analyzers,
-                "drawdown": {"max": {"drawdown": max(max_dd_long, max_dd_short)}},
-                "sharpe": {"sharperatio": (sum(sharpe_values) / len(sharpe_values)) if sharpe_values else None},
-                "returns": {},
-            },
-            strategy_instance=proxy,
-            used_config=config,
-            used_params=strategy_kwargs,
-        )
-
-    _, strategy = _run_single_cerebro(config, strategy_kwargs, use_daily_sharpe=False)
+        if config.engine == "vectorized":
+            started = time.monotonic()
+            long_leg = run_vectorized_leg(config, long_kwargs, phase)
+            short_leg = run_vectorized_leg(config, short_kwargs, phase)
+            artifacts = _merge_legs(config, long_leg, short_leg, strategy_kwargs)
+            report_completion(progress, artifacts, started)
+            return artifacts
+
+        long_leg, short_leg = _run_legs(config, long_kwargs, short_kwargs, progress, should_stop, phase)
+        return _merge_legs(config, long_leg, short_leg, strategy_kwargs)
+
+    if config.engine == "vectorized":
+        return run_vectorized(config, strategy_kwargs, progress, phase)
+
+    single_progress = None
+    if progress is not None:
+        with phase("feed_load"):
+            single_progress = {"callback": progress, "total_bars": count_bars(config)}
+    _, strategy = _run_single_cerebro(
+        config, strategy_kwargs, use_daily_sharpe=False, progress=single_progress, should_stop=should_stop, phase=phase
+    )
     return _build_execution_artifacts(
         config=config,
         strategy_instance=strategy,
@@ -190,5 +405,6 @@ def default_backtest_config_kwargs() -> dict:
         "initial_cash": 100000.0,
         "limit_bars": strategy_config["LIMIT_BARS"],
         "run_dual_cerebro": strategy_config["RUN_DUAL_CEREBRO"],
+        "dual_execution": DUAL_EXECUTION,
         "use_forex_position_calc": strategy_config["ENABLE_FOREX_CALC"],
     }
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+# Kept free of Backtrader so the API process can handle stopped jobs without
+# importing the engine.
+
+# Returns why a running job must stop (``"cancelled"``, ``"timed_out"``) or None.
+StopCheck = Callable[[], "str | None"]
+
+
+class JobStopped(Exception):
+    """A run ended early because its ``StopCheck`` asked it to."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Backtest {reason.replace('_', ' ')}")
+        self.reason = reason
@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from .bar_cache import BarSet, load_bars
+from .data_paths import parse_date, resolve_data_file
+from .indicator_store import average_true_range, exponential_moving_average
+from .progress import PhaseCallback, ProgressCallback, no_phase
+from ..models.backtest import BacktestConfig, ExecutionArtifacts, LegResult
+
+# Rule parameters and the values used when the strategy does not define them.
+RULE_DEFAULTS: dict[str, Any] = {
+    "ema_fast_length": 9,
+    "ema_slow_length": 21,
+    "atr_length": 14,
+    "risk_percent": 0.01,
+    "long_atr_sl_multiplier": 2.0,
+    "short_atr_sl_multiplier": 2.0,
+    "long_atr_tp_multiplier": 3.0,
+    "short_atr_tp_multiplier": 3.0,
+    "long_entry_window_periods": 7,
+    "short_entry_window_periods": 7,
+    "long_pullback_max_candles": 1,
+    "short_pullback_max_candles": 1,
+    "enable_long_trades": True,
+    "enable_short_trades": True,
+    "long_enabled": True,
+    "short_enabled": True,
+}
+
+# ``simulate`` implements these rules and nothing else. A strategy opts in by
+# setting ``vectorized_rules = VECTORIZED_RULES`` on its class, which claims
+# its Backtrader logic is exactly these rules (checked by the parity tests).
+# Any other strategy is refused rather than silently replaced by them.
+VECTORIZED_RULES = "pullback_window"
+
+# Matches the broker's ``setcommission(leverage=...)`` in the runner.
+LEVERAGE = 30.0
+
+# Initial forward-scan width when looking for stop/target hits; doubled per pass.
+_EXIT_SCAN_BLOCK = 64
+
+
+@dataclass(frozen=True)
+class SideRules:
+    direction: int
+    sl_multiplier: float
+    tp_multiplier: float
+    window: int
+    pullback: int
+
+
+@dataclass
+class SimulationResult:
+    final_value: float
+    trade_reports: list[dict[str, Any]]
+    timestamps: list[datetime]
+    portfolio_values: list[float]
+    total_trades: int
+    won_trades: int
+    max_drawdown_pct: float
+    yearly_sharpe: float | None
+    daily_sharpe: float | None
+
+
+def supports_vectorized(strategy_class: type) -> bool:
+    return getattr(strategy_class, "vectorized_rules", None) == VECTORIZED_RULES
+
+
+def rule_params(strategy_kwargs: dict) -> dict[str, Any]:
+    return {name: strategy_kwargs.get(name, default) for name, default in RULE_DEFAULTS.items()}
+
+
+def enabled_sides(params: dict[str, Any]) -> list[SideRules]:
+    sides = []
+    for direction, side in ((1, "long"), (-1, "short")):
+        if not (params[f"enable_{side}_trades"] and params[f"{side}_enabled"]):
+            continue
+        sides.append(
+            SideRules(
+                direction=direction,
+                sl_multiplier=float(params[f"{side}_atr_sl_multiplier"]),
+                tp_multiplier=float(params[f"{side}_atr_tp_multiplier"]),
+                window=max(1, int(params[f"{side}_entry_window_periods"])),
+                pullback=max(1, int(params[f"{side}_pullback_max_candles"])),
+            )
+        )
+    return sides
+
+
+def _first_exit(
+    entries: np.ndarray,
+    stops: np.ndarray,
+    targets: np.ndarray,
+    direction: int,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find each position's exit bar, price and whether the stop was hit.
+
+    Stops and targets are live from the bar after entry. All positions are
+    scanned together over a widening block of bars; the stop wins when both
+    levels are touched in one bar. Unresolved positions get exit bar ``n``.
+    """
+    n = open_.shape[0]
+    count = entries.shape[0]
+    exit_bar = np.full(count, n, dtype=np.int64)
+    exit_price = np.full(count, np.nan)
+    stopped = np.zeros(count, dtype=bool)
+
+    pending = np.arange(count)
+    offset = 1
+    block = _EXIT_SCAN_BLOCK
+    while pending.size and offset < n:
+        bars = entries[pending, None] + offset + np.arange(block)
+        in_range = bars < n
+        bars = np.minimum(bars, n - 1)
+        stop = stops[pending, None]
+        target = targets[pending, None]
+        if direction > 0:
+            stop_hit = (low[bars] <= stop) & in_range
+            target_hit = (high[bars] >= target) & in_range
+        else:
+            stop_hit = (high[bars] >= stop) & in_range
+            target_hit = (low[bars] <= target) & in_range
+
+        hit = stop_hit | target_hit
+        found = hit.any(axis=1)
+        first = hit.argmax(axis=1)
+        rows = np.flatnonzero(found)
+        if rows.size:
+            idx = pending[rows]
+            bar = bars[rows, first[rows]]
+            is_stop = stop_hit[rows, first[rows]]
+            opens = open_[bar]
+            if direction > 0:
+                price = np.where(is_stop, np.minimum(opens, stops[idx]), np.maximum(opens, targets[idx]))
+            else:
+                price = np.where(is_stop, np.maximum(opens, stops[idx]), np.minimum(opens, targets[idx]))
+            exit_bar[idx] = bar
+            exit_price[idx] = price
+            stopped[idx] = is_stop
+
+        pending = pending[~found]
+        offset += block
+        block *= 2
+    return exit_bar, exit_price, stopped
+
+
+def _side_setups(
+    side: SideRules,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    fast: np.ndarray,
+    slow: np.ndarray,
+    atr: np.ndarray,
+    start: int,
+) -> dict[str, np.ndarray]:
+    """Resolve every crossover of one side into a setup outcome, independently.
+
+    Which setups actually trade (one at a time) is decided afterwards.
+    """
+    n = close.shape[0]
+    d = side.direction
+
+    cross_up = np.zeros(n, dtype=bool)
+    cross_down = np.zeros(n, dtype=bool)
+    cross_up[1:] = (fast[:-1] <= slow[:-1]) & (fast[1:] > slow[1:])
+    cross_down[1:] = (fast[:-1] >= slow[:-1]) & (fast[1:] < slow[1:])
+    cross_up[:start] = False
+    cross_down[:start] = False
+    signals = np.flatnonzero(cross_up if d > 0 else cross_down)
+    opposite = np.append(np.flatnonzero(cross_down if d > 0 else cross_up), n)
+
+    # Length of the run of counter-trend candles ending at each bar.
+    counter = close < open_ if d > 0 else close > open_
+    index = np.arange(n)
+    run_length = index - np.maximum.accumulate(np.where(counter, -1, index))
+
+    # Window opens on the first bar completing ``pullback`` counter-trend
+    # candles after the signal, unless an opposite cross comes first.
+    # Both lists end with ``n`` so "no such bar" needs no special case.
+    pullback_bars = np.append(np.flatnonzero(run_length >= side.pullback), n)
+    window_open = pullback_bars[np.searchsorted(pullback_bars[:-1], signals + side.pullback)]
+    cancel_bar = opposite[np.searchsorted(opposite[:-1], signals, side="right")]
+
+    q = np.minimum(window_open, n - 1)
+    atr_q = atr[q]
+    opened = (window_open < cancel_bar) & (atr_q > 0)
+    level = high[q] if d > 0 else low[q]
+
+    # Stop entry at the pullback extreme, live for ``window`` bars.
+    window_bars = q[:, None] + 1 + np.arange(side.window)
+    in_window = (window_bars < n) & opened[:, None]
+    window_bars = np.minimum(window_bars, n - 1)
+    triggered = (high[window_bars] >= level[:, None] if d > 0 else low[window_bars] <= level[:, None]) & in_window
+    entered = triggered.any(axis=1)
+    entry_bar = np.where(entered, window_bars[np.arange(signals.size), triggered.argmax(axis=1)], n)
+    entry_opens = open_[np.minimum(entry_bar, n - 1)]
+    entry_price = np.maximum(entry_opens, level) if d > 0 else np.minimum(entry_opens, level)
+
+    risk_distance = atr_q * side.sl_multiplier
+    stops = entry_price - d * risk_distance
+    targets = entry_price + d * atr_q * side.tp_multiplier
+    exit_bar = np.full(signals.size, n, dtype=np.int64)
+    exit_price = np.full(signals.size, np.nan)
+    stopped = np.zeros(signals.size, dtype=bool)
+    traded = np.flatnonzero(entered)
+    if traded.size:
+        exit_bar[traded], exit_price[traded], stopped[traded] = _first_exit(
+            entry_bar[traded], stops[traded], targets[traded], d, open_, high, low
+        )
+
+    # First bar on which a new signal may start another setup.
+    window_closed = np.where(opened, q + side.window, np.where(window_open < cancel_bar, q, cancel_bar))
+    free_from = np.where(entered, exit_bar, window_closed + 1)
+
+    return {
+        "signal": signals,
+        "direction": np.full(signals.size, d),
+        "window_open": q,
+        "opened": opened,
+        "entered": entered,
+        "entry_bar": entry_bar,
+        "entry_price": entry_price,
+        "risk_distance": risk_distance,
+        "level": level,
+        "stop": stops,
+        "target": targets,
+        "exit_bar": exit_bar,
+        "exit_price": exit_price,
+        "stopped": stopped,
+        "free_from": free_from,
+    }
+
+
+def _sequence_trades(
+    setups: dict[str, np.ndarray],
+    initial_cash: float,
+    risk: float,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+) -> list[dict[str, Any]]:
+    """Walk setups in signal order, keeping one setup or position at a time.
+
+    Sizes compound on realized equity. Orders the broker would refuse for
+    lack of cash (long entries, and a short's take profit, which Backtrader
+    pseudo-executes as a new long at submission) are dropped the same way.
+    """
+    n = open_.shape[0]
+    trades = []
+    busy_until = 0
+    equity = float(initial_cash)
+    for i in np.argsort(setups["signal"], kind="stable").tolist():
+        if setups["signal"][i] < busy_until:
+            continue
+        if not setups["opened"][i]:
+            busy_until = int(setups["free_from"][i])
+            continue
+
+        d = int(setups["direction"][i])
+        size = equity * risk / float(setups["risk_distance"][i])
+        if d > 0 and size * float(setups["level"][i]) / LEVERAGE > equity:
+            busy_until = int(setups["window_open"][i]) + 1
+            continue
+        if not setups["entered"][i]:
+            busy_until = int(setups["free_from"][i])
+            continue
+
+        entry_price = float(setups["entry_price"][i])
+        if d > 0 and size * entry_price / LEVERAGE > equity:
+            busy_until = int(setups["entry_bar"][i])
+            continue
+
+        rows = slice(i, i + 1)
+        exits = setups["exit_bar"][rows], setups["exit_price"][rows], setups["stopped"][rows]
+        stop = setups["stop"][rows]
+        if d < 0 and equity - size * (stop[0] - entry_price) < size * setups["target"][i] / LEVERAGE:
+            # Take profit refused: only the stop can close the position.
+            exits = _first_exit(setups["entry_bar"][rows], stop, np.array([-np.inf]), d, open_, high, low)
+        exit_bar, exit_price, stopped = int(exits[0][0]), float(exits[1][0]), bool(exits[2][0])
+
+        trade = {
+            "direction": d,
+            "entry_bar": int(setups["entry_bar"][i]),
+            "entry_price": entry_price,
+            "size": size,
+            "exit_bar": exit_bar,
+            "exit_price": exit_price,
+            "stopped": stopped,
+        }
+        trades.append(trade)
+        if exit_bar >= n:
+            break
+        equity += d * size * (exit_price - entry_price)
+        busy_until = exit_bar
+    return trades
+
+
+def _sharpe(days: np.ndarray, values: np.ndarray, initial_cash: float, rate: float) -> float | None:
+    """Backtrader's SharpeRatio: per-period returns from period-end values."""
+    if values.size == 0:
+        return None
+    last = np.flatnonzero(np.r_[days[1:] != days[:-1], True])
+    period_values = values[last]
+    returns = period_values / np.r_[initial_cash, period_values[:-1]] - 1.0 - rate
+    deviation = returns.std()
+    if deviation == 0 or not np.isfinite(deviation):
+        return None
+    return float(returns.mean() / deviation)
+
+
+def simulate(bars: BarSet, params: dict[str, Any], initial_cash: float, limit_bars: int = 0) -> SimulationResult:
+    """Array implementation of the pullback-window rules.
+
+    Per side: an EMA crossover (fast over slow for longs) arms a setup; the
+    first run of ``*_pullback_max_candles`` counter-trend candles opens an
+    entry window, unless an opposite crossover comes first. A stop entry at
+    the pullback candle's extreme stays live for ``*_entry_window_periods``
+    bars. Fills use Backtrader's stop/limit rules (gaps fill at the open).
+    Stop loss and take profit sit ``*_atr_sl_multiplier`` and
+    ``*_atr_tp_multiplier`` ATRs (of the window bar) from the fill, and
+    ``risk_percent`` of equity is risked on the stop distance. Only one setup
+    or position is active at a time.
+    """
+    if limit_bars > 0:
+        bars = bars.slice(0, limit_bars)
+    n = len(bars)
+    open_ = np.asarray(bars.open, dtype=np.float64)
+    high = np.asarray(bars.high, dtype=np.float64)
+    low = np.asarray(bars.low, dtype=np.float64)
+    close = np.asarray(bars.close, dtype=np.float64)
+    fast_length = int(params["ema_fast_length"])
+    slow_length = int(params["ema_slow_length"])
+    atr_length = int(params["atr_length"])
+    fast = exponential_moving_average(close, fast_length)
+    slow = exponential_moving_average(close, slow_length)
+    atr = average_true_range(high, low, close, atr_length)
+    # First bar Backtrader would call ``next`` on.
+    start = min(max(fast_length - 1, slow_length - 1, atr_length), n)
+
+    per_side = [_side_setups(side, open_, high, low, close, fast, slow, atr, start) for side in enabled_sides(params)]
+    trades = []
+    if per_side:
+        setups = {key: np.concatenate([side[key] for side in per_side]) for key in per_side[0]}
+        trades = _sequence_trades(setups, initial_cash, float(params["risk_percent"]), open_, high, low)
+
+    realized_delta = np.zeros(n + 1)
+    unrealized = np.zeros(n)
+    trade_reports = []
+    won = 0
+    bar_times = [datetime.fromtimestamp(int(ts), tz=timezone.utc).replace(tzinfo=None) for ts in bars.timestamps]
+    for trade in trades:
+        d, size = trade["direction"], trade["size"]
+        entry_bar, entry_price = trade["entry_bar"], trade["entry_price"]
+        exit_bar, exit_price = trade["exit_bar"], trade["exit_price"]
+        unrealized[entry_bar:exit_bar] = d * size * (close[entry_bar:exit_bar] - entry_price)
+        if exit_bar >= n:
+            continue
+
+        pnl = d * size * (exit_price - entry_price)
+        realized_delta[exit_bar] += pnl
+        won += pnl > 0
+        trade_reports.append(
+            {
+                "entry_time": bar_times[entry_bar],
+                "exit_time": bar_times[exit_bar],
+                "direction": "LONG" if d > 0 else "SHORT",
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "size": size,
+                "pnl": pnl,
+                "exit_reason": "STOP_LOSS" if trade["stopped"] else "TAKE_PROFIT",
+            }
+        )
+
+    values = initial_cash + np.cumsum(realized_delta[:n]) + unrealized
+    peaks = np.maximum.accumulate(values) if n else values
+    max_drawdown_pct = float(np.max((peaks - values) / peaks) * 100) if n else 0.0
+
+    moments = np.asarray(bars.timestamps, dtype=np.int64).astype("datetime64[s]")
+    days = moments.astype("datetime64[D]")
+    years = moments.astype("datetime64[Y]")
+    return SimulationResult(
+        final_value=float(values[-1]) if n else float(initial_cash),
+        trade_reports=trade_reports,
+        timestamps=bar_times[start:],
+        portfolio_values=values[start:].tolist(),
+        total_trades=len(trades),
+        won_trades=int(won),
+        max_drawdown_pct=max_drawdown_pct,
+        yearly_sharpe=_sharpe(years, values, initial_cash, rate=0.01),
+        daily_sharpe=_sharpe(days, values, initial_cash, rate=0.0),
+    )
+
+
+class VectorizedStrategyResult:
+    """Stand-in for the strategy instance the result serializer reads."""
+
+    def __init__(self, result: SimulationResult) -> None:
+        self.trade_reports = result.trade_reports
+        self._timestamps = result.timestamps
+        self._portfolio_values = result.portfolio_values
+
+
+def _analyzers(result: SimulationResult, daily_sharpe: bool) -> dict[str, Any]:
+    return {
+        "sharpe": {"sharperatio": result.daily_sharpe if daily_sharpe else result.yearly_sharpe},
+        "drawdown": {"max": {"drawdown": result.max_drawdown_pct}},
+        "trades": {
+            "total": {"total": result.total_trades, "closed": len(result.trade_reports)},
+            "won": {"total": result.won_trades},
+        },
+        "returns": {},
+    }
+
+
+def load_simulation_bars(config: BacktestConfig) -> BarSet:
+    resolved = resolve_data_file(config.data_file)
+    if not resolved.exists():
+        raise FileNotFoundError(f"Data file not found: {resolved}")
+    bars = load_bars(resolved, timeframe=config.timeframe)
+    return bars.between(parse_date(config.start_date), parse_date(config.end_date))
+
+
+def run_vectorized_leg(config: BacktestConfig, strategy_kwargs: dict, phase: PhaseCallback = no_phase) -> LegResult:
+    with phase("feed_load"):
+        bars = load_simulation_bars(config)
+    result = simulate(bars, rule_params(strategy_kwargs), config.initial_cash, config.limit_bars)
+    return LegResult(
+        final_value=result.final_value,
+        analyzers=_analyzers(result, daily_sharpe=True),
+        trade_reports=result.trade_reports,
+        timestamps=result.timestamps,
+        portfolio_values=result.portfolio_values,
+    )
+
+
+def report_completion(progress: ProgressCallback | None, artifacts: ExecutionArtifacts, started: float) -> None:
+    """Array runs finish in one step, so they send a single final progress report."""
+    if progress is None:
+        return
+    timestamps = artifacts.strategy_instance._timestamps
+    progress(
+        {
+            "bars_processed": len(timestamps),
+            "total_bars": len(timestamps),
+            "current_date": timestamps[-1].isoformat() if timestamps else None,
+            "trades": len(artifacts.strategy_instance.trade_reports),
+            "equity": artifacts.final_value,
+            "elapsed_seconds": time.monotonic() - started,
+        }
+    )
+
+
+def run_vectorized(
+    config: BacktestConfig,
+    strategy_kwargs: dict,
+    progress: ProgressCallback | None = None,
+    phase: PhaseCallback = no_phase,
+) -> ExecutionArtifacts:
+    """Single-mode run on the array engine; returns the same artifacts as Backtrader."""
+    started = time.monotonic()
+    with phase("feed_load"):
+        bars = load_simulation_bars(config)
+    result = simulate(bars, rule_params(strategy_kwargs), config.initial_cash, config.limit_bars)
+    artifacts = ExecutionArtifacts(
+        final_value=result.final_value,
+        analyzers=_analyzers(result, daily_sharpe=False),
+        strategy_instance=VectorizedStrategyResult(result),
+        used_config=config,
+        used_params=strategy_kwargs,
+    )
+    report_completion(progress, artifacts, started)
+    return artifacts
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time, here and in spawned job workers, so the
+# stand-in strategy and a throwaway database are selected through the
+# environment before anything from the backend is imported.
+os.environ.setdefault("BACKTEST_STRATEGY_FILE", str(Path(__file__).with_name("standin_strategy.py")))
+_database_dir = tempfile.mkdtemp(prefix="backtest-bench-")
+os.environ.setdefault("BACKTEST_DATABASE_PATH", str(Path(_database_dir) / "backtests.db"))
+
+from .suite import main  # noqa: E402
+
+try:
+    exit_code = main()
+finally:
+    shutil.rmtree(_database_dir, ignore_errors=True)
+sys.exit(exit_code)
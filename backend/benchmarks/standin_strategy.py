@@ -0,0 +1,30 @@
+"""Stand-in for the original strategy module, used by the benchmark suite.
+
+It exposes the constants and ``SunriseOgle`` class the service reads from the
+strategy submodule. The strategy is the event-driven pullback-window
+reference, so both engines do comparable work.
+"""
+
+from __future__ import annotations
+
+from backend.backtest_engine.parity import PullbackWindowReference
+
+DATA_FILENAME = "XAUUSD_5m_5Yea.csv"
+FROMDATE = None
+TODATE = None
+STARTING_CASH = 100000.0
+QUICK_TEST = False
+LIMIT_BARS = 0
+ENABLE_PLOT = False
+ENABLE_FOREX_CALC = False
+FOREX_INSTRUMENT = "XAUUSD"
+TEST_FOREX_MODE = False
+RUN_DUAL_CEREBRO = False
+
+
+class SunriseOgle(PullbackWindowReference):
+    params = (
+        ("plot_result", False),
+        ("use_forex_position_calc", False),
+        ("forex_instrument", "XAUUSD"),
+    )
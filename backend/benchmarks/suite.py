@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ..backtest_engine.bar_cache import cache_path_for, load_bars
+from ..backtest_engine.data_loader import load_feed
+from ..backtest_engine.equity_levels import build_equity_levels_from_arrays
+from ..backtest_engine.result_serializer import build_backtest_result
+from ..backtest_engine.runner import run_backtest
+from ..core.settings import BENCHMARK_DATA_ROOT, BENCHMARK_RESULTS_ROOT, PROJECT_ROOT, STRATEGY_FILE
+from ..database.repository import BacktestRepository
+from ..models.backtest import BacktestConfig
+from ..schemas.backtest import BacktestRequest
+from ..services.backtest_service import BacktestService, result_payload
+from .synthetic import DATASET_DAYS, ensure_dataset
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FORMAT_VERSION = 1
+API_POLL_SECONDS = 0.05
+
+
+class Recorder:
+    """Collects timings as ``{"name", "size", "bars", "seconds", "min", "median"}`` rows."""
+
+    def __init__(self, repeat: int) -> None:
+        self.repeat = max(1, repeat)
+        self.rows: list[dict[str, Any]] = []
+
+    def time(
+        self,
+        name: str,
+        size: str,
+        bars: int,
+        fn: Callable[[], Any],
+        setup: Callable[[], Any] | None = None,
+    ) -> Any:
+        samples = []
+        value = None
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            value = fn()
+            samples.append(time.perf_counter() - started)
+        self.add(name, size, bars, samples)
+        return value
+
+    def add(self, name: str, size: str, bars: int, samples: list[float]) -> None:
+        best = min(samples)
+        row = {
+            "name": name,
+            "size": size,
+            "bars": bars,
+            "seconds": samples,
+            "min": best,
+            "median": statistics.median(samples),
+            "bars_per_second": bars / best if bars and best > 0 else None,
+        }
+        self.rows.append(row)
+        logger.info("%-28s %-3s %9.4fs", name, size, best)
+
+
+def _config(data_file: Path, dual: bool = False, engine: str = "backtrader") -> BacktestConfig:
+    return BacktestConfig(
+        symbol="XAUUSD",
+        timeframe="5m",
+        start_date=None,
+        end_date=None,
+        data_file=str(data_file),
+        initial_cash=100000.0,
+        limit_bars=0,
+        run_dual_cerebro=dual,
+        use_forex_position_calc=False,
+        dual_execution="sequential",
+        engine=engine,
+    )
+
+
+def _drop_bar_cache(data_file: Path) -> None:
+    cache_path_for(data_file).unlink(missing_ok=True)
+
+
+def bench_engine(recorder: Recorder, size: str, data_file: Path, engines: tuple[str, ...]) -> None:
+    """Feed loading, both run modes per engine, serialization and storage."""
+    bars = len(load_bars(data_file))
+    recorder.time(
+        "load_feed.cold",
+        size,
+        bars,
+        lambda: load_feed(str(data_file), None, None),
+        setup=lambda: _drop_bar_cache(data_file),
+    )
+    recorder.time("load_feed.warm", size, bars, lambda: load_feed(str(data_file), None, None))
+
+    artifacts = None
+    for engine in engines:
+        single = recorder.time(
+            f"run_backtest.{engine}.single", size, bars, lambda: run_backtest(_config(data_file, engine=engine))
+        )
+        recorder.time(
+            f"run_backtest.{engine}.dual", size, 2 * bars, lambda: run_backtest(_config(data_file, True, engine))
+        )
+        if artifacts is None:
+            artifacts = single
+
+    result = recorder.time("build_backtest_result", size, bars, lambda: build_backtest_result("bench", artifacts))
+    payload = result_payload(result)
+    levels = recorder.time(
+        "build_equity_levels",
+        size,
+        bars,
+        lambda: build_equity_levels_from_arrays(result.equity_timestamps, result.equity_values),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        repository = BacktestRepository(Path(directory) / "bench.db")
+        job_ids = []
+
+        def _save() -> None:
+            job_id = str(uuid.uuid4())
+            repository.create_job(job_id, {"benchmark": size})
+            repository.save_result(job_id, payload, equity_levels=levels)
+            job_ids.append(job_id)
+
+        recorder.time("repository.save_result", size, bars, _save)
+        recorder.time("repository.get_job", size, bars, lambda: repository.get_job(job_ids[-1]))
+        service = BacktestService(repository)
+        recorder.time("service.get_job.full", size, bars, lambda: service.get_job(job_ids[-1]))
+        repository.close()
+
+
+def bench_api(recorder: Recorder, datasets: dict[str, Path], engines: tuple[str, ...]) -> None:
+    """Submit jobs through the HTTP API and time the request path end to end."""
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as exc:  # httpx is only needed for this section
+        logger.warning("Skipping API benchmarks: %s", exc)
+        return
+
+    from ..main import app
+
+    with TestClient(app) as client:
+
+        def _run_job(data_file: Path, engine: str) -> str:
+            payload = BacktestRequest(data_file=str(data_file), engine=engine, use_cache=False, limit_bars=0)
+            response = client.post("/api/backtest/run", json=payload.model_dump())
+            response.raise_for_status()
+            job_id = response.json()["id"]
+            while True:
+                status = client.get(f"/api/backtest/{job_id}", params={"view": "summary"}).json()["status"]
+                if status in ("completed", "failed"):
+                    if status == "failed":
+                        raise RuntimeError(f"Benchmark job {job_id} failed")
+                    return job_id
+                time.sleep(API_POLL_SECONDS)
+
+        # Spawning the worker pool is a one-off cost; keep it out of the timings.
+        smallest = min(datasets, key=lambda size: DATASET_DAYS[size])
+        _run_job(datasets[smallest], engines[0])
+
+        for size, data_file in datasets.items():
+            bars = len(load_bars(data_file))
+            for engine in engines:
+                job_ids = []
+                recorder.time(
+                    f"api.run_to_completion.{engine}", size, bars, lambda: job_ids.append(_run_job(data_file, engine))
+                )
+            job_id = job_ids[-1]
+            for name, path, params in (
+                ("api.get_job", f"/api/backtest/{job_id}", {}),
+                ("api.get_job.summary", f"/api/backtest/{job_id}", {"view": "summary"}),
+                ("api.trades", f"/api/backtest/{job_id}/trades", {}),
+                ("api.equity_curve", f"/api/backtest/{job_id}/equity-curve", {}),
+                ("api.equity_curve.1000", f"/api/backtest/{job_id}/equity-curve", {"points": 1000}),
+                ("api.get_job.columnar", f"/api/backtest/{job_id}", {"format": "columnar"}),
+                ("api.equity_curve.columnar", f"/api/backtest/{job_id}/equity-curve", {"format": "columnar"}),
+            ):
+                recorder.time(name, size, bars, lambda: client.get(path, params=params).raise_for_status())
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    sizes: list[str],
+    repeat: int = 1,
+    engines: tuple[str, ...] = ("backtrader", "vectorized"),
+    include_api: bool = True,
+    data_root: Path = BENCHMARK_DATA_ROOT,
+    seed: int = 0,
+) -> dict[str, Any]:
+    recorder = Recorder(repeat)
+    datasets = {size: ensure_dataset(data_root, size, seed) for size in sizes}
+    for size, data_file in datasets.items():
+        bench_engine(recorder, size, data_file, engines)
+    if include_api:
+        bench_api(recorder, datasets, engines)
+
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "strategy_file": STRATEGY_FILE or None,
+        "repeat": recorder.repeat,
+        "datasets": {size: {"file": str(path), "bars": len(load_bars(path))} for size, path in datasets.items()},
+        "results": recorder.rows,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the backtest pipeline on synthetic XAUUSD data.")
+    parser.add_argument("--sizes", default=",".join(DATASET_DAYS), help="comma-separated: " + ", ".join(DATASET_DAYS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--engines", default="backtrader,vectorized")
+    parser.add_argument("--no-api", action="store_true", help="skip the HTTP API section")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="results JSON path")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in DATASET_DAYS]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = run_suite(
+        sizes,
+        repeat=args.repeat,
+        engines=tuple(engine.strip() for engine in args.engines.split(",") if engine.strip()),
+        include_api=not args.no_api,
+        seed=args.seed,
+    )
+    output = args.output or BENCHMARK_RESULTS_ROOT / f"bench-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.info("Wrote %s", output)
+    return 0
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+BAR_SECONDS = 300
+
+# Named dataset sizes in calendar days.
+DATASET_DAYS = {"1m": 30, "1y": 365, "5y": 5 * 365}
+
+# Relative 5-minute volatility by UTC hour: quiet Asia, busy London/New York.
+_HOURLY_VOLATILITY = np.array(
+    [0.6, 0.5, 0.5, 0.5, 0.6, 0.6, 0.7, 0.9, 1.2, 1.3, 1.2, 1.1,
+     1.2, 1.5, 1.8, 1.7, 1.4, 1.1, 0.9, 0.8, 0.7, 0.7, 0.6, 0.6]
+)
+
+
+def generate_ohlcv(
+    days: int,
+    start: datetime = datetime(2019, 1, 1, tzinfo=timezone.utc),
+    start_price: float = 1300.0,
+    annual_volatility: float = 0.16,
+    seed: int = 0,
+) -> dict[str, np.ndarray]:
+    """Gold-like 5-minute bars: a seeded random walk on weekdays only.
+
+    Volatility follows the trading session, prices are rounded to cents
+    and volume scales with volatility.
+    """
+    rng = np.random.default_rng(seed)
+    first = int(start.timestamp())
+    timestamps = np.arange(first, first + days * 86400, BAR_SECONDS, dtype=np.int64)
+    weekday = (timestamps // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+    timestamps = timestamps[weekday < 5]
+    n = timestamps.shape[0]
+
+    hours = (timestamps // 3600) % 24
+    bar_volatility = annual_volatility / np.sqrt(252 * 288) * _HOURLY_VOLATILITY[hours]
+    returns = rng.standard_normal(n) * bar_volatility
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.empty(n)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+
+    wick = np.abs(rng.standard_normal((2, n))) * bar_volatility * 0.6
+    open_ = np.round(open_, 2)
+    close = np.round(close, 2)
+    high = np.round(np.maximum(open_, close) * (1 + wick[0]), 2)
+    low = np.round(np.minimum(open_, close) * (1 - wick[1]), 2)
+    volume = np.round(rng.lognormal(5.0, 0.4, n) * _HOURLY_VOLATILITY[hours]).astype(np.int64)
+    return {"timestamps": timestamps, "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def write_csv(path: Path, bars: dict[str, np.ndarray]) -> None:
+    """Write bars in the ``Date,Time,Open,High,Low,Close,Volume`` layout of the real data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    epoch = datetime(1970, 1, 1)
+    columns = zip(
+        bars["timestamps"].tolist(),
+        bars["open"].tolist(),
+        bars["high"].tolist(),
+        bars["low"].tolist(),
+        bars["close"].tolist(),
+        bars["volume"].tolist(),
+    )
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", newline="") as handle:
+        handle.write("Date,Time,Open,High,Low,Close,Volume\n")
+        for ts, o, h, l, c, v in columns:
+            moment = epoch + timedelta(seconds=ts)
+            handle.write(f"{moment:%Y%m%d},{moment:%H:%M:%S},{o:.2f},{h:.2f},{l:.2f},{c:.2f},{v}\n")
+    tmp_path.replace(path)
+
+
+def ensure_dataset(directory: Path, size: str, seed: int = 0) -> Path:
+    """Return the CSV for a named size, generating it on first use."""
+    path = directory / f"XAUUSD_5m_synthetic_{size}_seed{seed}.csv"
+    if not path.exists():
+        write_csv(path, generate_ohlcv(DATASET_DAYS[size], seed=seed))
+    return path
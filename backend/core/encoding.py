@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import math
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+from fastapi.responses import Response
+
+# orjson encodes large payloads several times faster than the standard
+# library and writes NumPy arrays without converting them to lists. It is in
+# requirements.txt; the fallback below writes the same output without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _finite(value: Any) -> Any:
+    """``value`` with NaN and infinities replaced by ``None``, as orjson writes them."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _finite(value.tolist())
+    if isinstance(value, datetime) and value.utcoffset() is not None and not value.utcoffset():
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON bytes; NumPy arrays and scalars are written as plain numbers.
+
+    UTC datetimes end in ``Z``, as in FastAPI's own responses. NaN and
+    infinities are written as ``null``.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z)
+    return json.dumps(_finite(data), separators=(",", ":"), default=_default, allow_nan=False).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with :func:`dumps`, bypassing FastAPI's encoder."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections.abc import Callable, Iterable
+
+
+LabelValues = tuple[str, ...]
+GaugeReader = Callable[[], "float | dict[LabelValues, float] | None"]
+
+# Observations happen per job phase or per repository call, never per bar,
+# so one lock per metric is cheap enough.
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict) -> None:
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[tuple[str, LabelValues, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float], labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum]
+        self._values: dict[LabelValues, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def observe(self, value: float, **labels: str) -> None:
+        if math.isnan(value):
+            return
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 1)
+            state[index] += 1
+            state[-1] += value
+
+    def drain(self) -> dict:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict) -> None:
+        with self._lock:
+            for key, incoming in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    self._values[key] = list(incoming)
+                else:
+                    self._values[key] = [a + b for a, b in zip(state, incoming)]
+
+    def samples(self) -> list[tuple[str, LabelValues, float]]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        rows = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                rows.append((f"{self.name}_bucket", key + (_format_value(bound),), cumulative))
+            rows.append((f"{self.name}_sum", key, state[-1]))
+            rows.append((f"{self.name}_count", key, cumulative))
+        return rows
+
+
+class Gauge:
+    """Value read at scrape time from ``fn``; ``None`` omits the sample."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: GaugeReader, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def samples(self) -> list[tuple[str, LabelValues, float]]:
+        value = self.fn()
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            return [(self.name, key, sample) for key, sample in sorted(value.items())]
+        return [(self.name, (), value)]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text format.
+
+    Jobs run in worker processes, so workers ``drain()`` what they recorded
+    and the API process ``merge()``s it when the job finishes.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, buckets: Iterable[float], labelnames: Iterable[str] = ()) -> Histogram:
+        return self._register(Histogram(name, help, buckets, labelnames))
+
+    def gauge(self, name: str, help: str, fn: GaugeReader, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, fn, labelnames))
+
+    def drain(self) -> dict[str, dict]:
+        return {name: metric.drain() for name, metric in self._metrics.items() if not isinstance(metric, Gauge)}
+
+    def merge(self, snapshot: dict[str, dict]) -> None:
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None and values:
+                metric.merge(values)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, label_values, value in metric.samples():
+                labelnames = metric.labelnames + (("le",) if sample_name.endswith("_bucket") else ())
+                labels = ",".join(f'{name}="{_escape(v)}"' for name, v in zip(labelnames, label_values))
+                if labels:
+                    sample_name = f"{sample_name}{{{labels}}}"
+                lines.append(f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory_bytes(pid: int | None = None) -> float | None:
+    """Current RSS of a process from ``/proc``; ``None`` where that is unavailable."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as handle:
+            return float(int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+METRICS = MetricsRegistry()
+
+JOB_PHASE_SECONDS = METRICS.histogram(
+    "backtest_job_phase_seconds",
+    "Seconds spent in each phase of a backtest job.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+    labelnames=("phase",),
+)
+JOBS_FINISHED = METRICS.counter(
+    "backtest_jobs_finished_total", "Backtest jobs finished, by final status.", labelnames=("status",)
+)
+JOB_FAILURES = METRICS.counter(
+    "backtest_job_failures_total", "Failed backtest jobs, by exception type.", labelnames=("exception",)
+)
+BARS_PROCESSED = METRICS.counter("backtest_bars_processed_total", "Bars run through the engine.")
+RUN_SECONDS = METRICS.counter("backtest_run_seconds_total", "Seconds spent in the engine run phase.")
+BARS_PER_SECOND = METRICS.histogram(
+    "backtest_bars_per_second",
+    "Engine throughput of each job's run phase.",
+    (500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000),
+)
+REPOSITORY_QUERY_SECONDS = METRICS.histogram(
+    "backtest_repository_query_seconds",
+    "Latency of BacktestRepository calls, by method.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    labelnames=("method",),
+)
+PRUNED_JOBS = METRICS.counter(
+    "backtest_pruned_jobs_total", "Completed jobs whose trades and equity were removed by the retention policy."
+)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 
@@ -9,10 +10,55 @@ ORIGINAL_PROJECT_ROOT = PROJECT_ROOT / "backtrader-pullback-window-xauusd"
 ORIGINAL_SRC_ROOT = ORIGINAL_PROJECT_ROOT / "src"
 ORIGINAL_DATA_ROOT = ORIGINAL_PROJECT_ROOT / "data"
 
-DATABASE_PATH = BACKEND_ROOT / "database" / "backtests.db"
+DATABASE_PATH = Path(os.getenv("BACKTEST_DATABASE_PATH", str(BACKEND_ROOT / "database" / "backtests.db")))
 DEFAULT_DATA_FILE = ORIGINAL_DATA_ROOT / "XAUUSD_5m_5Yea.csv"
+BAR_CACHE_ROOT = BACKEND_ROOT / "cache" / "bars"
+INDICATOR_CACHE_ROOT = BACKEND_ROOT / "cache" / "indicators"
+BENCHMARK_DATA_ROOT = BACKEND_ROOT / "cache" / "benchmarks"
+BENCHMARK_RESULTS_ROOT = BACKEND_ROOT / "benchmarks" / "results"
+
+# Load the strategy module from this file instead of the strategy submodule.
+STRATEGY_FILE = os.getenv("BACKTEST_STRATEGY_FILE", "")
+
+# Backtest worker pool: 0 workers means one per CPU core.
+MAX_WORKERS = int(os.getenv("BACKTEST_MAX_WORKERS", "0")) or (os.cpu_count() or 1)
+MAX_QUEUE_DEPTH = int(os.getenv("BACKTEST_MAX_QUEUE_DEPTH", "32"))
+# Batch jobs have their own cap on waiting jobs, since one batch can hold MAX_BATCH_RUNS runs.
+MAX_BATCH_QUEUE_DEPTH = int(os.getenv("BACKTEST_MAX_BATCH_QUEUE_DEPTH", "2000"))
+# Set to 0 to leave every job to standalone workers (python -m backend.worker).
+EMBEDDED_WORKERS = os.getenv("BACKTEST_EMBEDDED_WORKERS", "1") != "0"
+
+# Durable job queue: a claimed job is requeued when its worker has not renewed
+# the lease for this long, up to JOB_MAX_ATTEMPTS claims in total.
+JOB_LEASE_SECONDS = float(os.getenv("BACKTEST_JOB_LEASE_SECONDS", "30"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("BACKTEST_JOB_HEARTBEAT_SECONDS", "10"))
+JOB_MAX_ATTEMPTS = int(os.getenv("BACKTEST_JOB_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_SECONDS = float(os.getenv("BACKTEST_QUEUE_POLL_SECONDS", "1.0"))
+# Load the engine, strategy and default dataset (API process and workers) at startup.
+WARMUP_ON_STARTUP = os.getenv("BACKTEST_WARMUP", "1") != "0"
+MAX_SWEEP_RUNS = int(os.getenv("BACKTEST_MAX_SWEEP_RUNS", "5000"))
+MAX_BATCH_RUNS = int(os.getenv("BACKTEST_MAX_BATCH_RUNS", "500"))
+
+# Dual-mode legs: "parallel" runs the short leg in an extra child process,
+# on top of the worker pool's slots; "sequential" stays within one core.
+DUAL_EXECUTION = os.getenv("BACKTEST_DUAL_EXECUTION", "sequential")
+
+# Minimum seconds between live progress reports from a running job.
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("BACKTEST_PROGRESS_INTERVAL_SECONDS", "1.0"))
+# Minimum seconds between cancellation/timeout checks of a running job.
+STOP_CHECK_INTERVAL_SECONDS = float(os.getenv("BACKTEST_STOP_CHECK_INTERVAL_SECONDS", "0.25"))
 
 DEFAULT_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
+
+# Retention: completed jobs older than this many days, or beyond the newest
+# RESULT_RETENTION_MAX_JOBS, keep only their summary (0 disables either rule).
+# The database is pruned and compacted every MAINTENANCE_INTERVAL_SECONDS.
+RESULT_RETENTION_DAYS = float(os.getenv("BACKTEST_RESULT_RETENTION_DAYS", "0"))
+RESULT_RETENTION_MAX_JOBS = int(os.getenv("BACKTEST_RESULT_RETENTION_MAX_JOBS", "0"))
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("BACKTEST_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+
+# Content-addressed result cache; 0 disables it.
+RESULT_CACHE_MAX_BYTES = int(os.getenv("BACKTEST_RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
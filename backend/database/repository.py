@@ -1,30 +1,139 @@
 from __future__ import annotations
 
+import functools
 import json
+import os
 import sqlite3
+import threading
+import time
+import uuid
+import zlib
 from datetime import datetime, timezone
 from pathlib import Path
 
+from ..core import encoding
+from ..core.metrics import REPOSITORY_QUERY_SECONDS
 from ..core.settings import DATABASE_PATH
 
 
+# Result keys stored outside backtests.result_json.
+PAYLOAD_FIELDS = ("trade_list", "equity_curve")
+
+# Per-job phases timed by the service, stored as backtest_timings.<phase>_seconds.
+TIMING_PHASES = ("config", "feed_load", "run", "serialize", "persist")
+
+SWEEP_SORT_COLUMNS = {
+    "sharpe_ratio",
+    "total_return_pct",
+    "max_drawdown_pct",
+    "net_profit",
+    "win_rate_pct",
+    "total_trades",
+    "run_index",
+}
+
+
+# Applied to every pooled connection. WAL lets status polls read while a
+# large result is being written; NORMAL sync is durable across app crashes
+# in WAL mode and avoids an fsync per commit.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+)
+_BUSY_TIMEOUT_SECONDS = 30.0
+_STATEMENT_CACHE_SIZE = 256
+
+# Trade lists, equity levels, cached results and sweep full results are
+# stored as zlib-compressed compact JSON blobs (NumPy arrays are accepted).
+# Rows written before that are TEXT and still read as plain JSON.
+_COMPRESSION_LEVEL = 6
+# Completed jobs pruned per transaction, so a large backlog does not hold
+# the write lock for long.
+_PRUNE_BATCH_SIZE = 200
+
+
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _pack_payload(data) -> bytes:
+    return zlib.compress(encoding.dumps(data), _COMPRESSION_LEVEL)
+
+
+def _unpack_payload(value: bytes | str):
+    if isinstance(value, bytes):
+        value = zlib.decompress(value)
+    return encoding.loads(value)
+
+
+def _timed(method):
+    """Record the call's latency in ``backtest_repository_query_seconds``."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            REPOSITORY_QUERY_SECONDS.observe(time.perf_counter() - started, method=name)
+
+    return wrapper
+
+
 class BacktestRepository:
     def __init__(self, db_path: Path = DATABASE_PATH) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        """Return this thread's pooled connection, opening it on first use.
+
+        Connections are kept per thread (sqlite3 objects must not be shared
+        across threads) and per process, so a forked child never reuses its
+        parent's handle. ``with conn:`` still scopes each transaction.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=_BUSY_TIMEOUT_SECONDS,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
         conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        with self._connections_lock:
+            self._connections.append(conn)
         return conn
 
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Owned by another thread; it is released when that thread exits.
+                pass
+        self._local = threading.local()
+
     def _init_db(self) -> None:
         with self._connect() as conn:
+            # Pages freed by pruning are returned to the OS by compact(). This
+            # only takes effect on a new file; compact() converts older ones.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS backtests (
@@ -38,9 +147,180 @@ class BacktestRepository:
                 )
                 """
             )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sweeps (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request_json TEXT NOT NULL,
+                    rank_by TEXT NOT NULL,
+                    total_runs INTEGER NOT NULL,
+                    completed_runs INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sweep_results (
+                    sweep_id TEXT NOT NULL,
+                    run_index INTEGER NOT NULL,
+                    params_json TEXT NOT NULL,
+                    final_value REAL,
+                    net_profit REAL,
+                    total_return_pct REAL,
+                    max_drawdown_pct REAL,
+                    sharpe_ratio REAL,
+                    total_trades INTEGER,
+                    win_rate_pct REAL,
+                    error TEXT,
+                    result_json TEXT,
+                    PRIMARY KEY (sweep_id, run_index)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    result_json TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    last_used_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_lru ON result_cache (last_used_at)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS equity_levels (
+                    backtest_id TEXT NOT NULL,
+                    points INTEGER NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    data_json TEXT NOT NULL,
+                    PRIMARY KEY (backtest_id, points)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_trades (
+                    backtest_id TEXT PRIMARY KEY,
+                    trades_json TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS walk_forwards (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request_json TEXT NOT NULL,
+                    rank_by TEXT NOT NULL,
+                    total_runs INTEGER NOT NULL,
+                    completed_runs INTEGER NOT NULL DEFAULT 0,
+                    windows_json TEXT NOT NULL DEFAULT '[]',
+                    result_json TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_montecarlo (
+                    backtest_id TEXT NOT NULL,
+                    params_key TEXT NOT NULL,
+                    result_json TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (backtest_id, params_key)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_progress (
+                    backtest_id TEXT PRIMARY KEY,
+                    bars_processed INTEGER NOT NULL,
+                    total_bars INTEGER NOT NULL,
+                    current_date TEXT,
+                    trades INTEGER NOT NULL,
+                    equity REAL,
+                    elapsed_seconds REAL NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_timings (
+                    backtest_id TEXT PRIMARY KEY,
+                    config_seconds REAL,
+                    feed_load_seconds REAL,
+                    run_seconds REAL,
+                    serialize_seconds REAL,
+                    persist_seconds REAL,
+                    total_seconds REAL NOT NULL,
+                    bars INTEGER,
+                    bars_per_second REAL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_profiles (
+                    backtest_id TEXT PRIMARY KEY,
+                    stats BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_queue (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    backtest_id TEXT NOT NULL UNIQUE,
+                    batch_id TEXT,
+                    state TEXT NOT NULL,
+                    worker_id TEXT,
+                    lease_id TEXT,
+                    lease_expires_at REAL,
+                    heartbeat_at TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    enqueued_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_queue_state ON job_queue (state, seq)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_batches (
+                    id TEXT PRIMARY KEY,
+                    total_runs INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS backtest_batch_jobs (
+                    batch_id TEXT NOT NULL,
+                    run_index INTEGER NOT NULL,
+                    backtest_id TEXT NOT NULL,
+                    PRIMARY KEY (batch_id, run_index)
+                )
+                """
+            )
             conn.commit()
 
-    def create_job(self, job_id: str, request_data: dict) -> None:
+    @_timed
+    def create_job(self, job_id: str, request_data: dict, enqueue: bool = False) -> None:
+        """Insert a ``queued`` job; ``enqueue`` also adds it to ``job_queue`` for a worker to claim."""
         now = utc_now_iso()
         with self._connect() as conn:
             conn.execute(
@@ -50,37 +330,483 @@ class BacktestRepository:
                 """,
                 (job_id, "queued", json.dumps(request_data), now, now),
             )
+            if enqueue:
+                conn.execute(
+                    "INSERT INTO job_queue (backtest_id, state, enqueued_at) VALUES (?, 'waiting', ?)",
+                    (job_id, now),
+                )
             conn.commit()
 
-    def update_status(self, job_id: str, status: str, error: str | None = None) -> None:
+    @_timed
+    def create_batch(self, batch_id: str, jobs: list[tuple[str, dict]], queue_order: list[str]) -> None:
+        """Insert a batch and all of its ``(job_id, request_data)`` jobs in one transaction.
+
+        The jobs in ``queue_order`` are enqueued in that order; the others
+        (served from the result cache) are not.
+        """
         now = utc_now_iso()
         with self._connect() as conn:
             conn.execute(
-                "UPDATE backtests SET status = ?, error = ?, updated_at = ? WHERE id = ?",
-                (status, error, now, job_id),
+                "INSERT INTO backtest_batches (id, total_runs, created_at) VALUES (?, ?, ?)",
+                (batch_id, len(jobs), now),
+            )
+            conn.executemany(
+                """
+                INSERT INTO backtests (id, status, request_json, result_json, error, created_at, updated_at)
+                VALUES (?, ?, ?, NULL, NULL, ?, ?)
+                """,
+                [(job_id, "queued", json.dumps(request_data), now, now) for job_id, request_data in jobs],
+            )
+            conn.executemany(
+                "INSERT INTO backtest_batch_jobs (batch_id, run_index, backtest_id) VALUES (?, ?, ?)",
+                [(batch_id, run_index, job_id) for run_index, (job_id, _) in enumerate(jobs)],
+            )
+            conn.executemany(
+                "INSERT INTO job_queue (backtest_id, batch_id, state, enqueued_at) VALUES (?, ?, 'waiting', ?)",
+                [(job_id, batch_id, now) for job_id in queue_order],
+            )
+            conn.commit()
+
+    @_timed
+    def get_batch(self, batch_id: str) -> dict | None:
+        """The batch row plus the status of each job, in submission order."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, total_runs, created_at FROM backtest_batches WHERE id = ?", (batch_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            jobs = conn.execute(
+                """
+                SELECT j.run_index, b.id, b.status, b.error, b.created_at, b.updated_at
+                FROM backtest_batch_jobs j JOIN backtests b ON b.id = j.backtest_id
+                WHERE j.batch_id = ?
+                ORDER BY j.run_index
+                """,
+                (batch_id,),
+            ).fetchall()
+        return {**dict(row), "jobs": [dict(job) for job in jobs]}
+
+    @staticmethod
+    def _runner_owns(job_id: str, lease_id: str | None) -> tuple[str, tuple]:
+        """``WHERE`` clause matching a job only while the runner writing to it still owns it.
+
+        A job that was cancelled or already finished never matches; with a
+        ``lease_id`` the lease must also still be held (not expired and requeued).
+        """
+        if lease_id is None:
+            return "id = ? AND status IN ('queued', 'running')", (job_id,)
+        return (
+            """
+            id = ? AND status = 'running' AND EXISTS (
+                SELECT 1 FROM job_queue WHERE backtest_id = backtests.id AND lease_id = ? AND state = 'claimed'
+            )
+            """,
+            (job_id, lease_id),
+        )
+
+    @_timed
+    def update_status(self, job_id: str, status: str, error: str | None = None, lease_id: str | None = None) -> bool:
+        """Finish a job as ``status``; False (nothing written) when the runner no longer owns it."""
+        now = utc_now_iso()
+        owns, params = self._runner_owns(job_id, lease_id)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE backtests SET status = ?, error = ?, updated_at = ? WHERE {owns}",
+                (status, error, now, *params),
+            )
+            conn.commit()
+        return cursor.rowcount == 1
+
+    @_timed
+    def start_job(self, job_id: str) -> bool:
+        """Move a queued job to ``running``; False when it was cancelled (or already taken)."""
+        now = utc_now_iso()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE backtests SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (now, job_id),
             )
             conn.commit()
+        return cursor.rowcount == 1
 
-    def save_result(self, job_id: str, result_data: dict) -> None:
+    @_timed
+    def cancel_job(self, job_id: str) -> bool:
+        """Mark a queued or running job ``cancelled``; False when it had already finished."""
         now = utc_now_iso()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE backtests SET status = 'cancelled', error = 'Cancelled by request', updated_at = ?
+                WHERE id = ? AND status IN ('queued', 'running')
+                """,
+                (now, job_id),
+            )
+            # A claimed job's worker sees the status and stops on its own.
+            conn.execute("UPDATE job_queue SET state = 'done' WHERE backtest_id = ?", (job_id,))
+            conn.commit()
+        return cursor.rowcount == 1
+
+    @_timed
+    def claim_next_job(self, worker_id: str, lease_seconds: float) -> dict | None:
+        """Atomically take the oldest waiting job and mark it ``running``.
+
+        Returns ``{"id", "request", "lease_id", "attempts"}``; the lease must
+        be renewed with ``heartbeat`` before it expires or the job is requeued.
+        """
+        lease_id = uuid.uuid4().hex
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            claimed = conn.execute(
+                """
+                UPDATE job_queue
+                SET state = 'claimed', worker_id = ?, lease_id = ?, lease_expires_at = ?, heartbeat_at = ?,
+                    attempts = attempts + 1
+                WHERE seq = (SELECT seq FROM job_queue WHERE state = 'waiting' ORDER BY seq LIMIT 1)
+                RETURNING backtest_id, attempts
+                """,
+                (worker_id, lease_id, time.time() + lease_seconds, now),
+            ).fetchone()
+            if claimed is None:
+                conn.commit()
+                return None
+            job_id = claimed["backtest_id"]
+            conn.execute(
+                "UPDATE backtests SET status = 'running', error = NULL, updated_at = ? WHERE id = ?", (now, job_id)
+            )
+            row = conn.execute("SELECT request_json FROM backtests WHERE id = ?", (job_id,)).fetchone()
+            conn.commit()
+        return {
+            "id": job_id,
+            "request": json.loads(row["request_json"]),
+            "lease_id": lease_id,
+            "attempts": claimed["attempts"],
+        }
+
+    @_timed
+    def heartbeat(self, lease_ids: list[str], lease_seconds: float) -> int:
+        """Extend the given leases; returns how many are still held."""
+        if not lease_ids:
+            return 0
+        with self._connect() as conn:
+            cursor = conn.executemany(
+                """
+                UPDATE job_queue SET lease_expires_at = ?, heartbeat_at = ?
+                WHERE lease_id = ? AND state = 'claimed'
+                """,
+                [(time.time() + lease_seconds, utc_now_iso(), lease_id) for lease_id in lease_ids],
+            )
+            conn.commit()
+        return cursor.rowcount
+
+    @_timed
+    def get_claim(self, job_id: str) -> dict | None:
+        """Status of a job and the lease currently allowed to run it."""
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT b.status, q.lease_id FROM backtests b
+                LEFT JOIN job_queue q ON q.backtest_id = b.id AND q.state = 'claimed'
+                WHERE b.id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    @_timed
+    def finish_job(self, lease_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE job_queue SET state = 'done' WHERE lease_id = ? AND state = 'claimed'", (lease_id,))
+            conn.commit()
+
+    @_timed
+    def expire_lease(self, lease_id: str) -> None:
+        """Give up a lease now (its worker died) so the next ``recover_jobs`` requeues it."""
         with self._connect() as conn:
             conn.execute(
+                "UPDATE job_queue SET lease_expires_at = 0 WHERE lease_id = ? AND state = 'claimed'", (lease_id,)
+            )
+            conn.commit()
+
+    @_timed
+    def recover_jobs(self, max_attempts: int) -> int:
+        """Requeue jobs whose lease expired; fail those out of attempts.
+
+        Returns the number of jobs put back in the queue.
+        """
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute(
                 """
+                SELECT q.backtest_id, q.attempts, q.worker_id, b.status FROM job_queue q
+                JOIN backtests b ON b.id = q.backtest_id
+                WHERE q.state = 'claimed' AND q.lease_expires_at < ?
+                """,
+                (time.time(),),
+            ).fetchall()
+            requeued = 0
+            for row in expired:
+                job_id = row["backtest_id"]
+                if row["status"] != "running":
+                    conn.execute("UPDATE job_queue SET state = 'done' WHERE backtest_id = ?", (job_id,))
+                elif row["attempts"] < max_attempts:
+                    conn.execute(
+                        "UPDATE job_queue SET state = 'waiting', lease_id = NULL, worker_id = NULL "
+                        "WHERE backtest_id = ?",
+                        (job_id,),
+                    )
+                    conn.execute(
+                        "UPDATE backtests SET status = 'queued', error = ?, updated_at = ? WHERE id = ?",
+                        (f"Requeued after worker {row['worker_id']} stopped responding", now, job_id),
+                    )
+                    requeued += 1
+                else:
+                    conn.execute("UPDATE job_queue SET state = 'done' WHERE backtest_id = ?", (job_id,))
+                    conn.execute(
+                        "UPDATE backtests SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                        (f"Worker lost on all {row['attempts']} attempts", now, job_id),
+                    )
+            conn.commit()
+        return requeued
+
+    @_timed
+    def enqueue_orphans(self) -> int:
+        """Queue ``queued``/``running`` jobs that have no queue row (left by an older version)."""
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE backtests SET status = 'queued', updated_at = ?
+                WHERE status = 'running' AND id NOT IN (SELECT backtest_id FROM job_queue)
+                """,
+                (now,),
+            )
+            cursor = conn.execute(
+                """
+                INSERT INTO job_queue (backtest_id, state, enqueued_at)
+                SELECT id, 'waiting', ? FROM backtests
+                WHERE status = 'queued' AND id NOT IN (SELECT backtest_id FROM job_queue)
+                ORDER BY created_at
+                """,
+                (now,),
+            )
+            conn.commit()
+        return cursor.rowcount
+
+    @_timed
+    def fail_interrupted_runs(self) -> int:
+        """Fail sweeps and walk-forwards left ``queued``/``running``; their runs lived in a process that is gone."""
+        now = utc_now_iso()
+        failed = 0
+        with self._connect() as conn:
+            for table in ("sweeps", "walk_forwards"):
+                cursor = conn.execute(
+                    f"""
+                    UPDATE {table} SET status = 'failed', error = 'Interrupted by a restart', updated_at = ?
+                    WHERE status IN ('queued', 'running')
+                    """,
+                    (now,),
+                )
+                failed += cursor.rowcount
+            conn.commit()
+        return failed
+
+    @_timed
+    def queue_counts(self) -> dict[str, int]:
+        """Jobs waiting (``batch_waiting`` of them from batches) and claimed by a worker."""
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT COALESCE(SUM(state = 'waiting'), 0) AS waiting,
+                       COALESCE(SUM(state = 'waiting' AND batch_id IS NOT NULL), 0) AS batch_waiting,
+                       COALESCE(SUM(state = 'claimed'), 0) AS claimed
+                FROM job_queue WHERE state != 'done'
+                """
+            ).fetchone()
+        return dict(row)
+
+    @_timed
+    def save_result(
+        self,
+        job_id: str,
+        result_data: dict,
+        equity_levels: list[dict] | None = None,
+        lease_id: str | None = None,
+    ) -> bool:
+        """Store a completed result split by access pattern.
+
+        ``backtests.result_json`` only keeps the summary metrics; the trade
+        list goes to ``backtest_trades`` (columnar, as ``trade_columns``
+        builds it) and the equity curve lives in ``equity_levels`` (its
+        largest level is full resolution).
+
+        Nothing is written, and False is returned, when the job was cancelled
+        or its ``lease_id`` was lost meanwhile. Otherwise the lease is released
+        in the same transaction.
+        """
+        now = utc_now_iso()
+        summary = {key: value for key, value in result_data.items() if key not in PAYLOAD_FIELDS}
+        owns, params = self._runner_owns(job_id, lease_id)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"""
                 UPDATE backtests
                 SET status = ?, result_json = ?, error = NULL, updated_at = ?
-                WHERE id = ?
+                WHERE {owns}
                 """,
-                ("completed", json.dumps(result_data), now, job_id),
+                ("completed", json.dumps(summary), now, *params),
             )
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return False
+            if lease_id is not None:
+                conn.execute("UPDATE job_queue SET state = 'done' WHERE lease_id = ?", (lease_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO backtest_trades (backtest_id, trades_json) VALUES (?, ?)",
+                (job_id, _pack_payload(result_data.get("trade_list", []))),
+            )
+            if equity_levels:
+                self._insert_equity_levels(conn, job_id, equity_levels)
             conn.commit()
+        return True
+
+    @staticmethod
+    def _insert_equity_levels(conn: sqlite3.Connection, owner_id: str, equity_levels: list[dict]) -> None:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO equity_levels (backtest_id, points, start_ms, end_ms, data_json)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    owner_id,
+                    level["points"],
+                    level["start_ms"],
+                    level["end_ms"],
+                    _pack_payload({"t": level["t"], "v": level["v"]}),
+                )
+                for level in equity_levels
+            ],
+        )
+
+    @_timed
+    def get_status(self, job_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, error, created_at, updated_at FROM backtests WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    @_timed
+    def update_progress(self, job_id: str, progress: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO backtest_progress (
+                    backtest_id, bars_processed, total_bars, current_date, trades, equity, elapsed_seconds, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job_id,
+                    progress["bars_processed"],
+                    progress["total_bars"],
+                    progress["current_date"],
+                    progress["trades"],
+                    progress["equity"],
+                    progress["elapsed_seconds"],
+                    utc_now_iso(),
+                ),
+            )
+            conn.commit()
+
+    @_timed
+    def get_live_statuses(self, job_ids: list[str]) -> dict[str, dict]:
+        """Status plus latest progress report of each job, in a single read; unknown ids are left out."""
+        if not job_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in job_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT b.id, b.status, b.error, b.updated_at,
+                       p.bars_processed, p.total_bars, p.current_date, p.trades, p.equity, p.elapsed_seconds
+                FROM backtests b
+                LEFT JOIN backtest_progress p ON p.backtest_id = b.id
+                WHERE b.id IN ({placeholders})
+                """,
+                job_ids,
+            ).fetchall()
+        return {row["id"]: dict(row) for row in rows}
+
+    @_timed
+    def get_trades(self, job_id: str) -> dict[str, list] | list[dict] | None:
+        """Stored trade list: columns, or one dict per trade for results saved by older versions."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT trades_json FROM backtest_trades WHERE backtest_id = ?", (job_id,)).fetchone()
+        return _unpack_payload(row["trades_json"]) if row is not None else None
+
+    @_timed
+    def get_full_equity_level(self, job_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data_json FROM equity_levels WHERE backtest_id = ? ORDER BY points DESC LIMIT 1",
+                (job_id,),
+            ).fetchone()
+        return _unpack_payload(row["data_json"]) if row is not None else None
 
+    @_timed
+    def list_equity_levels(self, job_id: str) -> list[dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT points, start_ms, end_ms FROM equity_levels WHERE backtest_id = ? ORDER BY points",
+                (job_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @_timed
+    def get_equity_level(self, job_id: str, points: int) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data_json FROM equity_levels WHERE backtest_id = ? AND points = ?",
+                (job_id, points),
+            ).fetchone()
+        return _unpack_payload(row["data_json"]) if row is not None else None
+
+    @_timed
     def get_job(self, job_id: str) -> dict | None:
+        """Return the job with its summary result; heavy payloads are not read."""
+        phase_columns = ", ".join(f"t.{phase}_seconds" for phase in TIMING_PHASES)
         with self._connect() as conn:
-            row = conn.execute("SELECT * FROM backtests WHERE id = ?", (job_id,)).fetchone()
+            row = conn.execute(
+                f"""
+                SELECT b.id, b.status, b.request_json, b.result_json, b.error, b.created_at, b.updated_at,
+                       t.total_seconds, t.bars, t.bars_per_second, {phase_columns}, q.attempts
+                FROM backtests b
+                LEFT JOIN backtest_timings t ON t.backtest_id = b.id
+                LEFT JOIN job_queue q ON q.backtest_id = b.id
+                WHERE b.id = ?
+                """,
+                (job_id,),
+            ).fetchone()
 
         if row is None:
             return None
 
+        timings = None
+        if row["total_seconds"] is not None:
+            timings = {
+                "phases": {
+                    phase: row[f"{phase}_seconds"] for phase in TIMING_PHASES if row[f"{phase}_seconds"] is not None
+                },
+                "total_seconds": row["total_seconds"],
+                "bars": row["bars"],
+                "bars_per_second": row["bars_per_second"],
+            }
+
         return {
             "id": row["id"],
             "status": row["status"],
@@ -89,4 +815,398 @@ class BacktestRepository:
             "error": row["error"],
             "created_at": row["created_at"],
             "updated_at": row["updated_at"],
+            "timings": timings,
+            "attempts": row["attempts"],
         }
+
+    @_timed
+    def save_timings(self, job_id: str, timings: dict) -> None:
+        phases = timings.get("phases", {})
+        with self._connect() as conn:
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO backtest_timings (
+                    backtest_id, {", ".join(f"{phase}_seconds" for phase in TIMING_PHASES)},
+                    total_seconds, bars, bars_per_second, created_at
+                )
+                VALUES ({", ".join("?" * (len(TIMING_PHASES) + 5))})
+                """,
+                (
+                    job_id,
+                    *(phases.get(phase) for phase in TIMING_PHASES),
+                    timings["total_seconds"],
+                    timings.get("bars"),
+                    timings.get("bars_per_second"),
+                    utc_now_iso(),
+                ),
+            )
+            conn.commit()
+
+    @_timed
+    def save_profile(self, job_id: str, stats: bytes) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO backtest_profiles (backtest_id, stats, created_at) VALUES (?, ?, ?)",
+                (job_id, stats, utc_now_iso()),
+            )
+            conn.commit()
+
+    @_timed
+    def get_profile(self, job_id: str) -> bytes | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT stats FROM backtest_profiles WHERE backtest_id = ?", (job_id,)).fetchone()
+        return row["stats"] if row is not None else None
+
+    @_timed
+    def get_monte_carlo(self, job_id: str, params_key: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result_json FROM backtest_montecarlo WHERE backtest_id = ? AND params_key = ?",
+                (job_id, params_key),
+            ).fetchone()
+        return json.loads(row["result_json"]) if row is not None else None
+
+    @_timed
+    def save_monte_carlo(self, job_id: str, params_key: str, result_data: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO backtest_montecarlo (backtest_id, params_key, result_json, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (job_id, params_key, json.dumps(result_data), utc_now_iso()),
+            )
+            conn.commit()
+
+    @_timed
+    def get_cached_result(self, cache_key: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT result_json FROM result_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE result_cache SET last_used_at = ? WHERE cache_key = ?",
+                (utc_now_iso(), cache_key),
+            )
+            conn.commit()
+        return _unpack_payload(row["result_json"])
+
+    @_timed
+    def put_cached_result(self, cache_key: str, result_data: dict, max_bytes: int) -> None:
+        now = utc_now_iso()
+        result_json = _pack_payload(result_data)
+        size_bytes = len(result_json)
+        if size_bytes > max_bytes:
+            return
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO result_cache (cache_key, result_json, size_bytes, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (cache_key, result_json, size_bytes, now, now),
+            )
+            # Evict least recently used entries until the cache fits again.
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM result_cache").fetchone()[0]
+            if total > max_bytes:
+                rows = conn.execute(
+                    "SELECT cache_key, size_bytes FROM result_cache WHERE cache_key != ? ORDER BY last_used_at",
+                    (cache_key,),
+                ).fetchall()
+                evicted = []
+                for row in rows:
+                    if total <= max_bytes:
+                        break
+                    evicted.append((row["cache_key"],))
+                    total -= row["size_bytes"]
+                conn.executemany("DELETE FROM result_cache WHERE cache_key = ?", evicted)
+            conn.commit()
+
+    @_timed
+    def prune_payloads(self, finished_before: str | None, keep_latest: int) -> dict[str, int]:
+        """Drop the heavy payloads of old results, keeping their summaries.
+
+        A completed job finished before ``finished_before`` (ISO timestamp) or
+        outside the ``keep_latest`` most recent ones (0 keeps all) loses its
+        trade list, equity levels, profile and Monte Carlo results; its summary
+        is marked ``payloads_pruned``. Sweeps finished before
+        ``finished_before`` lose their stored full results, walk-forwards
+        their stitched equity curve.
+        """
+        with self._connect() as conn:
+            job_ids: set[str] = set()
+            if finished_before is not None:
+                rows = conn.execute(
+                    """
+                    SELECT b.id FROM backtests b JOIN backtest_trades t ON t.backtest_id = b.id
+                    WHERE b.status = 'completed' AND b.updated_at < ?
+                    """,
+                    (finished_before,),
+                ).fetchall()
+                job_ids.update(row["id"] for row in rows)
+            if keep_latest > 0:
+                rows = conn.execute(
+                    """
+                    SELECT b.id FROM backtests b JOIN backtest_trades t ON t.backtest_id = b.id
+                    WHERE b.status = 'completed'
+                    ORDER BY b.updated_at DESC
+                    LIMIT -1 OFFSET ?
+                    """,
+                    (keep_latest,),
+                ).fetchall()
+                job_ids.update(row["id"] for row in rows)
+
+        pending = sorted(job_ids)
+        for start in range(0, len(pending), _PRUNE_BATCH_SIZE):
+            params = [(job_id,) for job_id in pending[start : start + _PRUNE_BATCH_SIZE]]
+            with self._connect() as conn:
+                for table in ("backtest_trades", "equity_levels", "backtest_profiles", "backtest_montecarlo"):
+                    conn.executemany(f"DELETE FROM {table} WHERE backtest_id = ?", params)
+                conn.executemany(
+                    "UPDATE backtests SET result_json = json_set(result_json, '$.payloads_pruned', json('true')) "
+                    "WHERE id = ?",
+                    params,
+                )
+                conn.commit()
+
+        sweep_results = walk_forward_levels = 0
+        if finished_before is not None:
+            with self._connect() as conn:
+                sweep_results = conn.execute(
+                    """
+                    UPDATE sweep_results SET result_json = NULL
+                    WHERE result_json IS NOT NULL AND sweep_id IN (
+                        SELECT id FROM sweeps WHERE status IN ('completed', 'failed') AND updated_at < ?
+                    )
+                    """,
+                    (finished_before,),
+                ).rowcount
+                walk_forward_levels = conn.execute(
+                    """
+                    DELETE FROM equity_levels WHERE backtest_id IN (
+                        SELECT id FROM walk_forwards WHERE status IN ('completed', 'failed') AND updated_at < ?
+                    )
+                    """,
+                    (finished_before,),
+                ).rowcount
+                conn.commit()
+        return {"jobs": len(pending), "sweep_results": sweep_results, "walk_forward_levels": walk_forward_levels}
+
+    @_timed
+    def compact(self) -> int:
+        """Hand free pages back to the OS and truncate the WAL; returns the pages freed.
+
+        A file created before ``auto_vacuum=INCREMENTAL`` is converted here
+        with one full ``VACUUM``, which holds the database for its duration.
+        """
+        with self._connect() as conn:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            # Each step frees one page, so the pragma has to be read to the end.
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return free_pages
+
+    @_timed
+    def create_sweep(self, sweep_id: str, request_data: dict, rank_by: str, total_runs: int) -> None:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO sweeps (id, status, request_json, rank_by, total_runs, completed_runs, error, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 0, NULL, ?, ?)
+                """,
+                (sweep_id, "queued", json.dumps(request_data), rank_by, total_runs, now, now),
+            )
+            conn.commit()
+
+    @_timed
+    def update_sweep_status(self, sweep_id: str, status: str, error: str | None = None) -> None:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sweeps SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, now, sweep_id),
+            )
+            conn.commit()
+
+    @_timed
+    def add_sweep_results(self, sweep_id: str, rows: list[dict]) -> None:
+        if not rows:
+            return
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO sweep_results (
+                    sweep_id, run_index, params_json, final_value, net_profit, total_return_pct,
+                    max_drawdown_pct, sharpe_ratio, total_trades, win_rate_pct, error, result_json
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+                """,
+                [
+                    (
+                        sweep_id,
+                        row["run_index"],
+                        json.dumps(row["params"]),
+                        row.get("final_value"),
+                        row.get("net_profit"),
+                        row.get("total_return_pct"),
+                        row.get("max_drawdown_pct"),
+                        row.get("sharpe_ratio"),
+                        row.get("total_trades"),
+                        row.get("win_rate_pct"),
+                        row.get("error"),
+                    )
+                    for row in rows
+                ],
+            )
+            conn.execute(
+                "UPDATE sweeps SET completed_runs = completed_runs + ?, updated_at = ? WHERE id = ?",
+                (len(rows), now, sweep_id),
+            )
+            conn.commit()
+
+    @_timed
+    def save_sweep_full_results(self, sweep_id: str, results: dict[int, dict]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE sweep_results SET result_json = ? WHERE sweep_id = ? AND run_index = ?",
+                [(_pack_payload(result), sweep_id, run_index) for run_index, result in results.items()],
+            )
+            conn.commit()
+
+    @_timed
+    def get_sweep(self, sweep_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT id, status, rank_by, total_runs, completed_runs, error, created_at, updated_at
+                FROM sweeps WHERE id = ?
+                """,
+                (sweep_id,),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    @_timed
+    def list_sweep_results(
+        self,
+        sweep_id: str,
+        sort_by: str,
+        descending: bool,
+        limit: int,
+        offset: int = 0,
+    ) -> list[dict]:
+        if sort_by not in SWEEP_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+        direction = "DESC" if descending else "ASC"
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT run_index, params_json, final_value, net_profit, total_return_pct, max_drawdown_pct,
+                       sharpe_ratio, total_trades, win_rate_pct, error, result_json IS NOT NULL AS has_full_result
+                FROM sweep_results
+                WHERE sweep_id = ?
+                ORDER BY {sort_by} IS NULL, {sort_by} {direction}, run_index
+                LIMIT ? OFFSET ?
+                """,
+                (sweep_id, limit, offset),
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            item = dict(row)
+            item["params"] = json.loads(item.pop("params_json"))
+            item["has_full_result"] = bool(item["has_full_result"])
+            results.append(item)
+        return results
+
+    @_timed
+    def get_sweep_full_result(self, sweep_id: str, run_index: int) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result_json FROM sweep_results WHERE sweep_id = ? AND run_index = ?",
+                (sweep_id, run_index),
+            ).fetchone()
+        if row is None or not row["result_json"]:
+            return None
+        return _unpack_payload(row["result_json"])
+
+    @_timed
+    def create_walk_forward(self, wf_id: str, request_data: dict, rank_by: str, total_runs: int) -> None:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO walk_forwards (id, status, request_json, rank_by, total_runs, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (wf_id, "queued", json.dumps(request_data), rank_by, total_runs, now, now),
+            )
+            conn.commit()
+
+    @_timed
+    def update_walk_forward_status(self, wf_id: str, status: str, error: str | None = None) -> None:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE walk_forwards SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, now, wf_id),
+            )
+            conn.commit()
+
+    @_timed
+    def update_walk_forward_progress(self, wf_id: str, completed_runs: int, windows: list[dict]) -> None:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE walk_forwards SET completed_runs = ?, windows_json = ?, updated_at = ? WHERE id = ?",
+                (completed_runs, json.dumps(windows), now, wf_id),
+            )
+            conn.commit()
+
+    @_timed
+    def save_walk_forward_result(
+        self,
+        wf_id: str,
+        summary: dict,
+        windows: list[dict],
+        equity_levels: list[dict] | None = None,
+    ) -> None:
+        """Complete a walk-forward; its stitched equity goes to ``equity_levels``."""
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE walk_forwards
+                SET status = ?, result_json = ?, windows_json = ?, completed_runs = total_runs, error = NULL,
+                    updated_at = ?
+                WHERE id = ?
+                """,
+                ("completed", json.dumps(summary), json.dumps(windows), now, wf_id),
+            )
+            if equity_levels:
+                self._insert_equity_levels(conn, wf_id, equity_levels)
+            conn.commit()
+
+    @_timed
+    def get_walk_forward(self, wf_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT id, status, rank_by, total_runs, completed_runs, windows_json, result_json, error,
+                       created_at, updated_at
+                FROM walk_forwards WHERE id = ?
+                """,
+                (wf_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        item = dict(row)
+        item["windows"] = json.loads(item.pop("windows_json"))
+        result_json = item.pop("result_json")
+        item["result"] = json.loads(result_json) if result_json else None
+        return item
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 import os
-import sys
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .core.settings import DEFAULT_ALLOWED_ORIGINS
 from .routers.backtests import router as backtest_router
+from .routers.metrics import router as metrics_router
+from .services.container import get_job_executor, shutdown_services
+from .services.maintenance import start_maintenance, stop_maintenance
+from .services.warmup import start_warmup, warmup_status
 
 
-app = FastAPI(title="XAUUSD Backtest API", version="1.0.0")
-print("PYTHONPATH:", sys.path)
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    executor = get_job_executor()
+    executor.start()
+    start_warmup(executor)
+    start_maintenance(executor.repository)
+    yield
+    stop_maintenance()
+    shutdown_services()
+
+
+app = FastAPI(title="XAUUSD Backtest API", version="1.0.0", lifespan=lifespan)
 
 origins_env = os.getenv("BACKEND_CORS_ORIGINS", "")
 if origins_env.strip():
@@ -29,8 +44,12 @@ app.add_middleware(
 
 
 @app.get("/health")
-def health() -> dict:
-    return {"status": "ok"}
+def health():
+    warmup = warmup_status()
+    if not warmup["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": warmup})
+    return {"status": "ok", "warmup": warmup}
 
 
 app.include_router(backtest_router)
+app.include_router(metrics_router)
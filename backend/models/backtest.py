@@ -4,6 +4,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+import numpy as np
+
 
 @dataclass
 class BacktestConfig:
@@ -17,6 +19,8 @@ class BacktestConfig:
     run_dual_cerebro: bool
     use_forex_position_calc: bool
     strategy_params: dict[str, Any] = field(default_factory=dict)
+    dual_execution: str = "sequential"
+    engine: str = "backtrader"
 
 
 @dataclass
@@ -34,8 +38,11 @@ class BacktestResult:
     sharpe_ratio: float | None
     total_trades: int
     win_rate_pct: float
-    trade_list: list[dict[str, Any]]
-    equity_curve: list[dict[str, Any]]
+    # Trades as columns (see result_serializer.TRADE_FIELDS), times in epoch milliseconds.
+    trade_list: dict[str, list]
+    # Equity curve as columns: epoch milliseconds and portfolio values.
+    equity_timestamps: np.ndarray
+    equity_values: np.ndarray
     strategy_params: dict[str, Any]
 
 
@@ -48,5 +55,14 @@ class ExecutionArtifacts:
     used_params: dict[str, Any]
 
 
+@dataclass
+class LegResult:
+    final_value: float
+    analyzers: dict[str, Any]
+    trade_reports: list[dict[str, Any]]
+    timestamps: list[datetime]
+    portfolio_values: list[float]
+
+
 def datetime_to_iso(value: datetime | None) -> str | None:
     return value.isoformat() if value else None
@@ -1,33 +1,103 @@
 from __future__ import annotations
 
 import asyncio
+import json
+from collections.abc import AsyncIterator
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
+from ..backtest_engine.equity_levels import (
+    arrays_to_equity_curve,
+    choose_level,
+    equity_arrays,
+    equity_rows,
+    level_arrays,
+    parse_timestamp_ms,
+    slice_level,
+)
 from ..backtest_engine.original_strategy import get_strategy_default_params
-from ..schemas.backtest import BacktestRequest, BacktestResponse
-from ..services.container import get_backtest_service
+from ..backtest_engine.result_serializer import trade_columns, trade_rows
+from ..core.encoding import FastJSONResponse
+from ..database.repository import SWEEP_SORT_COLUMNS
+from ..schemas.backtest import (
+    BacktestRequest,
+    BacktestResponse,
+    BatchRequest,
+    BatchResponse,
+    MonteCarloRequest,
+    SweepRequest,
+    SweepResponse,
+    WalkForwardRequest,
+    WalkForwardResponse,
+)
+from ..services.container import (
+    get_backtest_service,
+    get_batch_service,
+    get_job_event_hub,
+    get_job_executor,
+    get_sweep_service,
+    get_walk_forward_service,
+)
+from ..services.job_events import EVENTS_POLL_SECONDS
+from ..services.profiling import profile_table
+from ..services.sweep_service import ASCENDING_METRICS
 
 
 router = APIRouter(prefix="/api/backtest", tags=["backtest"])
 
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "timed_out"}
+# Seconds between keep-alive comments when nothing changed; the shared
+# JobEventHub reads the database every EVENTS_POLL_SECONDS for all streams.
+EVENTS_HEARTBEAT_SECONDS = 15.0
+
+# "rows" returns one object per trade or equity point; "columnar" returns one
+# list per field ({"t": [epoch ms], "v": [...]} for equity), encoded with the
+# fast JSON encoder.
+ResultFormat = Literal["rows", "columnar"]
+
+# Sweeps and walk-forwards running in the background; the event loop only keeps
+# weak references to tasks, so these hold them until they finish.
+_background_tasks: set[asyncio.Task] = set()
+
 
 @router.get("/parameters")
 def get_parameters() -> dict:
-    return {"strategy_params": get_strategy_default_params()}
+    from ..backtest_engine.runner import available_engines
+
+    return {"strategy_params": get_strategy_default_params(), "engines": available_engines()}
 
 
 @router.post("/run", response_model=BacktestResponse)
-async def run_backtest(payload: BacktestRequest) -> BacktestResponse:
+def run_backtest(payload: BacktestRequest) -> BacktestResponse:
+    # Plain ``def``: the cache lookup and inserts below hit SQLite, so
+    # FastAPI runs this in its thread pool instead of on the event loop.
     service = get_backtest_service()
-    job_id = service.create_job(payload)
+    executor = get_job_executor()
+    try:
+        service.check_engine(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    cached = service.find_cached_result(payload)
+    if cached is None and not executor.has_capacity():
+        raise HTTPException(status_code=429, detail="Backtest queue is full, retry later")
 
-    async def _run() -> None:
-        await asyncio.to_thread(service.execute_job, job_id, payload)
-
-    asyncio.create_task(_run())
+    job_id = service.create_job(payload, enqueue=cached is None)
+    if cached is not None:
+        service.complete_from_cache(job_id, cached)
+        job = service.get_job(job_id)
+        return BacktestResponse(
+            id=job_id,
+            status=job["status"],
+            created_at=datetime.fromisoformat(job["created_at"]),
+            updated_at=datetime.fromisoformat(job["updated_at"]),
+            result=job["result"],
+            error=None,
+        )
 
+    executor.notify()
     now = datetime.utcnow()
     return BacktestResponse(
         id=job_id,
@@ -39,35 +109,426 @@ async def run_backtest(payload: BacktestRequest) -> BacktestResponse:
     )
 
 
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(payload: BatchRequest) -> BatchResponse:
+    batch_service = get_batch_service()
+    executor = get_job_executor()
+    if not await asyncio.to_thread(executor.has_batch_capacity, len(payload.runs)):
+        raise HTTPException(status_code=429, detail="Backtest queue is full, retry later")
+    try:
+        batch_id = await asyncio.to_thread(batch_service.create_batch, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    executor.notify()
+    return await asyncio.to_thread(get_batch, batch_id)
+
+
+@router.get("/batch/{batch_id}", response_model=BatchResponse)
+def get_batch(batch_id: str, view: Literal["status", "summary", "full"] = "status") -> BatchResponse:
+    """Aggregate status plus every job; ``view`` adds their results like ``GET /{id}``."""
+    service = get_backtest_service()
+    batch = get_batch_service().get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    jobs = []
+    for job in batch["jobs"]:
+        if view != "status" and job["status"] == "completed":
+            job = service.get_job(job["id"], include_payloads=view == "full") or job
+        jobs.append(
+            BacktestResponse(
+                id=job["id"],
+                status=job["status"],
+                created_at=datetime.fromisoformat(job["created_at"]),
+                updated_at=datetime.fromisoformat(job["updated_at"]),
+                error=job["error"],
+                result=job.get("result"),
+                timings=job.get("timings"),
+                attempts=job.get("attempts"),
+            )
+        )
+    return BatchResponse(
+        id=batch["id"],
+        status=batch["status"],
+        total_runs=batch["total_runs"],
+        counts=batch["counts"],
+        created_at=datetime.fromisoformat(batch["created_at"]),
+        updated_at=datetime.fromisoformat(batch["updated_at"]),
+        jobs=jobs,
+    )
+
+
+@router.post("/sweep", response_model=SweepResponse)
+async def run_sweep(payload: SweepRequest) -> SweepResponse:
+    sweep_service = get_sweep_service()
+    try:
+        sweep_id, configs = await asyncio.to_thread(sweep_service.create_sweep, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    _run_in_background(sweep_service.run_sweep, sweep_id, configs, payload.rank_by, payload.top_n)
+
+    now = datetime.utcnow()
+    return SweepResponse(
+        id=sweep_id,
+        status="queued",
+        total_runs=len(configs),
+        completed_runs=0,
+        created_at=now,
+        updated_at=now,
+        rank_by=payload.rank_by,
+    )
+
+
+@router.get("/sweep/{sweep_id}", response_model=SweepResponse)
+def get_sweep(
+    sweep_id: str,
+    sort_by: str | None = None,
+    order: str | None = Query(default=None, pattern="^(asc|desc)$"),
+    limit: int = Query(default=50, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+) -> SweepResponse:
+    repository = get_backtest_service().repository
+    sweep = repository.get_sweep(sweep_id)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+
+    sort_by = sort_by or sweep["rank_by"]
+    if sort_by not in SWEEP_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {sort_by}")
+    descending = (order == "desc") if order else sort_by not in ASCENDING_METRICS
+
+    return SweepResponse(
+        id=sweep["id"],
+        status=sweep["status"],
+        total_runs=sweep["total_runs"],
+        completed_runs=sweep["completed_runs"],
+        created_at=datetime.fromisoformat(sweep["created_at"]),
+        updated_at=datetime.fromisoformat(sweep["updated_at"]),
+        error=sweep["error"],
+        rank_by=sweep["rank_by"],
+        results=repository.list_sweep_results(sweep_id, sort_by, descending, limit, offset),
+    )
+
+
+@router.get("/sweep/{sweep_id}/runs/{run_index}")
+def get_sweep_run(sweep_id: str, run_index: int, format: ResultFormat = "rows"):
+    repository = get_backtest_service().repository
+    result = repository.get_sweep_full_result(sweep_id, run_index)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Full result not stored for this run")
+    if format == "columnar":
+        result["trade_list"] = trade_columns(result.get("trade_list", []))
+        result["equity_curve"] = _columns(*equity_arrays(result.get("equity_curve", [])))
+        return FastJSONResponse(result)
+    result["trade_list"] = trade_rows(result.get("trade_list", []))
+    result["equity_curve"] = equity_rows(result.get("equity_curve", []))
+    return result
+
+
+@router.post("/walk-forward", response_model=WalkForwardResponse)
+async def run_walk_forward(payload: WalkForwardRequest) -> WalkForwardResponse:
+    wf_service = get_walk_forward_service()
+    try:
+        wf_id, windows, candidates = await asyncio.to_thread(wf_service.create_walk_forward, payload)
+    except (ValueError, FileNotFoundError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    _run_in_background(wf_service.run_walk_forward, wf_id, windows, candidates, payload.rank_by)
+
+    now = datetime.utcnow()
+    return WalkForwardResponse(
+        id=wf_id,
+        status="queued",
+        total_runs=len(windows) * (len(candidates) + 1),
+        completed_runs=0,
+        created_at=now,
+        updated_at=now,
+        rank_by=payload.rank_by,
+        windows=windows,
+    )
+
+
+@router.get("/walk-forward/{wf_id}", response_model=WalkForwardResponse)
+def get_walk_forward(wf_id: str) -> WalkForwardResponse:
+    walk_forward = get_backtest_service().repository.get_walk_forward(wf_id)
+    if walk_forward is None:
+        raise HTTPException(status_code=404, detail="Walk-forward not found")
+
+    return WalkForwardResponse(
+        id=walk_forward["id"],
+        status=walk_forward["status"],
+        total_runs=walk_forward["total_runs"],
+        completed_runs=walk_forward["completed_runs"],
+        created_at=datetime.fromisoformat(walk_forward["created_at"]),
+        updated_at=datetime.fromisoformat(walk_forward["updated_at"]),
+        error=walk_forward["error"],
+        rank_by=walk_forward["rank_by"],
+        windows=walk_forward["windows"],
+        result=walk_forward["result"],
+    )
+
+
+@router.get("/walk-forward/{wf_id}/equity-curve")
+def get_walk_forward_equity_curve(
+    wf_id: str,
+    points: int | None = Query(default=None, ge=10, le=100000),
+    from_: str | None = Query(default=None, alias="from"),
+    to: str | None = None,
+    format: ResultFormat = "rows",
+):
+    """Stitched out-of-sample equity, with the same zoom parameters as a single job."""
+    repository = get_backtest_service().repository
+    walk_forward = repository.get_walk_forward(wf_id)
+    if walk_forward is None:
+        raise HTTPException(status_code=404, detail="Walk-forward not found")
+    if walk_forward["status"] != "completed":
+        return _equity_response(wf_id, walk_forward["status"], *equity_arrays([]), format)
+
+    from_ms, to_ms = _parse_range(from_, to)
+    arrays = _read_equity_level(repository, wf_id, points, from_ms, to_ms)
+    timestamps, values = arrays if arrays is not None else equity_arrays([])
+    timestamps, values = slice_level(timestamps, values, from_ms, to_ms, points)
+    return _equity_response(wf_id, walk_forward["status"], timestamps, values, format)
+
+
 @router.get("/{backtest_id}", response_model=BacktestResponse)
-def get_backtest(backtest_id: str) -> BacktestResponse:
+def get_backtest(
+    backtest_id: str,
+    view: Literal["full", "summary"] = "full",
+    format: ResultFormat = "rows",
+):
     service = get_backtest_service()
-    job = service.get_job(backtest_id)
+    job = service.get_job(backtest_id, include_payloads=view == "full", columnar=format == "columnar")
     if job is None:
         raise HTTPException(status_code=404, detail="Backtest not found")
 
-    return BacktestResponse(
+    response = BacktestResponse(
         id=job["id"],
         status=job["status"],
         created_at=datetime.fromisoformat(job["created_at"]),
         updated_at=datetime.fromisoformat(job["updated_at"]),
         error=job["error"],
         result=job["result"],
+        timings=job["timings"],
+        attempts=job["attempts"],
     )
+    if format == "columnar":
+        return FastJSONResponse(response.model_dump())
+    return response
+
+
+@router.delete("/{backtest_id}", response_model=BacktestResponse)
+def cancel_backtest(backtest_id: str) -> BacktestResponse:
+    """Cancel a queued or running job; its worker slot is released right away."""
+    service = get_backtest_service()
+    job = service.repository.get_status(backtest_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    if not service.cancel_job(backtest_id, job["status"]):
+        raise HTTPException(status_code=409, detail=f"Backtest is already {job['status']}")
+    get_job_executor().cancel(backtest_id)
+
+    job = service.repository.get_status(backtest_id)
+    return BacktestResponse(
+        id=job["id"],
+        status=job["status"],
+        created_at=datetime.fromisoformat(job["created_at"]),
+        updated_at=datetime.fromisoformat(job["updated_at"]),
+        error=job["error"],
+    )
+
+
+@router.get("/{backtest_id}/profile")
+def get_profile(
+    backtest_id: str,
+    sort: Literal["cumtime", "tottime", "ncalls"] = "cumtime",
+    limit: int = Query(default=50, ge=1, le=1000),
+    format: Literal["table", "pstats"] = "table",
+):
+    repository = get_backtest_service().repository
+    if repository.get_status(backtest_id) is None:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    stats = repository.get_profile(backtest_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No profile recorded; submit the job with profile=true")
+    if format == "pstats":
+        return Response(
+            content=stats,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{backtest_id}.pstats"'},
+        )
+    return {"id": backtest_id, **profile_table(stats, sort=sort, limit=limit)}
+
+
+@router.get("/{backtest_id}/trades")
+def get_trades(backtest_id: str, format: ResultFormat = "rows"):
+    repository = get_backtest_service().repository
+    job = repository.get_status(backtest_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    trades = repository.get_trades(backtest_id) if job["status"] == "completed" else None
+    if trades is None and job["status"] == "completed":
+        legacy = get_backtest_service().get_job(backtest_id, columnar=True)
+        trades = (legacy.get("result") or {}).get("trade_list", [])
+    if format == "columnar":
+        return FastJSONResponse({"id": backtest_id, "status": job["status"], "trade_list": trade_columns(trades or [])})
+    return {"id": backtest_id, "status": job["status"], "trade_list": trade_rows(trades or [])}
+
+
+@router.post("/{backtest_id}/montecarlo")
+def run_monte_carlo(backtest_id: str, payload: MonteCarloRequest | None = None) -> dict:
+    service = get_backtest_service()
+    job = service.repository.get_status(backtest_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Backtest is {job['status']}, not completed")
+
+    try:
+        result = service.run_monte_carlo(backtest_id, payload or MonteCarloRequest())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"id": backtest_id, **result}
+
+
+def _run_in_background(fn, *args) -> None:
+    task = asyncio.create_task(asyncio.to_thread(fn, *args))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _parse_range(from_: str | None, to: str | None) -> tuple[int | None, int | None]:
+    try:
+        from_ms = parse_timestamp_ms(from_) if from_ else None
+        to_ms = parse_timestamp_ms(to) if to else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {exc}") from exc
+    return from_ms, to_ms
+
+
+def _columns(timestamps, values) -> dict:
+    return {"t": timestamps, "v": values}
+
+
+def _equity_response(owner_id: str, status: str, timestamps, values, format: ResultFormat):
+    if format == "columnar":
+        return FastJSONResponse({"id": owner_id, "status": status, "equity_curve": _columns(timestamps, values)})
+    return {"id": owner_id, "status": status, "equity_curve": arrays_to_equity_curve(timestamps, values)}
+
+
+def _read_equity_level(repository, owner_id: str, points: int | None, from_ms: int | None, to_ms: int | None):
+    levels = repository.list_equity_levels(owner_id)
+    level_points = choose_level(levels, points, from_ms, to_ms) if points else (levels[-1]["points"] if levels else None)
+    level = repository.get_equity_level(owner_id, level_points) if level_points else None
+    return level_arrays(level) if level is not None else None
 
 
 @router.get("/{backtest_id}/equity-curve")
-def get_equity_curve(backtest_id: str) -> dict:
+def get_equity_curve(
+    backtest_id: str,
+    points: int | None = Query(default=None, ge=10, le=100000),
+    from_: str | None = Query(default=None, alias="from"),
+    to: str | None = None,
+    format: ResultFormat = "rows",
+):
     service = get_backtest_service()
-    job = service.get_job(backtest_id)
+    job = service.repository.get_status(backtest_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Backtest not found")
-    if job["status"] != "completed" or not job.get("result"):
-        return {"id": backtest_id, "status": job["status"], "equity_curve": []}
+    if job["status"] != "completed":
+        return _equity_response(backtest_id, job["status"], *equity_arrays([]), format)
+
+    from_ms, to_ms = _parse_range(from_, to)
+    arrays = _read_equity_level(service.repository, backtest_id, points, from_ms, to_ms)
+    if arrays is not None:
+        timestamps, values = arrays
+    else:
+        # Jobs saved before zoom levels existed only have the inline curve.
+        full_job = service.get_job(backtest_id)
+        timestamps, values = equity_arrays((full_job.get("result") or {}).get("equity_curve", []))
+
+    timestamps, values = slice_level(timestamps, values, from_ms, to_ms, points)
+    return _equity_response(backtest_id, job["status"], timestamps, values, format)
+
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _progress_event(live: dict) -> dict | None:
+    if live["bars_processed"] is None:
+        return None
+    done = live["bars_processed"]
+    total = live["total_bars"]
+    elapsed = live["elapsed_seconds"]
+    eta = elapsed * (total - done) / done if done and total >= done else None
     return {
-        "id": backtest_id,
-        "status": job["status"],
-        "equity_curve": job["result"].get("equity_curve", []),
+        "bars_processed": done,
+        "total_bars": total,
+        "percent": round(100.0 * done / total, 2) if total else None,
+        "current_date": live["current_date"],
+        "trades": live["trades"],
+        "equity": live["equity"],
+        "elapsed_seconds": round(elapsed, 3),
+        "eta_seconds": round(eta, 3) if eta is not None else None,
     }
 
+
+async def _job_events(request: Request, backtest_id: str) -> AsyncIterator[str]:
+    hub = get_job_event_hub()
+    queue = hub.subscribe(backtest_id)
+    last_status = None
+    last_progress = None
+    idle = 0.0
+    try:
+        while True:
+            try:
+                live = await asyncio.wait_for(queue.get(), EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                idle += EVENTS_POLL_SECONDS
+                if idle >= EVENTS_HEARTBEAT_SECONDS:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+                if await request.is_disconnected():
+                    return
+                continue
+
+            if live is None:
+                yield _sse("error", {"detail": "Backtest not found"})
+                return
+
+            if live["status"] != last_status:
+                last_status = live["status"]
+                yield _sse("status", {"id": backtest_id, "status": last_status, "error": live["error"]})
+                idle = 0.0
+
+            progress = _progress_event(live)
+            if progress is not None and progress != last_progress:
+                last_progress = progress
+                yield _sse("progress", progress)
+                idle = 0.0
+
+            if last_status in TERMINAL_STATUSES:
+                yield _sse("done", {"id": backtest_id, "status": last_status})
+                return
+    finally:
+        hub.unsubscribe(backtest_id, queue)
+
+
+@router.get("/{backtest_id}/events")
+async def stream_backtest_events(backtest_id: str, request: Request) -> StreamingResponse:
+    """Server-Sent Events feed of a job's status and live progress.
+
+    Emits ``status`` on every status change, ``progress`` whenever the engine
+    reports (bars processed, simulated date, trades, equity, ETA) and a final
+    ``done`` once the job completes or fails.
+    """
+    if await asyncio.to_thread(get_backtest_service().repository.get_status, backtest_id) is None:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    return StreamingResponse(
+        _job_events(request, backtest_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core.metrics import METRICS, resident_memory_bytes
+from ..services.container import get_job_executor
+
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _worker_memory() -> dict[tuple[str, ...], float]:
+    samples = {}
+    for pid in get_job_executor().worker_pids():
+        rss = resident_memory_bytes(pid)
+        if rss is not None:
+            samples[(str(pid),)] = rss
+    return samples
+
+
+def _database_bytes() -> float:
+    # The WAL holds recent writes until the next checkpoint.
+    db_path = str(get_job_executor().repository.db_path)
+    return float(sum(os.path.getsize(path) for path in (db_path, f"{db_path}-wal") if os.path.exists(path)))
+
+
+METRICS.gauge("backtest_queue_depth", "Jobs waiting in the queue.", lambda: get_job_executor().stats()["queued"])
+METRICS.gauge(
+    "backtest_running_jobs", "Jobs claimed by any worker, embedded or standalone.", lambda: get_job_executor().stats()["running"]
+)
+METRICS.gauge("backtest_workers", "Size of the worker pool.", lambda: get_job_executor().max_workers)
+METRICS.gauge("backtest_database_bytes", "Size of the SQLite database file and its WAL.", _database_bytes)
+METRICS.gauge("process_resident_memory_bytes", "Resident memory of the API process.", resident_memory_bytes)
+METRICS.gauge(
+    "backtest_worker_resident_memory_bytes", "Resident memory of each worker process.", _worker_memory, ("pid",)
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -26,7 +26,7 @@ class BacktestRequest(BaseModel):
     model_config = ConfigDict(extra="allow")
 
     symbol: str = "XAUUSD"
-    timeframe: str = "5m"
+    timeframe: Literal["5m", "15m", "1h", "4h", "1d"] = "5m"
     start_date: str | None = None
     end_date: str | None = None
     data_file: str | None = None
@@ -36,7 +36,14 @@ class BacktestRequest(BaseModel):
     pullback_window: int | None = None
     limit_bars: int | None = None
     run_dual_cerebro: bool | None = None
+    dual_execution: Literal["sequential", "parallel"] | None = None
+    # "vectorized" only runs strategies declaring vectorized_rules (see
+    # GET /parameters "engines"); other strategies get a 400.
+    engine: Literal["backtrader", "vectorized"] = "backtrader"
     use_forex_position_calc: bool | None = None
+    use_cache: bool = True
+    profile: bool = False
+    timeout_seconds: float | None = Field(default=None, gt=0)
     strategy_params: dict[str, Any] = Field(default_factory=dict)
 
 
@@ -47,6 +54,80 @@ class BacktestResponse(BaseModel):
     updated_at: datetime
     error: str | None = None
     result: dict[str, Any] | None = None
+    timings: dict[str, Any] | None = None
+    attempts: int | None = None
+
+
+class BatchRequest(BaseModel):
+    runs: list[BacktestRequest] = Field(min_length=1)
+
+
+class BatchResponse(BaseModel):
+    id: str
+    status: str
+    total_runs: int
+    counts: dict[str, int] = Field(default_factory=dict)
+    created_at: datetime
+    updated_at: datetime
+    jobs: list[BacktestResponse] = Field(default_factory=list)
+
+
+class ParameterRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(gt=0)
+
+
+SweepMetric = Literal["sharpe_ratio", "total_return_pct", "max_drawdown_pct"]
+
+
+class SweepRequest(BaseModel):
+    base: BacktestRequest = Field(default_factory=BacktestRequest)
+    parameters: dict[str, list[Any] | ParameterRange]
+    rank_by: SweepMetric = "sharpe_ratio"
+    top_n: int = Field(default=5, ge=0)
+
+
+class SweepResponse(BaseModel):
+    id: str
+    status: str
+    total_runs: int
+    completed_runs: int
+    created_at: datetime
+    updated_at: datetime
+    error: str | None = None
+    rank_by: str
+    results: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class WalkForwardRequest(BaseModel):
+    base: BacktestRequest = Field(default_factory=BacktestRequest)
+    parameters: dict[str, list[Any] | ParameterRange]
+    in_sample_days: int = Field(gt=0)
+    out_of_sample_days: int = Field(gt=0)
+    step_days: int | None = Field(default=None, gt=0)
+    anchored: bool = False
+    rank_by: SweepMetric = "sharpe_ratio"
+
+
+class WalkForwardResponse(BaseModel):
+    id: str
+    status: str
+    total_runs: int
+    completed_runs: int
+    created_at: datetime
+    updated_at: datetime
+    error: str | None = None
+    rank_by: str
+    windows: list[dict[str, Any]] = Field(default_factory=list)
+    result: dict[str, Any] | None = None
+
+
+class MonteCarloRequest(BaseModel):
+    simulations: int = Field(default=10000, ge=100, le=100000)
+    method: Literal["bootstrap", "shuffle"] = "bootstrap"
+    ruin_pct: float = Field(default=50.0, gt=0, le=100)
+    seed: int = 0
 
 
 class BacktestResultPayload(BaseModel):
@@ -1,26 +1,70 @@
 from __future__ import annotations
 
+import cProfile
+import json
+import time
 import uuid
 from datetime import datetime
 
+import numpy as np
+from pydantic import ValidationError
+
+from ..backtest_engine.equity_levels import (
+    build_equity_levels,
+    build_equity_levels_from_arrays,
+    equity_columns,
+    equity_rows,
+)
+from ..backtest_engine.monte_carlo import simulate_trade_paths
 from ..backtest_engine.original_strategy import get_default_dates
-from ..backtest_engine.result_serializer import build_backtest_result
-from ..backtest_engine.runner import default_backtest_config_kwargs, run_backtest
+from ..backtest_engine.result_serializer import build_backtest_result, trade_columns, trade_rows
+from ..backtest_engine.stopping import JobStopped
+from ..core.metrics import JOB_FAILURES, JOBS_FINISHED
 from ..database.repository import BacktestRepository
-from ..models.backtest import BacktestConfig
-from ..schemas.backtest import BacktestRequest
+from ..models.backtest import BacktestConfig, BacktestResult
+from ..schemas.backtest import BacktestRequest, MonteCarloRequest
+from .profiling import PhaseTimer, dump_profile, observe_job
+from .result_cache import ResultCache, compute_cache_key
+
+
+def result_payload(result: BacktestResult) -> dict:
+    """Stored form of a completed result; trades and the equity curve are columnar."""
+    return {
+        "backtest_id": result.backtest_id,
+        "symbol": result.symbol,
+        "timeframe": result.timeframe,
+        "start_date": result.start_date,
+        "end_date": result.end_date,
+        "initial_cash": result.initial_cash,
+        "final_value": result.final_value,
+        "net_profit": result.net_profit,
+        "total_return_pct": result.total_return_pct,
+        "max_drawdown_pct": result.max_drawdown_pct,
+        "sharpe_ratio": result.sharpe_ratio,
+        "total_trades": result.total_trades,
+        "win_rate_pct": result.win_rate_pct,
+        "trade_list": result.trade_list,
+        "equity_curve": {"t": result.equity_timestamps, "v": result.equity_values},
+        "strategy_params": result.strategy_params,
+        "completed_at": datetime.utcnow().isoformat(),
+    }
 
 
 class BacktestService:
-    def __init__(self, repository: BacktestRepository) -> None:
+    def __init__(self, repository: BacktestRepository, result_cache: ResultCache | None = None) -> None:
         self.repository = repository
+        self.result_cache = result_cache or ResultCache(repository)
 
-    def create_job(self, payload: BacktestRequest) -> str:
+    def create_job(self, payload: BacktestRequest, enqueue: bool = False) -> str:
         job_id = str(uuid.uuid4())
-        self.repository.create_job(job_id, payload.model_dump())
+        self.repository.create_job(job_id, payload.model_dump(), enqueue=enqueue)
         return job_id
 
     def build_config(self, payload: BacktestRequest) -> BacktestConfig:
+        # The engine (and Backtrader with it) is imported on first use so the
+        # API process starts quickly; services.warmup loads it at startup.
+        from ..backtest_engine.runner import check_engine, default_backtest_config_kwargs
+
         defaults = default_backtest_config_kwargs()
         from_date, to_date = get_default_dates()
 
@@ -38,7 +82,12 @@ class BacktestService:
             "pullback_window",
             "limit_bars",
             "run_dual_cerebro",
+            "dual_execution",
+            "engine",
             "use_forex_position_calc",
+            "use_cache",
+            "profile",
+            "timeout_seconds",
             "strategy_params",
         }
         extra_params = {k: v for k, v in payload_dict.items() if k not in core_fields}
@@ -53,7 +102,7 @@ class BacktestService:
         if payload.pullback_window is not None:
             strategy_params["pullback_window"] = payload.pullback_window
 
-        return BacktestConfig(
+        config = BacktestConfig(
             symbol=payload.symbol,
             timeframe=payload.timeframe,
             start_date=payload.start_date or from_date,
@@ -72,35 +121,200 @@ class BacktestService:
                 else defaults["use_forex_position_calc"]
             ),
             strategy_params=strategy_params,
+            dual_execution=payload.dual_execution or defaults["dual_execution"],
+            engine=payload.engine,
         )
+        check_engine(config)
+        return config
+
+    def check_engine(self, payload: BacktestRequest) -> None:
+        """Raise ``ValueError`` when the configured strategy cannot run on ``payload.engine``."""
+        if payload.engine != "backtrader":
+            self.build_config(payload)
 
-    def execute_job(self, job_id: str, payload: BacktestRequest) -> None:
-        self.repository.update_status(job_id, "running")
+    def find_cached_result(self, payload: BacktestRequest) -> dict | None:
+        if not payload.use_cache or payload.profile:
+            return None
         try:
-            config = self.build_config(payload)
-            artifacts = run_backtest(config)
-            result = build_backtest_result(job_id, artifacts)
-            self.repository.save_result(job_id, {
-                "backtest_id": result.backtest_id,
-                "symbol": result.symbol,
-                "timeframe": result.timeframe,
-                "start_date": result.start_date,
-                "end_date": result.end_date,
-                "initial_cash": result.initial_cash,
-                "final_value": result.final_value,
-                "net_profit": result.net_profit,
-                "total_return_pct": result.total_return_pct,
-                "max_drawdown_pct": result.max_drawdown_pct,
-                "sharpe_ratio": result.sharpe_ratio,
-                "total_trades": result.total_trades,
-                "win_rate_pct": result.win_rate_pct,
-                "trade_list": result.trade_list,
-                "equity_curve": result.equity_curve,
-                "strategy_params": result.strategy_params,
+            cache_key = compute_cache_key(self.build_config(payload))
+        except Exception:
+            # Let the job run and report the problem through the normal path.
+            return None
+        return self.result_cache.get(cache_key)
+
+    def complete_from_cache(self, job_id: str, cached: dict, lease_id: str | None = None) -> bool:
+        return self.repository.save_result(
+            job_id,
+            {
+                **cached,
+                "trade_list": trade_columns(cached.get("trade_list", [])),
+                "backtest_id": job_id,
                 "completed_at": datetime.utcnow().isoformat(),
-            })
+                "cache_hit": True,
+            },
+            equity_levels=build_equity_levels(cached.get("equity_curve", [])),
+            lease_id=lease_id,
+        )
+
+    def cancel_job(self, job_id: str, status: str) -> bool:
+        """Cancel a job last seen in ``status``; False when it had already finished."""
+        if not self.repository.cancel_job(job_id):
+            return False
+        if status == "queued":
+            # No worker will ever report this one.
+            JOBS_FINISHED.inc(status="cancelled")
+        return True
+
+    def stop_check(self, job_id: str, timeout_seconds: float | None, lease_id: str | None = None):
+        """``StopCheck`` for a job: its deadline, a cancelled status, or a lease taken over by another worker."""
+        deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+
+        def should_stop() -> str | None:
+            if deadline is not None and time.monotonic() >= deadline:
+                return "timed_out"
+            claim = self.repository.get_claim(job_id)
+            if claim is None or claim["status"] == "cancelled":
+                return "cancelled"
+            if lease_id is not None and claim["lease_id"] != lease_id:
+                return "lease_lost"
+            return None
+
+        return should_stop
+
+    def execute_claim(self, claim: dict) -> None:
+        """Run a job claimed from the queue; a stored request that no longer validates fails the job."""
+        try:
+            payload = BacktestRequest(**claim["request"])
+        except ValidationError as exc:
+            JOB_FAILURES.inc(exception=type(exc).__name__)
+            JOBS_FINISHED.inc(status="failed")
+            self.repository.update_status(
+                claim["id"], "failed", error=f"Invalid request: {exc}", lease_id=claim["lease_id"]
+            )
+            self.repository.finish_job(claim["lease_id"])
+            return
+        self.execute_job(claim["id"], payload, lease_id=claim["lease_id"])
+
+    def execute_job(self, job_id: str, payload: BacktestRequest, lease_id: str | None = None) -> None:
+        """Run a job; ``lease_id`` is the queue claim it runs under (already marked running)."""
+        from ..backtest_engine.runner import count_bars, run_backtest
+
+        if lease_id is None and not self.repository.start_job(job_id):
+            # Cancelled while it was waiting for a worker.
+            JOBS_FINISHED.inc(status="cancelled")
+            return
+        should_stop = self.stop_check(job_id, payload.timeout_seconds, lease_id)
+        timer = PhaseTimer()
+        bars = None
+        status = "failed"
+        profiler = cProfile.Profile() if payload.profile else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            with timer.phase("config"):
+                config = self.build_config(payload)
+                cache_key = compute_cache_key(config) if payload.use_cache and profiler is None else None
+                cached = self.result_cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                with timer.phase("persist"):
+                    saved = self.complete_from_cache(job_id, cached, lease_id)
+                status = "cached" if saved else "discarded"
+                return
+
+            with timer.phase("run"):
+                artifacts = run_backtest(
+                    config,
+                    progress=lambda report: self.repository.update_progress(job_id, report),
+                    should_stop=should_stop,
+                    phase=timer.phase,
+                )
+            # The run has loaded these bars already, so this is a cached lookup.
+            bars = count_bars(config)
+            with timer.phase("serialize"):
+                result = build_backtest_result(job_id, artifacts)
+                result_data = result_payload(result)
+                equity_levels = build_equity_levels_from_arrays(result.equity_timestamps, result.equity_values)
+            with timer.phase("persist"):
+                saved = self.repository.save_result(job_id, result_data, equity_levels=equity_levels, lease_id=lease_id)
+                if cache_key is not None:
+                    self.result_cache.put(cache_key, result_data)
+            # Not saved: the job was cancelled, or its lease expired and another worker owns it now.
+            status = "completed" if saved else "discarded"
+        except JobStopped as exc:
+            # A partial run would skew the throughput metrics.
+            bars = None
+            status = exc.reason
+            if exc.reason == "timed_out":
+                self.repository.update_status(
+                    job_id, "timed_out", error=f"Timed out after {payload.timeout_seconds:g} s", lease_id=lease_id
+                )
+            elif exc.reason == "cancelled":
+                self.repository.update_status(job_id, "cancelled", error="Cancelled by request", lease_id=lease_id)
+            # On "lease_lost" the job was requeued and belongs to another worker now.
         except Exception as exc:
-            self.repository.update_status(job_id, "failed", error=str(exc))
+            JOB_FAILURES.inc(exception=type(exc).__name__)
+            self.repository.update_status(job_id, "failed", error=str(exc), lease_id=lease_id)
+        finally:
+            timings = timer.summary(bars)
+            observe_job(status, timings)
+            if profiler is not None:
+                profiler.disable()
+            # A discarded or lease-lost run no longer owns the job; its rows belong to the new owner.
+            if status not in ("discarded", "lease_lost"):
+                self.repository.save_timings(job_id, timings)
+                if profiler is not None:
+                    self.repository.save_profile(job_id, dump_profile(profiler))
+            if lease_id is not None:
+                self.repository.finish_job(lease_id)
+
+    def get_job(self, job_id: str, include_payloads: bool = True, columnar: bool = False) -> dict | None:
+        """Job with its result; ``columnar`` returns trades and equity as one list per field."""
+        job = self.repository.get_job(job_id)
+        if job is None or not include_payloads or not job["result"]:
+            return job
 
-    def get_job(self, job_id: str) -> dict | None:
-        return self.repository.get_job(job_id)
+        result = job["result"]
+        if "trade_list" not in result:
+            result["trade_list"] = self.repository.get_trades(job_id) or []
+        if "equity_curve" not in result:
+            level = self.repository.get_full_equity_level(job_id)
+            result["equity_curve"] = level if level is not None else {"t": [], "v": []}
+        if columnar:
+            result["trade_list"] = trade_columns(result["trade_list"])
+            result["equity_curve"] = equity_columns(result["equity_curve"])
+        else:
+            result["trade_list"] = trade_rows(result["trade_list"])
+            result["equity_curve"] = equity_rows(result["equity_curve"])
+        return job
+
+    def run_monte_carlo(self, job_id: str, request: MonteCarloRequest) -> dict:
+        """Simulate the completed job's trade PnLs; results are kept per parameter set."""
+        params = request.model_dump()
+        params_key = json.dumps(params, sort_keys=True)
+        cached = self.repository.get_monte_carlo(job_id, params_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        job = self.get_job(job_id, include_payloads=False)
+        if job["result"].get("payloads_pruned"):
+            raise ValueError("The trade list of this backtest was removed by the retention policy")
+        trades = self.repository.get_trades(job_id)
+        if trades is None:
+            trades = self.get_job(job_id, columnar=True)["result"]["trade_list"]
+        pnls = np.array([pnl for pnl in trade_columns(trades)["pnl"] if pnl is not None], dtype=np.float64)
+
+        initial_cash = job["result"]["initial_cash"]
+        result = {
+            **params,
+            "initial_cash": initial_cash,
+            **simulate_trade_paths(
+                pnls,
+                initial_cash,
+                request.simulations,
+                method=request.method,
+                ruin_pct=request.ruin_pct,
+                seed=request.seed,
+            ),
+        }
+        self.repository.save_monte_carlo(job_id, params_key, result)
+        return {**result, "cached": False}
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import uuid
+
+from ..backtest_engine.data_paths import resolve_data_file
+from ..core.settings import MAX_BATCH_RUNS
+from ..schemas.backtest import BacktestRequest, BatchRequest
+from .backtest_service import BacktestService
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "timed_out"}
+
+
+def batch_status(counts: dict[str, int]) -> str:
+    """Aggregate status of a batch from the number of jobs in each status."""
+    total = sum(counts.values())
+    waiting = counts.get("queued", 0)
+    if sum(counts.get(status, 0) for status in TERMINAL_STATUSES) == total:
+        for status in ("failed", "cancelled"):
+            if counts.get(status, 0) == total:
+                return status
+        return "completed"
+    return "queued" if waiting == total else "running"
+
+
+def group_by_dataset(jobs: list[tuple[str, BacktestRequest]]) -> list[list[tuple[str, BacktestRequest]]]:
+    """Jobs grouped by (data file, timeframe), groups in order of first appearance."""
+    groups: dict[tuple[str, str], list[tuple[str, BacktestRequest]]] = {}
+    for job_id, payload in jobs:
+        key = (str(resolve_data_file(payload.data_file)), payload.timeframe)
+        groups.setdefault(key, []).append((job_id, payload))
+    return list(groups.values())
+
+
+class BatchService:
+    def __init__(self, backtest_service: BacktestService) -> None:
+        self.backtest_service = backtest_service
+
+    @property
+    def repository(self):
+        return self.backtest_service.repository
+
+    def create_batch(self, request: BatchRequest) -> str:
+        """Enqueue every run of the batch in one transaction, grouped by dataset.
+
+        Runs already in the result cache complete immediately. Each dataset's
+        bar and indicator caches are built here once, before any worker can
+        claim one of its jobs, and the jobs are queued one dataset after
+        another so workers keep reusing the dataset they already have mapped.
+        """
+        from ..backtest_engine.runner import warm_data_caches
+
+        if len(request.runs) > MAX_BATCH_RUNS:
+            raise ValueError(f"Batch has {len(request.runs)} runs; the limit is {MAX_BATCH_RUNS}")
+
+        for index, payload in enumerate(request.runs):
+            try:
+                self.backtest_service.check_engine(payload)
+            except ValueError as exc:
+                raise ValueError(f"Run {index}: {exc}") from exc
+        jobs = [(str(uuid.uuid4()), payload) for payload in request.runs]
+        cached = {job_id: self.backtest_service.find_cached_result(payload) for job_id, payload in jobs}
+        groups = group_by_dataset([(job_id, payload) for job_id, payload in jobs if cached[job_id] is None])
+        for group in groups:
+            try:
+                warm_data_caches([self.backtest_service.build_config(payload) for _, payload in group])
+            except Exception as exc:
+                # The jobs themselves report a missing file or bad params.
+                logger.warning("Could not prepare data caches for a batch: %s", exc)
+
+        batch_id = str(uuid.uuid4())
+        self.repository.create_batch(
+            batch_id,
+            [(job_id, payload.model_dump()) for job_id, payload in jobs],
+            queue_order=[job_id for group in groups for job_id, _ in group],
+        )
+        for job_id, result in cached.items():
+            if result is not None:
+                self.backtest_service.complete_from_cache(job_id, result)
+        return batch_id
+
+    def get_batch(self, batch_id: str) -> dict | None:
+        batch = self.repository.get_batch(batch_id)
+        if batch is None:
+            return None
+        counts: dict[str, int] = {}
+        for job in batch["jobs"]:
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        updated_at = max((job["updated_at"] for job in batch["jobs"]), default=batch["created_at"])
+        return {**batch, "status": batch_status(counts), "counts": counts, "updated_at": updated_at}
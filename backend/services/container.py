@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+from ..core.settings import MAX_BATCH_QUEUE_DEPTH, MAX_QUEUE_DEPTH, MAX_WORKERS
 from ..database.repository import BacktestRepository
 from .backtest_service import BacktestService
+from .batch_service import BatchService
+from .executor import JobExecutor
+from .job_events import JobEventHub
+from .sweep_service import SweepService
+from .walk_forward_service import WalkForwardService
 
 
 _repository: BacktestRepository | None = None
 _service: BacktestService | None = None
+_executor: JobExecutor | None = None
+_sweep_service: SweepService | None = None
+_batch_service: BatchService | None = None
+_walk_forward_service: WalkForwardService | None = None
+_job_event_hub: JobEventHub | None = None
 
 
 def get_backtest_service() -> BacktestService:
@@ -15,3 +26,59 @@ def get_backtest_service() -> BacktestService:
     if _service is None:
         _service = BacktestService(_repository)
     return _service
+
+
+def get_job_executor() -> JobExecutor:
+    global _executor
+    if _executor is None:
+        service = get_backtest_service()
+        _executor = JobExecutor(
+            service.repository,
+            max_workers=MAX_WORKERS,
+            max_queue_depth=MAX_QUEUE_DEPTH,
+            max_batch_queue_depth=MAX_BATCH_QUEUE_DEPTH,
+        )
+    return _executor
+
+
+def get_sweep_service() -> SweepService:
+    global _sweep_service
+    if _sweep_service is None:
+        _sweep_service = SweepService(get_backtest_service(), get_job_executor())
+    return _sweep_service
+
+
+def get_batch_service() -> BatchService:
+    global _batch_service
+    if _batch_service is None:
+        _batch_service = BatchService(get_backtest_service())
+    return _batch_service
+
+
+def get_walk_forward_service() -> WalkForwardService:
+    global _walk_forward_service
+    if _walk_forward_service is None:
+        _walk_forward_service = WalkForwardService(get_backtest_service(), get_job_executor())
+    return _walk_forward_service
+
+
+def get_job_event_hub() -> JobEventHub:
+    global _job_event_hub
+    if _job_event_hub is None:
+        _job_event_hub = JobEventHub(get_backtest_service().repository)
+    return _job_event_hub
+
+
+def shutdown_services() -> None:
+    global _executor, _sweep_service, _batch_service, _walk_forward_service, _service, _repository, _job_event_hub
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    _sweep_service = None
+    _batch_service = None
+    _walk_forward_service = None
+    _job_event_hub = None
+    _service = None
+    if _repository is not None:
+        _repository.close()
+        _repository = None
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable
+
+from ..core.metrics import JOB_FAILURES, JOBS_FINISHED, METRICS
+from ..core.settings import (
+    EMBEDDED_WORKERS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    MAX_BATCH_QUEUE_DEPTH,
+    QUEUE_POLL_SECONDS,
+)
+from ..database.repository import BacktestRepository
+from .backtest_service import BacktestService
+from .queue_worker import LeaseKeeper, worker_identity
+from .warmup import warm_process
+
+logger = logging.getLogger(__name__)
+
+
+WORKER_PRELOAD_MODULE = f"{__package__}.worker_preload"
+
+
+_worker_service: BacktestService | None = None
+
+
+def _init_worker(db_path: str) -> None:
+    global _worker_service
+    _worker_service = BacktestService(BacktestRepository(Path(db_path)))
+    # Already done by the forkserver preload; this covers spawn-only platforms.
+    try:
+        warm_process()
+    except Exception as exc:  # jobs report the underlying error themselves
+        logger.warning("Worker warm-up failed: %s", exc)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """Forkserver with the engine preloaded where available, else spawn.
+
+    Forking the threaded API process directly is unsafe, so workers fork from
+    a single-threaded server process that has imported the engine once.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([WORKER_PRELOAD_MODULE])
+    return context
+
+
+def _run_job(claim: dict) -> dict:
+    # Runs inside a pool process on a job the API process has already
+    # claimed (and keeps heartbeating). The metrics this worker recorded
+    # since its last job are handed back to the API process.
+    assert _worker_service is not None
+    _worker_service.execute_claim(claim)
+    return METRICS.drain()
+
+
+class JobExecutor:
+    """Runs jobs from the durable queue on a pool of worker processes.
+
+    Backtrader holds the GIL for the whole run, so jobs are executed in
+    separate processes. A dispatcher thread claims the oldest waiting job
+    whenever one of the ``max_workers`` slots is free and renews the leases
+    of the jobs it is running. Tasks from ``submit_task`` hold slots too, at
+    most ``task_slots`` of them, so one slot stays free for queued jobs when
+    there is more than one worker. Standalone workers (``python -m backend.worker``)
+    claim from the same queue. Submissions are rejected once
+    ``max_queue_depth`` single jobs are waiting, batches once they would take
+    the batch jobs waiting past ``max_batch_queue_depth``.
+    """
+
+    def __init__(
+        self,
+        repository: BacktestRepository,
+        max_workers: int,
+        max_queue_depth: int,
+        max_batch_queue_depth: int = MAX_BATCH_QUEUE_DEPTH,
+        embedded: bool = EMBEDDED_WORKERS,
+    ) -> None:
+        self.repository = repository
+        self.max_workers = max(1, max_workers)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.max_batch_queue_depth = max(0, max_batch_queue_depth)
+        self.embedded = embedded
+        self.worker_id = worker_identity()
+        self._lock = threading.Lock()
+        # job id -> (lease id, future) of jobs running on this pool
+        self._running: dict[str, tuple[str, Future]] = {}
+        # submit_task futures (sweep and walk-forward runs) still pending or running
+        self._tasks: set[Future] = set()
+        self._task_freed = threading.Condition(self._lock)
+        self._pool = self._create_pool()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._leases = LeaseKeeper(repository)
+        self._dispatcher: threading.Thread | None = None
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=worker_context(),
+            initializer=_init_worker,
+            initargs=(str(self.repository.db_path),),
+        )
+
+    def start(self) -> None:
+        """Start the dispatcher; requeues jobs an earlier process left behind first.
+
+        Sweeps and walk-forwards an earlier process was still running are failed
+        here, before any new one can be submitted.
+        """
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            self._dispatcher = threading.Thread(target=self._dispatch, name="backtest-dispatcher", daemon=True)
+        try:
+            interrupted = self.repository.fail_interrupted_runs()
+            if interrupted:
+                logger.info("Failed %d sweeps and walk-forwards left unfinished", interrupted)
+        except Exception:
+            logger.exception("Could not fail interrupted sweeps and walk-forwards")
+        self._leases.start()
+        self._dispatcher.start()
+
+    def warm_up(self) -> None:
+        """Start every worker process now rather than on the first jobs."""
+        futures = [self._submit_to_pool(_worker_ready) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def stats(self) -> dict[str, int]:
+        """Jobs waiting in the queue and claimed by any worker, this pool or standalone."""
+        counts = self.repository.queue_counts()
+        return {"running": counts["claimed"], "queued": counts["waiting"]}
+
+    def worker_pids(self) -> list[int]:
+        return list(getattr(self._pool, "_processes", None) or ())
+
+    def has_capacity(self) -> bool:
+        # Batch jobs are counted against their own cap in has_batch_capacity.
+        counts = self.repository.queue_counts()
+        return counts["waiting"] - counts["batch_waiting"] < self.max_queue_depth
+
+    def has_batch_capacity(self, runs: int) -> bool:
+        """Whether a batch of ``runs`` jobs fits under the cap on waiting batch jobs."""
+        return self.repository.queue_counts()["batch_waiting"] + runs <= self.max_batch_queue_depth
+
+    def notify(self) -> None:
+        """Wake the dispatcher after jobs were enqueued or slots freed."""
+        self.start()
+        self._wake.set()
+
+    def cancel(self, job_id: str) -> None:
+        """Give a cancelled job's slot back now.
+
+        A claimed job still waiting in the pool never starts; one already
+        running stops at its next check. ``cancel_job`` has taken it out of
+        the queue.
+        """
+        with self._lock:
+            entry = self._running.pop(job_id, None)
+        if entry is not None:
+            lease_id, future = entry
+            self._leases.discard(lease_id)
+            if future.cancel():
+                JOBS_FINISHED.inc(status="cancelled")
+        self._wake.set()
+
+    def _dispatch(self) -> None:
+        try:
+            requeued = self.repository.enqueue_orphans()
+            if requeued:
+                logger.info("Queued %d jobs left without a queue entry", requeued)
+        except Exception:
+            logger.exception("Could not recover orphaned jobs")
+
+        while not self._stopped.is_set():
+            try:
+                self.repository.recover_jobs(JOB_MAX_ATTEMPTS)
+                while self.embedded and self._free_slots() > 0:
+                    claim = self.repository.claim_next_job(self.worker_id, JOB_LEASE_SECONDS)
+                    if claim is None:
+                        break
+                    self._start_job(claim)
+            except Exception:
+                logger.exception("Job dispatcher pass failed")
+            self._wake.wait(QUEUE_POLL_SECONDS)
+            self._wake.clear()
+
+    def _free_slots(self) -> int:
+        with self._lock:
+            return self.max_workers - len(self._running) - len(self._tasks)
+
+    def _start_job(self, claim: dict) -> None:
+        job_id, lease_id = claim["id"], claim["lease_id"]
+        self._leases.add(lease_id)
+        with self._lock:
+            future = self._submit_to_pool(_run_job, claim)
+            self._running[job_id] = (lease_id, future)
+        future.add_done_callback(lambda done: self._on_done(job_id, lease_id, done))
+
+    @property
+    def task_slots(self) -> int:
+        """Pool slots that ``submit_task`` runs may hold at once."""
+        return max(1, self.max_workers - 1)
+
+    def submit_task(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run ``fn(*args)`` on the shared pool outside the job queue.
+
+        Blocks while ``task_slots`` tasks are in flight, across all callers;
+        fan-outs (sweeps, walk-forwards) keep at most that many pending. Tasks
+        are not counted against the queue depth. Each one occupies a slot
+        until it finishes, so the dispatcher does not claim queued jobs (and
+        start renewing their leases) that would only wait behind it inside the pool.
+        """
+        with self._task_freed:
+            while len(self._tasks) >= self.task_slots and not self._stopped.is_set():
+                self._task_freed.wait()
+            future = self._submit_to_pool(fn, *args)
+            self._tasks.add(future)
+        future.add_done_callback(self._on_task_done)
+        return future
+
+    def _on_task_done(self, future: Future) -> None:
+        with self._task_freed:
+            self._tasks.discard(future)
+            self._task_freed.notify()
+        self._wake.set()
+
+    def _submit_to_pool(self, fn: Callable[..., Any], *args: Any) -> Future:
+        try:
+            return self._pool.submit(fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Worker pool was broken; starting a new one")
+            self._pool = self._create_pool()
+            return self._pool.submit(fn, *args)
+
+    def _on_done(self, job_id: str, lease_id: str, future: Future) -> None:
+        with self._lock:
+            entry = self._running.get(job_id)
+            if entry is not None and entry[0] == lease_id:
+                del self._running[job_id]
+        self._leases.discard(lease_id)
+        self._wake.set()
+
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is None:
+            METRICS.merge(future.result())
+        else:
+            # execute_job records its own failures; this only fires when the
+            # worker process itself died mid-job. The job goes back to the
+            # queue until it runs out of attempts.
+            logger.error("Backtest worker crashed while running %s: %s", job_id, exc)
+            JOB_FAILURES.inc(exception=type(exc).__name__)
+            self.repository.expire_lease(lease_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._stopped.set()
+        self._wake.set()
+        with self._task_freed:
+            self._task_freed.notify_all()
+        self._leases.stop()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from ..database.repository import BacktestRepository
+
+logger = logging.getLogger(__name__)
+
+# Seconds between database reads for the jobs being watched.
+EVENTS_POLL_SECONDS = 0.5
+
+
+def _offer(queue: asyncio.Queue, live: dict | None) -> None:
+    # Subscribers only need the newest snapshot; a slow one skips stale ones.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(live)
+
+
+class JobEventHub:
+    """Fans live job status out to every events-stream subscriber.
+
+    One poller task reads the status and progress of all watched jobs in a
+    single query every ``interval`` seconds, however many clients watch them,
+    and hands each subscriber queue the job's snapshot whenever it changed.
+    ``None`` means the job does not exist. The poller stops once nobody is
+    subscribed.
+    """
+
+    def __init__(self, repository: BacktestRepository, interval: float = EVENTS_POLL_SECONDS) -> None:
+        self.repository = repository
+        self.interval = interval
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._latest: dict[str, dict | None] = {}
+        self._wake = asyncio.Event()
+        self._poller: asyncio.Task | None = None
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Queue receiving ``job_id``'s snapshots, starting with the current one."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        if job_id in self._latest:
+            _offer(queue, self._latest[job_id])
+        else:
+            self._wake.set()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(job_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[job_id]
+            self._latest.pop(job_id, None)
+
+    async def _poll(self) -> None:
+        while self._subscribers:
+            self._wake.clear()
+            job_ids = list(self._subscribers)
+            try:
+                statuses = await asyncio.to_thread(self.repository.get_live_statuses, job_ids)
+            except Exception:  # a locked database is retried on the next pass
+                logger.exception("Reading live job status failed")
+            else:
+                self._publish(job_ids, statuses)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _publish(self, job_ids: list[str], statuses: dict[str, dict]) -> None:
+        for job_id in job_ids:
+            queues = self._subscribers.get(job_id)
+            if not queues:
+                continue
+            live = statuses.get(job_id)
+            if job_id in self._latest and self._latest[job_id] == live:
+                continue
+            self._latest[job_id] = live
+            for queue in queues:
+                _offer(queue, live)
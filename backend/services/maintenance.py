@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from ..core.metrics import PRUNED_JOBS
+from ..core.settings import MAINTENANCE_INTERVAL_SECONDS, RESULT_RETENTION_DAYS, RESULT_RETENTION_MAX_JOBS
+from ..database.repository import BacktestRepository
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+
+
+def run_maintenance(
+    repository: BacktestRepository,
+    retention_days: float = RESULT_RETENTION_DAYS,
+    max_jobs: int = RESULT_RETENTION_MAX_JOBS,
+) -> dict[str, int]:
+    """Apply the retention policy once, then compact the database file."""
+    finished_before = None
+    if retention_days > 0:
+        finished_before = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat()
+    pruned = repository.prune_payloads(finished_before, max_jobs)
+    PRUNED_JOBS.inc(pruned["jobs"])
+    freed_pages = repository.compact()
+    if pruned["jobs"] or pruned["sweep_results"] or pruned["walk_forward_levels"] or freed_pages:
+        logger.info(
+            "Pruned payloads of %d jobs, %d sweep runs and %d walk-forward equity levels; freed %d pages",
+            pruned["jobs"],
+            pruned["sweep_results"],
+            pruned["walk_forward_levels"],
+            freed_pages,
+        )
+    return {**pruned, "freed_pages": freed_pages}
+
+
+def _loop(repository: BacktestRepository) -> None:
+    while True:
+        try:
+            run_maintenance(repository)
+        except Exception:  # a locked database is retried on the next pass
+            logger.exception("Database maintenance failed")
+        if _stop.wait(MAINTENANCE_INTERVAL_SECONDS):
+            return
+
+
+def start_maintenance(repository: BacktestRepository) -> None:
+    """Prune and compact now and then every ``MAINTENANCE_INTERVAL_SECONDS``, in the background."""
+    if MAINTENANCE_INTERVAL_SECONDS <= 0:
+        return
+    _stop.clear()
+    threading.Thread(target=_loop, args=(repository,), name="backtest-maintenance", daemon=True).start()
+
+
+def stop_maintenance() -> None:
+    _stop.set()
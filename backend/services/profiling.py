@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import cProfile
+import marshal
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from ..core.metrics import BARS_PER_SECOND, BARS_PROCESSED, JOB_PHASE_SECONDS, JOBS_FINISHED, RUN_SECONDS
+
+
+class PhaseTimer:
+    """Wall-clock seconds per named phase of one job.
+
+    A phase entered inside another (the engine's ``feed_load`` within ``run``)
+    is counted on its own and not in the outer phase.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self._nested: list[float] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def summary(self, bars: int | None) -> dict[str, Any]:
+        run_seconds = self.phases.get("run")
+        return {
+            "phases": dict(self.phases),
+            "total_seconds": sum(self.phases.values()),
+            "bars": bars,
+            "bars_per_second": bars / run_seconds if bars and run_seconds else None,
+        }
+
+
+def observe_job(status: str, timings: dict[str, Any]) -> None:
+    """Feed one finished job's ``PhaseTimer.summary`` into the service metrics."""
+    JOBS_FINISHED.inc(status=status)
+    for phase, seconds in timings["phases"].items():
+        JOB_PHASE_SECONDS.observe(seconds, phase=phase)
+    if timings["bars_per_second"] is not None:
+        BARS_PROCESSED.inc(timings["bars"])
+        RUN_SECONDS.inc(timings["phases"]["run"])
+        BARS_PER_SECOND.observe(timings["bars_per_second"])
+
+
+def dump_profile(profiler: cProfile.Profile) -> bytes:
+    """Serialize collected stats in the ``pstats`` file format."""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def profile_table(dump: bytes, sort: str = "cumtime", limit: int = 50) -> dict[str, Any]:
+    """Hot-function table from a ``dump_profile`` blob, like ``pstats.print_stats``."""
+    stats = marshal.loads(dump)
+    rows = []
+    for (filename, line, function), (primitive_calls, calls, tottime, cumtime, _callers) in stats.items():
+        rows.append(
+            {
+                "function": function,
+                "file": filename,
+                "line": line,
+                "ncalls": calls,
+                "primitive_calls": primitive_calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+                "tottime_per_call": tottime / calls if calls else 0.0,
+                "cumtime_per_call": cumtime / primitive_calls if primitive_calls else 0.0,
+            }
+        )
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    return {
+        "total_seconds": sum(row["tottime"] for row in rows),
+        "functions": len(rows),
+        "sort": sort,
+        "rows": rows[:limit],
+    }
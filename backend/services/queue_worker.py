@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+
+from ..core.settings import JOB_HEARTBEAT_SECONDS, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, QUEUE_POLL_SECONDS
+from ..database.repository import BacktestRepository
+from .backtest_service import BacktestService
+
+logger = logging.getLogger(__name__)
+
+
+def worker_identity() -> str:
+    """``host:pid``, recorded on every job this process claims."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseKeeper:
+    """Renews a set of queue leases from a background thread until stopped."""
+
+    def __init__(self, repository: BacktestRepository, interval: float = JOB_HEARTBEAT_SECONDS) -> None:
+        self.repository = repository
+        self.interval = interval
+        self._leases: set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="backtest-heartbeat", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def add(self, lease_id: str) -> None:
+        with self._lock:
+            self._leases.add(lease_id)
+
+    def discard(self, lease_id: str) -> None:
+        with self._lock:
+            self._leases.discard(lease_id)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                leases = list(self._leases)
+            try:
+                self.repository.heartbeat(leases, JOB_LEASE_SECONDS)
+            except Exception as exc:  # a locked database must not kill the heartbeat
+                logger.warning("Heartbeat failed: %s", exc)
+
+
+def run_worker(stop: threading.Event, repository: BacktestRepository | None = None) -> None:
+    """Claim and run jobs one at a time until ``stop`` is set.
+
+    Every pass also requeues jobs whose worker stopped renewing its lease, so
+    any live worker recovers the jobs of a crashed one.
+    """
+    service = BacktestService(repository or BacktestRepository())
+    worker_id = worker_identity()
+    leases = LeaseKeeper(service.repository)
+    leases.start()
+    logger.info("Worker %s polling %s", worker_id, service.repository.db_path)
+    try:
+        while not stop.is_set():
+            try:
+                service.repository.recover_jobs(JOB_MAX_ATTEMPTS)
+                claim = service.repository.claim_next_job(worker_id, JOB_LEASE_SECONDS)
+            except Exception as exc:
+                logger.warning("Could not claim a job: %s", exc)
+                claim = None
+            if claim is None:
+                stop.wait(QUEUE_POLL_SECONDS)
+                continue
+
+            logger.info("Running %s (attempt %d)", claim["id"], claim["attempts"])
+            leases.add(claim["lease_id"])
+            try:
+                service.execute_claim(claim)
+            except Exception:
+                # Keep the worker alive; the job's lease lapses and it is requeued.
+                logger.exception("Job %s failed outside the engine", claim["id"])
+            finally:
+                leases.discard(claim["lease_id"])
+    finally:
+        leases.stop()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict
+
+from .. import strategies
+from ..backtest_engine.data_paths import resolve_data_file
+from ..core.settings import RESULT_CACHE_MAX_BYTES
+from ..database.repository import BacktestRepository
+from ..models.backtest import BacktestConfig
+
+CACHE_KEY_VERSION = 1
+
+# Config fields that change how a run is executed but not what it produces.
+_EXECUTION_ONLY_FIELDS = {"dual_execution"}
+
+# Per-job fields that must not leak from the run that populated the cache.
+_JOB_FIELDS = {"backtest_id", "completed_at"}
+
+
+def _data_fingerprint(data_file: str | None) -> dict:
+    resolved = resolve_data_file(data_file).resolve()
+    stat = resolved.stat()
+    return {"path": str(resolved), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def compute_cache_key(config: BacktestConfig) -> str:
+    """Hash everything that determines a backtest's output.
+
+    Covers the resolved config, the effective strategy kwargs, the data file
+    fingerprint and the strategy module source, so editing any of them
+    produces a new key.
+    """
+    from ..backtest_engine.runner import _build_strategy_kwargs
+
+    config_data = {k: v for k, v in asdict(config).items() if k not in _EXECUTION_ONLY_FIELDS}
+    material = {
+        "version": CACHE_KEY_VERSION,
+        "config": config_data,
+        "strategy_kwargs": _build_strategy_kwargs(config),
+        "data": _data_fingerprint(config.data_file),
+        "strategy_source": strategies.get_strategy_source_hash(),
+    }
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed store of completed results with LRU eviction."""
+
+    def __init__(self, repository: BacktestRepository, max_bytes: int = RESULT_CACHE_MAX_BYTES) -> None:
+        self.repository = repository
+        self.max_bytes = max_bytes
+
+    def get(self, cache_key: str) -> dict | None:
+        return self.repository.get_cached_result(cache_key)
+
+    def put(self, cache_key: str, result_data: dict) -> None:
+        if self.max_bytes <= 0:
+            return
+        payload = {k: v for k, v in result_data.items() if k not in _JOB_FIELDS}
+        self.repository.put_cached_result(cache_key, payload, self.max_bytes)
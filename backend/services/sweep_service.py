@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import math
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any
+
+from ..backtest_engine.result_serializer import build_backtest_result
+from ..core.settings import MAX_SWEEP_RUNS
+from ..models.backtest import BacktestConfig
+from ..schemas.backtest import BacktestRequest, ParameterRange, SweepRequest
+from .backtest_service import BacktestService, result_payload
+from .executor import JobExecutor
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = (
+    "final_value",
+    "net_profit",
+    "total_return_pct",
+    "max_drawdown_pct",
+    "sharpe_ratio",
+    "total_trades",
+    "win_rate_pct",
+)
+
+# Metrics where a smaller value ranks higher.
+ASCENDING_METRICS = {"max_drawdown_pct"}
+
+_RESULT_FLUSH_SIZE = 32
+
+
+def _run_sweep_combination(run_id: str, config: BacktestConfig) -> dict:
+    from ..backtest_engine.runner import run_backtest
+
+    artifacts = run_backtest(config)
+    return result_payload(build_backtest_result(run_id, artifacts))
+
+
+def _expand_range(spec: ParameterRange) -> list[float | int]:
+    count = int(math.floor((spec.stop - spec.start) / spec.step + 1e-9)) + 1
+    values: list[float | int] = [round(spec.start + i * spec.step, 10) for i in range(max(count, 0))]
+    if float(spec.start).is_integer() and float(spec.step).is_integer():
+        values = [int(value) for value in values]
+    return values
+
+
+def expand_parameter_grid(parameters: dict[str, list[Any] | ParameterRange]) -> list[dict[str, Any]]:
+    names = list(parameters)
+    axes = []
+    for name in names:
+        spec = parameters[name]
+        values = _expand_range(spec) if isinstance(spec, ParameterRange) else list(spec)
+        if not values:
+            raise ValueError(f"Parameter {name!r} has no values to sweep")
+        axes.append(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+def rank_key(result: dict, rank_by: str) -> float:
+    value = result.get(rank_by)
+    if not isinstance(value, (int, float)) or not math.isfinite(value):
+        return -math.inf
+    return -value if rank_by in ASCENDING_METRICS else value
+
+
+class SweepService:
+    def __init__(self, backtest_service: BacktestService, executor: JobExecutor) -> None:
+        self.backtest_service = backtest_service
+        self.executor = executor
+
+    @property
+    def repository(self):
+        return self.backtest_service.repository
+
+    def build_configs(self, request: SweepRequest) -> list[tuple[dict[str, Any], BacktestConfig]]:
+        combos = expand_parameter_grid(request.parameters)
+        if len(combos) > MAX_SWEEP_RUNS:
+            raise ValueError(f"Sweep expands to {len(combos)} runs; the limit is {MAX_SWEEP_RUNS}")
+
+        base = request.base.model_dump()
+        configs = []
+        for combo in combos:
+            payload = BacktestRequest(**{**base, **combo})
+            config = self.backtest_service.build_config(payload)
+            # The sweep already occupies every worker; forking dual legs on
+            # top of that would only oversubscribe the cores.
+            config.dual_execution = "sequential"
+            configs.append((combo, config))
+        return configs
+
+    def create_sweep(self, request: SweepRequest) -> tuple[str, list[tuple[dict[str, Any], BacktestConfig]]]:
+        configs = self.build_configs(request)
+        sweep_id = str(uuid.uuid4())
+        self.repository.create_sweep(sweep_id, request.model_dump(), request.rank_by, len(configs))
+        return sweep_id, configs
+
+    def run_sweep(
+        self,
+        sweep_id: str,
+        configs: list[tuple[dict[str, Any], BacktestConfig]],
+        rank_by: str,
+        top_n: int,
+    ) -> None:
+        from ..backtest_engine.runner import warm_data_caches
+
+        self.repository.update_sweep_status(sweep_id, "running")
+        try:
+            # Build the bar and indicator caches once up front so workers only
+            # memory-map them instead of all computing the same data.
+            warm_data_caches([config for _, config in configs])
+
+            top_results = self._fan_out(sweep_id, configs, rank_by, top_n)
+            self.repository.save_sweep_full_results(
+                sweep_id,
+                {run_index: result for _, run_index, result in top_results},
+            )
+            self.repository.update_sweep_status(sweep_id, "completed")
+        except Exception as exc:
+            logger.exception("Sweep %s failed", sweep_id)
+            self.repository.update_sweep_status(sweep_id, "failed", error=str(exc))
+
+    def _fan_out(
+        self,
+        sweep_id: str,
+        configs: list[tuple[dict[str, Any], BacktestConfig]],
+        rank_by: str,
+        top_n: int,
+    ) -> list[tuple[float, int, dict]]:
+        max_in_flight = self.executor.task_slots
+        queue = iter(enumerate(configs))
+        in_flight: dict[Future, tuple[int, dict[str, Any]]] = {}
+        top_results: list[tuple[float, int, dict]] = []
+        pending_rows: list[dict] = []
+
+        def _submit_next() -> bool:
+            item = next(queue, None)
+            if item is None:
+                return False
+            run_index, (params, config) = item
+            future = self.executor.submit_task(_run_sweep_combination, f"{sweep_id}:{run_index}", config)
+            in_flight[future] = (run_index, params)
+            return True
+
+        while len(in_flight) < max_in_flight and _submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                run_index, params = in_flight.pop(future)
+                row: dict[str, Any] = {"run_index": run_index, "params": params}
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    row["error"] = str(exc)
+                else:
+                    row.update({name: result.get(name) for name in SUMMARY_FIELDS})
+                    if top_n > 0:
+                        entry = (rank_key(result, rank_by), -run_index, result)
+                        if len(top_results) < top_n:
+                            heapq.heappush(top_results, entry)
+                        elif entry[:2] > top_results[0][:2]:
+                            heapq.heapreplace(top_results, entry)
+                pending_rows.append(row)
+                _submit_next()
+
+            if len(pending_rows) >= _RESULT_FLUSH_SIZE or not in_flight:
+                self.repository.add_sweep_results(sweep_id, pending_rows)
+                pending_rows = []
+
+        return [(score, -neg_index, result) for score, neg_index, result in top_results]
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+
+from ..backtest_engine.bar_cache import load_bars
+from ..backtest_engine.data_paths import parse_date, resolve_data_file
+from ..backtest_engine.equity_levels import build_equity_levels_from_arrays
+from ..backtest_engine.result_serializer import build_backtest_result
+from ..core.settings import MAX_SWEEP_RUNS
+from ..models.backtest import BacktestConfig
+from ..schemas.backtest import BacktestRequest, WalkForwardRequest
+from .backtest_service import BacktestService
+from .executor import JobExecutor
+from .sweep_service import SUMMARY_FIELDS, expand_parameter_grid, rank_key
+
+logger = logging.getLogger(__name__)
+
+_PROGRESS_FLUSH_SIZE = 32
+
+
+def _summary(result) -> dict[str, Any]:
+    return {name: getattr(result, name) for name in SUMMARY_FIELDS}
+
+
+def _run_in_sample(run_id: str, config: BacktestConfig) -> dict[str, Any]:
+    from ..backtest_engine.runner import run_backtest
+
+    return _summary(build_backtest_result(run_id, run_backtest(config)))
+
+
+def _run_out_of_sample(run_id: str, config: BacktestConfig) -> dict[str, Any]:
+    from ..backtest_engine.runner import run_backtest
+
+    result = build_backtest_result(run_id, run_backtest(config))
+    return {"summary": _summary(result), "t": result.equity_timestamps, "v": result.equity_values}
+
+
+def _with_dates(config: BacktestConfig, start: str, end: str) -> BacktestConfig:
+    return replace(config, start_date=start, end_date=end)
+
+
+def build_windows(
+    first_day: date,
+    last_day: date,
+    in_sample_days: int,
+    out_of_sample_days: int,
+    step_days: int | None = None,
+    anchored: bool = False,
+) -> list[dict[str, Any]]:
+    """Lay out consecutive in-sample/out-of-sample windows in calendar days.
+
+    Windows advance by ``step_days`` (default: the out-of-sample length, so
+    out-of-sample slices tile the range). Anchored windows keep the in-sample
+    start fixed and grow instead of rolling. Only complete windows are kept.
+    """
+    step = step_days or out_of_sample_days
+    windows = []
+    offset = 0
+    while True:
+        in_sample_start = first_day if anchored else first_day + timedelta(days=offset)
+        oos_start = first_day + timedelta(days=offset + in_sample_days)
+        oos_end = oos_start + timedelta(days=out_of_sample_days)
+        if oos_end > last_day + timedelta(days=1):
+            break
+        windows.append(
+            {
+                "index": len(windows),
+                "in_sample_start": in_sample_start.isoformat(),
+                "in_sample_end": oos_start.isoformat(),
+                "out_of_sample_start": oos_start.isoformat(),
+                "out_of_sample_end": oos_end.isoformat(),
+            }
+        )
+        offset += step
+    return windows
+
+
+def stitch_out_of_sample(
+    initial_cash: float,
+    segments: list[dict[str, Any]],
+) -> tuple[dict[str, Any], np.ndarray, np.ndarray]:
+    """Chain out-of-sample equity segments into one compounded curve.
+
+    Every segment was run from ``initial_cash``; it is rescaled so it starts
+    from the capital the previous segment ended with. Points at or before the
+    previous segment's last timestamp (shared boundary bars) are dropped.
+    """
+    capital = initial_cash
+    last_ts: int | None = None
+    timestamps, values = [], []
+    total_trades = won_trades = 0
+    for segment in segments:
+        seg_t, seg_v = segment["t"], segment["v"] * (capital / initial_cash)
+        if last_ts is not None:
+            keep = seg_t > last_ts
+            seg_t, seg_v = seg_t[keep], seg_v[keep]
+        if seg_t.shape[0]:
+            timestamps.append(seg_t)
+            values.append(seg_v)
+            last_ts = int(seg_t[-1])
+            capital = float(seg_v[-1])
+        trades = segment["summary"]["total_trades"] or 0
+        total_trades += trades
+        won_trades += round((segment["summary"]["win_rate_pct"] or 0.0) * trades / 100)
+
+    t = np.concatenate(timestamps) if timestamps else np.empty(0, dtype=np.int64)
+    v = np.concatenate(values) if values else np.empty(0, dtype=np.float64)
+    max_drawdown_pct = 0.0
+    if v.shape[0]:
+        peaks = np.maximum.accumulate(v)
+        max_drawdown_pct = float(np.max((peaks - v) / peaks) * 100)
+
+    net_profit = capital - initial_cash
+    summary = {
+        "initial_cash": initial_cash,
+        "final_value": capital,
+        "net_profit": net_profit,
+        "total_return_pct": net_profit / initial_cash * 100 if initial_cash else 0.0,
+        "max_drawdown_pct": max_drawdown_pct,
+        "total_trades": total_trades,
+        "win_rate_pct": won_trades / total_trades * 100 if total_trades else 0.0,
+    }
+    return summary, t, v
+
+
+class WalkForwardService:
+    def __init__(self, backtest_service: BacktestService, executor: JobExecutor) -> None:
+        self.backtest_service = backtest_service
+        self.executor = executor
+
+    @property
+    def repository(self):
+        return self.backtest_service.repository
+
+    def plan(
+        self,
+        request: WalkForwardRequest,
+    ) -> tuple[list[dict[str, Any]], list[tuple[dict[str, Any], BacktestConfig]]]:
+        combos = expand_parameter_grid(request.parameters)
+        base = request.base.model_dump()
+        candidates = []
+        for combo in combos:
+            config = self.backtest_service.build_config(BacktestRequest(**{**base, **combo}))
+            # Windows and candidates already fill every worker.
+            config.dual_execution = "sequential"
+            candidates.append((combo, config))
+
+        reference = candidates[0][1]
+        bars = load_bars(resolve_data_file(reference.data_file), timeframe=reference.timeframe).between(
+            parse_date(reference.start_date), parse_date(reference.end_date)
+        )
+        if not len(bars):
+            raise ValueError("No bars in the requested date range")
+        first_day = datetime.fromtimestamp(int(bars.timestamps[0]), tz=timezone.utc).date()
+        last_day = datetime.fromtimestamp(int(bars.timestamps[-1]), tz=timezone.utc).date()
+
+        windows = build_windows(
+            first_day,
+            last_day,
+            request.in_sample_days,
+            request.out_of_sample_days,
+            request.step_days,
+            request.anchored,
+        )
+        if not windows:
+            raise ValueError(
+                f"Range {first_day}..{last_day} is shorter than one in-sample plus out-of-sample window"
+            )
+        total_runs = len(windows) * (len(candidates) + 1)
+        if total_runs > MAX_SWEEP_RUNS:
+            raise ValueError(f"Walk-forward expands to {total_runs} runs; the limit is {MAX_SWEEP_RUNS}")
+        return windows, candidates
+
+    def create_walk_forward(
+        self,
+        request: WalkForwardRequest,
+    ) -> tuple[str, list[dict[str, Any]], list[tuple[dict[str, Any], BacktestConfig]]]:
+        windows, candidates = self.plan(request)
+        wf_id = str(uuid.uuid4())
+        total_runs = len(windows) * (len(candidates) + 1)
+        self.repository.create_walk_forward(wf_id, request.model_dump(), request.rank_by, total_runs)
+        return wf_id, windows, candidates
+
+    def run_walk_forward(
+        self,
+        wf_id: str,
+        windows: list[dict[str, Any]],
+        candidates: list[tuple[dict[str, Any], BacktestConfig]],
+        rank_by: str,
+    ) -> None:
+        from ..backtest_engine.runner import warm_data_caches
+
+        self.repository.update_walk_forward_status(wf_id, "running")
+        try:
+            # Every window is a date slice of the same file: build its bar and
+            # indicator caches once so workers just memory-map them.
+            warm_data_caches([config for _, config in candidates])
+
+            segments = self._fan_out(wf_id, windows, candidates, rank_by)
+            initial_cash = candidates[0][1].initial_cash
+            summary, timestamps, values = stitch_out_of_sample(
+                initial_cash, [segments[index] for index in sorted(segments)]
+            )
+            summary["windows"] = len(windows)
+            summary["windows_failed"] = sum(1 for window in windows if window.get("error"))
+            self.repository.save_walk_forward_result(
+                wf_id,
+                summary,
+                windows,
+                equity_levels=build_equity_levels_from_arrays(timestamps, values),
+            )
+        except Exception as exc:
+            logger.exception("Walk-forward %s failed", wf_id)
+            self.repository.update_walk_forward_status(wf_id, "failed", error=str(exc))
+
+    def _fan_out(
+        self,
+        wf_id: str,
+        windows: list[dict[str, Any]],
+        candidates: list[tuple[dict[str, Any], BacktestConfig]],
+        rank_by: str,
+    ) -> dict[int, dict[str, Any]]:
+        """Run every (window, candidate) in-sample job, then each window's winner out of sample.
+
+        In-sample runs of all windows share the pool; a window's out-of-sample
+        run is queued ahead of remaining in-sample work as soon as its last
+        candidate finishes.
+        """
+        max_in_flight = self.executor.task_slots
+        in_sample = iter([(w, c) for w in range(len(windows)) for c in range(len(candidates))])
+        ready: deque[int] = deque()
+        remaining = [len(candidates)] * len(windows)
+        failures = [0] * len(windows)
+        best: list[tuple[tuple[float, int], dict[str, Any]] | None] = [None] * len(windows)
+        in_flight: dict[Future, tuple[str, int, int]] = {}
+        segments: dict[int, dict[str, Any]] = {}
+        completed = 0
+        unflushed = 0
+
+        def _submit_next() -> bool:
+            if ready:
+                w = ready.popleft()
+                c = -best[w][0][1]
+                window = windows[w]
+                config = _with_dates(candidates[c][1], window["out_of_sample_start"], window["out_of_sample_end"])
+                future = self.executor.submit_task(_run_out_of_sample, f"{wf_id}:{w}:oos", config)
+                in_flight[future] = ("oos", w, c)
+                return True
+            item = next(in_sample, None)
+            if item is None:
+                return False
+            w, c = item
+            window = windows[w]
+            config = _with_dates(candidates[c][1], window["in_sample_start"], window["in_sample_end"])
+            future = self.executor.submit_task(_run_in_sample, f"{wf_id}:{w}:{c}", config)
+            in_flight[future] = ("is", w, c)
+            return True
+
+        while len(in_flight) < max_in_flight and _submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, w, c = in_flight.pop(future)
+                window = windows[w]
+                completed += 1
+                unflushed += 1
+                if kind == "is":
+                    try:
+                        summary = future.result()
+                    except Exception as exc:
+                        logger.warning("Walk-forward %s window %s candidate %s failed: %s", wf_id, w, c, exc)
+                        failures[w] += 1
+                    else:
+                        entry = ((rank_key(summary, rank_by), -c), summary)
+                        if best[w] is None or entry[0] > best[w][0]:
+                            best[w] = entry
+                    remaining[w] -= 1
+                    if remaining[w] == 0:
+                        if best[w] is None:
+                            window["error"] = f"All {failures[w]} in-sample runs failed"
+                            completed += 1
+                        else:
+                            window["params"] = candidates[-best[w][0][1]][0]
+                            window["in_sample"] = best[w][1]
+                            ready.append(w)
+                else:
+                    try:
+                        segment = future.result()
+                    except Exception as exc:
+                        window["error"] = f"Out-of-sample run failed: {exc}"
+                    else:
+                        window["out_of_sample"] = segment["summary"]
+                        segments[w] = segment
+                    unflushed = _PROGRESS_FLUSH_SIZE
+
+            while len(in_flight) < max_in_flight and _submit_next():
+                pass
+
+            if unflushed >= _PROGRESS_FLUSH_SIZE and in_flight:
+                self.repository.update_walk_forward_progress(wf_id, completed, windows)
+                unflushed = 0
+
+        return segments
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from ..core.settings import WARMUP_ON_STARTUP
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_state: dict[str, object] = {"error": None, "seconds": None}
+
+
+def warm_process() -> None:
+    """Import the engine and load the strategy module and default dataset.
+
+    Idempotent: everything it touches is cached per process, so calling it
+    again in an already warm process is cheap.
+    """
+    from ..backtest_engine import runner  # noqa: F401  (Backtrader and both engines)
+    from ..backtest_engine.bar_cache import load_bars
+    from ..backtest_engine.data_paths import resolve_data_file
+    from ..backtest_engine.original_strategy import get_strategy_default_params
+
+    get_strategy_default_params()
+    default_data_file = resolve_data_file(None)
+    if default_data_file.exists():
+        load_bars(default_data_file)
+
+
+def _run(executor) -> None:
+    started = time.perf_counter()
+    try:
+        # Build the bar cache here first so every worker maps the same file
+        # instead of each parsing the CSV.
+        warm_process()
+        executor.warm_up()
+    except Exception as exc:  # a broken strategy or dataset still fails each job clearly
+        logger.exception("Warm-up failed")
+        _state["error"] = str(exc)
+    finally:
+        _state["seconds"] = time.perf_counter() - started
+        _ready.set()
+        logger.info("Warm-up finished in %.2fs", _state["seconds"])
+
+
+def start_warmup(executor) -> None:
+    """Warm the API process and start the worker pool in the background."""
+    if not WARMUP_ON_STARTUP:
+        _ready.set()
+        return
+    threading.Thread(target=_run, args=(executor,), name="backtest-warmup", daemon=True).start()
+
+
+def warmup_status() -> dict:
+    return {"ready": _ready.is_set(), "error": _state["error"], "seconds": _state["seconds"]}
@@ -0,0 +1,16 @@
+"""Imported once by the forkserver before it forks job workers.
+
+Workers start with Backtrader, the strategy module and the default dataset
+already loaded, so a job reaches its first bar without any import or parse.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from .warmup import warm_process
+
+try:
+    warm_process()
+except Exception as exc:  # workers warm up again, and report the error, per job
+    logging.getLogger(__name__).warning("Worker preload failed: %s", exc)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 from importlib.util import module_from_spec, spec_from_file_location
 import inspect
@@ -7,6 +8,8 @@ from pathlib import Path
 import sys
 from types import ModuleType
 
+from .core.settings import STRATEGY_FILE
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +24,8 @@ def _strategy_directories() -> list[Path]:
 
 
 def _strategy_file_candidates() -> list[Path]:
+    if STRATEGY_FILE:
+        return [Path(STRATEGY_FILE)]
     # Keep compatible with historical Windows/Linux naming differences.
     names = [
         "sunrise_ogle_xauusd.py",
@@ -41,6 +46,7 @@ def _list_strategy_files() -> dict[str, list[str]]:
 
 
 _LOADED_MODULE: ModuleType | None = None
+_SOURCE_HASH: str | None = None
 
 
 def load_strategy_module() -> ModuleType:
@@ -108,3 +114,11 @@ def get_available_strategies() -> dict[str, type]:
         if inspect.isclass(obj) and getattr(obj, "__module__", "") == module.__name__:
             strategy_classes[name] = obj
     return strategy_classes
+
+
+def get_strategy_source_hash() -> str:
+    global _SOURCE_HASH
+    if _SOURCE_HASH is None:
+        module = load_strategy_module()
+        _SOURCE_HASH = hashlib.sha256(Path(module.__file__).read_bytes()).hexdigest()
+    return _SOURCE_HASH
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from .. import strategies
+from ..core.settings import ORIGINAL_PROJECT_ROOT
+from ..database.repository import BacktestRepository
+
+STANDIN_STRATEGY_FILE = Path(__file__).resolve().parents[1] / "benchmarks" / "standin_strategy.py"
+DATA_FILE = ORIGINAL_PROJECT_ROOT / "data" / "XAUUSD_5m_5Yea.csv"
+
+
+def _use_strategy_file(monkeypatch: pytest.MonkeyPatch, path: str) -> None:
+    monkeypatch.setattr(strategies, "STRATEGY_FILE", path)
+    monkeypatch.setattr(strategies, "_LOADED_MODULE", None)
+    monkeypatch.setattr(strategies, "_SOURCE_HASH", None)
+
+
+@pytest.fixture
+def standin_strategy(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Load the benchmark stand-in, which implements the vectorized rules, as ``SunriseOgle``."""
+    _use_strategy_file(monkeypatch, str(STANDIN_STRATEGY_FILE))
+
+
+@pytest.fixture
+def original_strategy(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Load the strategy from the strategy repo, ignoring ``BACKTEST_STRATEGY_FILE``."""
+    _use_strategy_file(monkeypatch, "")
+    try:
+        strategies.load_strategy_module()
+    except FileNotFoundError:
+        pytest.skip("strategy repo not checked out")
+
+
+@pytest.fixture
+def data_file() -> str:
+    if not DATA_FILE.exists():
+        pytest.skip(f"{DATA_FILE.name} not available")
+    return str(DATA_FILE)
+
+
+@pytest.fixture
+def repository(tmp_path: Path):
+    repository = BacktestRepository(tmp_path / "backtests.db")
+    yield repository
+    repository.close()
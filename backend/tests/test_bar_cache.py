@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+
+from ..backtest_engine.bar_cache import BarSet, read_bar_file, to_epoch, write_bar_file
+
+
+def _bars(count: int = 12, step: int = 300) -> BarSet:
+    start = to_epoch(datetime(2024, 1, 1))
+    prices = np.linspace(2000.0, 2011.0, count)
+    return BarSet(
+        timestamps=np.arange(start, start + count * step, step, dtype=np.int64),
+        open=prices,
+        high=prices + 1.0,
+        low=prices - 1.0,
+        close=prices + 0.5,
+        volume=np.full(count, 10.0),
+    )
+
+
+def test_bounds_keep_bars_on_both_edges():
+    bars = _bars()
+
+    assert bars.bounds(datetime(2024, 1, 1, 0, 10), datetime(2024, 1, 1, 0, 30)) == (2, 7)
+    assert len(bars.between(datetime(2024, 1, 1, 0, 10), datetime(2024, 1, 1, 0, 30))) == 5
+
+
+def test_bounds_between_bars_and_open_ends():
+    bars = _bars()
+
+    assert bars.bounds(datetime(2024, 1, 1, 0, 7), datetime(2024, 1, 1, 0, 13)) == (2, 3)
+    assert bars.bounds(None, None) == (0, len(bars))
+    assert bars.bounds(datetime(2024, 1, 1, 0, 20), None) == (4, len(bars))
+
+
+def test_bounds_outside_the_data_are_empty():
+    bars = _bars()
+
+    assert bars.bounds(datetime(2025, 1, 1), None) == (len(bars), len(bars))
+    start, stop = bars.bounds(datetime(2024, 1, 1, 0, 30), datetime(2024, 1, 1, 0, 5))
+    assert start == stop
+
+
+def test_bar_file_round_trip(tmp_path):
+    bars = _bars()
+    path = tmp_path / "bars.bars"
+
+    write_bar_file(path, bars)
+    loaded = read_bar_file(path)
+
+    for name in ("timestamps", "open", "high", "low", "close", "volume"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(bars, name))
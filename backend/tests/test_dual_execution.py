@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from dataclasses import replace
+
+import pytest
+
+from ..backtest_engine import runner
+from ..backtest_engine.stopping import JobStopped
+from ..models.backtest import BacktestConfig
+
+
+@pytest.fixture
+def dual_config(data_file: str) -> BacktestConfig:
+    defaults = runner.default_backtest_config_kwargs()
+    return BacktestConfig(
+        symbol="XAUUSD",
+        timeframe="1h",
+        start_date="2023-10-01",
+        end_date="2024-02-20",
+        data_file=data_file,
+        initial_cash=defaults["initial_cash"],
+        limit_bars=0,
+        run_dual_cerebro=True,
+        use_forex_position_calc=defaults["use_forex_position_calc"],
+        dual_execution="sequential",
+    )
+
+
+@pytest.fixture
+def two_cpus(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Parallel legs fall back to sequential on a single CPU.
+    monkeypatch.setattr(runner.os, "cpu_count", lambda: 2)
+
+
+def test_dual_execution_defaults_to_sequential():
+    assert runner.default_backtest_config_kwargs()["dual_execution"] == "sequential"
+
+
+def test_parallel_legs_match_sequential(standin_strategy, dual_config, two_cpus):
+    sequential = runner.run_backtest(dual_config)
+    parallel = runner.run_backtest(replace(dual_config, dual_execution="parallel"))
+
+    assert parallel.final_value == pytest.approx(sequential.final_value)
+    assert len(parallel.strategy_instance.trade_reports) == len(sequential.strategy_instance.trade_reports)
+
+
+def test_stopping_a_parallel_run_stops_the_child_leg(standin_strategy, dual_config, two_cpus):
+    config = replace(dual_config, timeframe="5m", start_date="2023-01-01", dual_execution="parallel")
+    deadline = time.monotonic() + 0.5
+
+    with pytest.raises(JobStopped) as stopped:
+        runner.run_backtest(config, should_stop=lambda: "cancelled" if time.monotonic() > deadline else None)
+
+    assert stopped.value.reason == "cancelled"
+    assert multiprocessing.active_children() == []
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from ..core import encoding
+
+PAYLOAD = {
+    "final_value": float("nan"),
+    "sharpe_ratio": float("inf"),
+    "equity": {"t": np.array([1, 2], dtype=np.int64), "v": np.array([1.5, np.nan, -np.inf])},
+    "drawdown": np.float64("nan"),
+    "trades": [{"pnl": np.float64(2.5), "size": np.int32(3)}, (float("-inf"), None)],
+    "created_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+}
+EXPECTED = (
+    b'{"final_value":null,"sharpe_ratio":null,"equity":{"t":[1,2],"v":[1.5,null,null]},"drawdown":null,'
+    b'"trades":[{"pnl":2.5,"size":3},[null,null]],"created_at":"2024-01-02T03:04:05Z"}'
+)
+
+
+def test_fallback_writes_non_finite_numbers_as_null(monkeypatch):
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert encoding.dumps(PAYLOAD) == EXPECTED
+
+
+def test_orjson_and_fallback_write_the_same_bytes(monkeypatch):
+    pytest.importorskip("orjson")
+    fast = encoding.dumps(PAYLOAD)
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert encoding.dumps(PAYLOAD) == fast == EXPECTED
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+
+from ..backtest_engine.equity_levels import (
+    EQUITY_LEVEL_POINTS,
+    build_equity_levels_from_arrays,
+    choose_level,
+    minmax_downsample,
+    slice_level,
+)
+
+
+def _curve(count: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(7)
+    timestamps = np.arange(count, dtype=np.int64) * 300_000 + 1_704_067_200_000
+    values = 100_000.0 + np.cumsum(rng.normal(0.0, 50.0, count))
+    return timestamps, values
+
+
+def test_minmax_downsample_keeps_extremes_and_endpoints():
+    timestamps, values = _curve(10_000)
+
+    sampled_t, sampled_v = minmax_downsample(timestamps, values, 500)
+
+    assert len(sampled_t) <= 500
+    assert np.all(np.diff(sampled_t) > 0)
+    assert sampled_t[0] == timestamps[0] and sampled_t[-1] == timestamps[-1]
+    assert sampled_v.min() == values.min() and sampled_v.max() == values.max()
+    # Every kept point is an original sample.
+    np.testing.assert_array_equal(values[np.searchsorted(timestamps, sampled_t)], sampled_v)
+
+
+def test_minmax_downsample_returns_short_curves_unchanged():
+    timestamps, values = _curve(100)
+
+    sampled_t, sampled_v = minmax_downsample(timestamps, values, 500)
+
+    assert sampled_t is timestamps and sampled_v is values
+
+
+def test_levels_end_with_the_full_curve():
+    timestamps, values = _curve(10_000)
+
+    levels = build_equity_levels_from_arrays(timestamps, values)
+
+    assert [level["points"] for level in levels] == [*(p for p in EQUITY_LEVEL_POINTS if p < 10_000), 10_000]
+    np.testing.assert_array_equal(levels[-1]["t"], timestamps)
+    assert all(level["start_ms"] == timestamps[0] and level["end_ms"] == timestamps[-1] for level in levels)
+
+
+def test_choose_level_scales_with_the_requested_range():
+    timestamps, values = _curve(10_000)
+    levels = build_equity_levels_from_arrays(timestamps, values)
+
+    assert choose_level(levels, 400, None, None) == 500
+    # A tenth of the range needs a level ten times as dense.
+    tenth = int(timestamps[0] + (timestamps[-1] - timestamps[0]) // 10)
+    assert choose_level(levels, 400, None, tenth) == 8000
+
+
+def test_slice_level_is_inclusive_and_downsamples():
+    timestamps, values = _curve(1_000)
+
+    sliced_t, _ = slice_level(timestamps, values, int(timestamps[10]), int(timestamps[19]), None)
+    assert sliced_t.tolist() == timestamps[10:20].tolist()
+
+    sampled_t, _ = slice_level(timestamps, values, None, None, 100)
+    assert len(sampled_t) <= 100
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+from ..backtest_engine import indicator_store
+from ..backtest_engine.bar_cache import BarSet, load_bars, to_epoch
+from ..backtest_engine.data_loader import ArrayBarFeed
+from ..backtest_engine.indicator_store import (
+    IndicatorSpec,
+    average_true_range,
+    compute_indicator,
+    exponential_moving_average,
+    load_indicator,
+)
+
+EMA_PERIOD = 20
+ATR_PERIOD = 14
+
+
+def _bars(count: int, seed: int = 7) -> BarSet:
+    # Longer than one smoothing block (512 bars), so the block carry is exercised.
+    rng = np.random.default_rng(seed)
+    close = 2000.0 + np.cumsum(rng.normal(0.0, 1.5, count))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    start = to_epoch(datetime(2024, 1, 1))
+    return BarSet(
+        timestamps=np.arange(start, start + count * 300, 300, dtype=np.int64),
+        open=open_,
+        high=np.maximum(open_, close) + rng.uniform(0.0, 2.0, count),
+        low=np.minimum(open_, close) - rng.uniform(0.0, 2.0, count),
+        close=close,
+        volume=np.full(count, 10.0),
+    )
+
+
+class _Recorder(bt.Strategy):
+    def __init__(self) -> None:
+        self.ema = bt.indicators.EMA(self.data.close, period=EMA_PERIOD)
+        self.atr = bt.indicators.ATR(self.data, period=ATR_PERIOD)
+        self.values: dict[str, dict[int, float]] = {"ema": {}, "atr": {}}
+
+    def prenext(self) -> None:
+        self.next()
+
+    def next(self) -> None:
+        index = len(self) - 1
+        for name, line in (("ema", self.ema), ("atr", self.atr)):
+            if len(line) and not np.isnan(line[0]):
+                self.values[name][index] = line[0]
+
+
+def _backtrader_values(bars: BarSet) -> dict[str, dict[int, float]]:
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(ArrayBarFeed(bars=bars))
+    cerebro.addstrategy(_Recorder)
+    return cerebro.run()[0].values
+
+
+def _assert_matches(ours: np.ndarray, theirs: dict[int, float], first: int) -> None:
+    assert min(theirs) == first
+    assert np.isnan(ours[:first]).all()
+    indexes = np.array(sorted(theirs))
+    np.testing.assert_allclose(ours[indexes], [theirs[i] for i in indexes], rtol=1e-9)
+
+
+def test_ema_and_atr_match_backtrader():
+    bars = _bars(1200)
+    expected = _backtrader_values(bars)
+
+    _assert_matches(exponential_moving_average(bars.close, EMA_PERIOD), expected["ema"], EMA_PERIOD - 1)
+    _assert_matches(average_true_range(bars.high, bars.low, bars.close, ATR_PERIOD), expected["atr"], ATR_PERIOD)
+
+
+def _write_csv(path: Path, bars: BarSet, mode: str = "w") -> None:
+    with path.open(mode, newline="") as handle:
+        if mode == "w":
+            handle.write("Date,Time,Open,High,Low,Close,Volume\n")
+        for row in zip(bars.timestamps.tolist(), bars.open, bars.high, bars.low, bars.close, bars.volume):
+            stamp = datetime.utcfromtimestamp(row[0])
+            prices = ",".join(repr(float(value)) for value in row[1:])
+            handle.write(f"{stamp:%Y%m%d},{stamp:%H:%M:%S},{prices}\n")
+
+
+def test_appended_rows_extend_the_previous_series(tmp_path, monkeypatch):
+    bars = _bars(1500)
+    source = tmp_path / "XAUUSD_5m.csv"
+    bar_root, indicator_root = tmp_path / "bars", tmp_path / "indicators"
+    specs = [IndicatorSpec("ema", EMA_PERIOD), IndicatorSpec("atr", ATR_PERIOD)]
+
+    _write_csv(source, bars.slice(0, 900))
+    load_bars(source, bar_root)
+    for spec in specs:
+        load_indicator(source, spec, cache_root=indicator_root, bar_cache_root=bar_root)
+
+    _write_csv(source, bars.slice(900, len(bars)), mode="a")
+    appended = load_bars(source, bar_root)
+    assert len(appended) == len(bars)
+
+    def no_full_recompute(*args, **kwargs):
+        raise AssertionError("the series should have been carried over")
+
+    monkeypatch.setattr(indicator_store, "compute_indicator", no_full_recompute)
+    for spec in specs:
+        extended = load_indicator(source, spec, cache_root=indicator_root, bar_cache_root=bar_root)
+        np.testing.assert_allclose(extended, compute_indicator(appended, spec), rtol=1e-9, equal_nan=True)
+    assert len(list(indicator_root.iterdir())) == 1
+
+
+def test_extend_recomputes_series_still_in_their_warm_up():
+    bars = _bars(40)
+    spec = IndicatorSpec("ema", EMA_PERIOD)
+    previous = compute_indicator(bars.slice(0, 10), spec)
+
+    extended = indicator_store.extend_indicator(bars, spec, previous, stable=10)
+
+    np.testing.assert_allclose(extended, compute_indicator(bars, spec), equal_nan=True)
+
+
+@pytest.mark.parametrize("alpha", [2.0 / 21.0, 1.0 / 14.0, 0.999])
+def test_smooth_matches_the_plain_recurrence(alpha):
+    values = np.random.default_rng(3).normal(size=1300)
+    expected = np.empty_like(values)
+    previous = 5.0
+    for index, value in enumerate(values):
+        previous = (1.0 - alpha) * previous + alpha * value
+        expected[index] = previous
+
+    np.testing.assert_allclose(indicator_store._smooth(values, alpha, 5.0), expected, rtol=1e-9)
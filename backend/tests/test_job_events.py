@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import asyncio
+
+from ..services.job_events import JobEventHub
+
+
+def test_subscribers_share_one_poller(repository, monkeypatch):
+    repository.create_job("job-1", {"symbol": "XAUUSD"})
+    reads = []
+    read = repository.get_live_statuses
+    monkeypatch.setattr(repository, "get_live_statuses", lambda job_ids: reads.append(job_ids) or read(job_ids))
+
+    async def scenario():
+        hub = JobEventHub(repository, interval=0.05)
+        first, second = hub.subscribe("job-1"), hub.subscribe("job-1")
+        snapshots = [await asyncio.wait_for(queue.get(), 1.0) for queue in (first, second)]
+        assert [live["status"] for live in snapshots] == ["queued", "queued"]
+
+        repository.update_status("job-1", "failed", error="boom")
+        changed = [await asyncio.wait_for(queue.get(), 1.0) for queue in (first, second)]
+        assert [live["status"] for live in changed] == ["failed", "failed"]
+
+        hub.unsubscribe("job-1", first)
+        hub.unsubscribe("job-1", second)
+        await asyncio.sleep(0.1)
+        assert hub._poller.done()
+
+    asyncio.run(scenario())
+    # Each poll reads the job once for both subscribers.
+    assert reads and all(job_ids == ["job-1"] for job_ids in reads)
+
+
+def test_unknown_job_is_published_as_none(repository):
+    async def scenario():
+        hub = JobEventHub(repository, interval=0.05)
+        queue = hub.subscribe("missing")
+        assert await asyncio.wait_for(queue.get(), 1.0) is None
+        hub.unsubscribe("missing", queue)
+
+    asyncio.run(scenario())
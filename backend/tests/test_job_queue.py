@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from ..backtest_engine import runner
+from ..backtest_engine.stopping import JobStopped
+from ..schemas.backtest import BacktestRequest
+from ..services.backtest_service import BacktestService
+from ..services.executor import JobExecutor
+
+RESULT = {"final_value": 101.0, "trade_list": [], "equity_curve": {"t": [], "v": []}}
+
+
+def _claim(repository, job_id: str = "job-1", lease_seconds: float = 30.0) -> dict:
+    repository.create_job(job_id, {"symbol": "XAUUSD"}, enqueue=True)
+    claim = repository.claim_next_job("worker-a", lease_seconds)
+    assert claim["id"] == job_id
+    return claim
+
+
+def test_claim_hands_each_job_to_one_worker(repository):
+    claim = _claim(repository)
+
+    assert claim["attempts"] == 1
+    assert repository.claim_next_job("worker-b", 30.0) is None
+    assert repository.get_status("job-1")["status"] == "running"
+    assert repository.get_claim("job-1")["lease_id"] == claim["lease_id"]
+    assert repository.queue_counts() == {"waiting": 0, "batch_waiting": 0, "claimed": 1}
+
+
+def test_heartbeat_only_renews_held_leases(repository):
+    claim = _claim(repository)
+
+    assert repository.heartbeat([claim["lease_id"], "unknown"], 30.0) == 1
+    repository.finish_job(claim["lease_id"])
+    assert repository.heartbeat([claim["lease_id"]], 30.0) == 0
+
+
+def test_expired_lease_is_requeued_then_failed_after_max_attempts(repository):
+    first = _claim(repository)
+    repository.expire_lease(first["lease_id"])
+
+    assert repository.recover_jobs(max_attempts=2) == 1
+    assert repository.get_status("job-1")["status"] == "queued"
+    second = repository.claim_next_job("worker-b", 30.0)
+    assert second["attempts"] == 2 and second["lease_id"] != first["lease_id"]
+
+    repository.expire_lease(second["lease_id"])
+    assert repository.recover_jobs(max_attempts=2) == 0
+    assert repository.get_status("job-1")["status"] == "failed"
+
+
+def test_worker_that_lost_its_lease_cannot_overwrite_the_job(repository):
+    first = _claim(repository)
+    repository.expire_lease(first["lease_id"])
+    repository.recover_jobs(max_attempts=3)
+    second = repository.claim_next_job("worker-b", 30.0)
+
+    assert not repository.save_result("job-1", RESULT, lease_id=first["lease_id"])
+    assert not repository.update_status("job-1", "failed", error="stale", lease_id=first["lease_id"])
+    assert repository.get_status("job-1")["status"] == "running"
+
+    assert repository.save_result("job-1", RESULT, lease_id=second["lease_id"])
+    assert repository.get_status("job-1")["status"] == "completed"
+    assert repository.get_claim("job-1")["lease_id"] is None
+
+
+def test_cancel_before_completion_is_not_overwritten(repository):
+    claim = _claim(repository)
+    assert repository.cancel_job("job-1")
+
+    assert not repository.save_result("job-1", RESULT, lease_id=claim["lease_id"])
+    assert not repository.update_status("job-1", "failed", lease_id=claim["lease_id"])
+    assert repository.get_status("job-1")["status"] == "cancelled"
+    assert repository.get_trades("job-1") is None
+
+
+def test_claim_with_an_invalid_stored_request_fails_the_job(repository):
+    repository.create_job("job-1", {"timeframe": "2m"}, enqueue=True)
+    claim = repository.claim_next_job("worker-a", 30.0)
+
+    BacktestService(repository).execute_claim(claim)
+
+    status = repository.get_status("job-1")
+    assert status["status"] == "failed" and status["error"].startswith("Invalid request")
+    assert repository.queue_counts()["claimed"] == 0
+    assert repository.recover_jobs(max_attempts=3) == 0
+
+
+def test_run_that_lost_its_lease_keeps_the_new_owners_timings(repository, monkeypatch):
+    first = _claim(repository)
+    repository.expire_lease(first["lease_id"])
+    repository.recover_jobs(max_attempts=3)
+    repository.claim_next_job("worker-b", 30.0)
+    repository.save_timings("job-1", {"phases": {}, "total_seconds": 7.0})
+
+    def lose_lease(*args, **kwargs):
+        raise JobStopped("lease_lost")
+
+    monkeypatch.setattr(runner, "run_backtest", lose_lease)
+    service = BacktestService(repository)
+    monkeypatch.setattr(service, "build_config", lambda payload: None)
+    service.execute_job("job-1", BacktestRequest(use_cache=False, profile=True), lease_id=first["lease_id"])
+
+    assert repository.get_job("job-1")["timings"]["total_seconds"] == 7.0
+    assert repository.get_profile("job-1") is None
+
+
+def test_batches_are_held_to_their_own_queue_cap(repository):
+    executor = JobExecutor(repository, max_workers=1, max_queue_depth=1, max_batch_queue_depth=3, embedded=False)
+    try:
+        jobs = [(f"job-{index}", {"symbol": "XAUUSD"}) for index in range(2)]
+        repository.create_batch("batch-1", jobs, queue_order=[job_id for job_id, _ in jobs])
+
+        assert executor.has_capacity()
+        assert executor.has_batch_capacity(1)
+        assert not executor.has_batch_capacity(2)
+    finally:
+        executor.shutdown()
+
+
+def test_startup_fails_sweeps_and_walk_forwards_left_unfinished(repository):
+    repository.create_sweep("sweep-1", {}, "net_profit", 4)
+    repository.update_sweep_status("sweep-1", "running")
+    repository.create_sweep("sweep-2", {}, "net_profit", 4)
+    repository.update_sweep_status("sweep-2", "completed")
+    repository.create_walk_forward("wf-1", {}, "net_profit", 6)
+
+    assert repository.fail_interrupted_runs() == 2
+    assert repository.get_sweep("sweep-1")["status"] == "failed"
+    assert repository.get_sweep("sweep-2")["status"] == "completed"
+    walk_forward = repository.get_walk_forward("wf-1")
+    assert walk_forward["status"] == "failed" and walk_forward["error"] == "Interrupted by a restart"
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from ..core.settings import PROJECT_ROOT
+
+
+def test_importing_the_api_does_not_load_backtrader():
+    code = "import sys, backend.main; sys.exit('backtrader' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr or "backend.main imported backtrader"
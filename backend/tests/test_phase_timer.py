@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import time
+
+from ..services.profiling import PhaseTimer
+
+
+def test_nested_phase_is_not_counted_in_the_outer_one():
+    timer = PhaseTimer()
+    with timer.phase("run"):
+        time.sleep(0.02)
+        with timer.phase("feed_load"):
+            time.sleep(0.05)
+
+    assert timer.phases["feed_load"] >= 0.05
+    assert 0.02 <= timer.phases["run"] < 0.05
+    summary = timer.summary(1_000)
+    assert summary["total_seconds"] == sum(timer.phases.values())
+    assert summary["bars_per_second"] == 1_000 / timer.phases["run"]
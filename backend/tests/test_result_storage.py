@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from ..backtest_engine.equity_levels import build_equity_levels_from_arrays
+from ..backtest_engine.result_serializer import trade_columns, trade_rows
+from ..database.repository import BacktestRepository
+
+TRADES = [
+    {
+        "entry_time": "2024-01-02T10:05:00",
+        "exit_time": "2024-01-02T13:40:00",
+        "direction": "long",
+        "entry_price": 2061.5,
+        "exit_price": 2070.25,
+        "size": 1.5,
+        "pnl": 13.125,
+        "exit_reason": "take_profit",
+    },
+    {
+        "entry_time": "2024-01-03T08:00:00",
+        "exit_time": None,
+        "direction": "short",
+        "entry_price": 2049.0,
+        "exit_price": None,
+        "size": 2.0,
+        "pnl": None,
+        "exit_reason": None,
+    },
+]
+
+
+def _save(repository, job_id: str) -> tuple[np.ndarray, np.ndarray]:
+    timestamps = np.arange(3_000, dtype=np.int64) * 300_000 + 1_704_067_200_000
+    values = 100_000.0 + np.sin(np.arange(3_000) / 50.0) * 1_000.0
+    repository.create_job(job_id, {"symbol": "XAUUSD"})
+    result = {
+        "final_value": 101_000.0,
+        "trade_list": trade_columns(TRADES),
+        "equity_curve": {"t": timestamps, "v": values},
+    }
+    assert repository.save_result(job_id, result, equity_levels=build_equity_levels_from_arrays(timestamps, values))
+    return timestamps, values
+
+
+def test_save_result_round_trip(repository):
+    timestamps, values = _save(repository, "job-1")
+
+    job = repository.get_job("job-1")
+    assert job["status"] == "completed"
+    assert job["result"] == {"final_value": 101_000.0}
+    stored = repository.get_trades("job-1")
+    assert stored["entry_time"] == [1_704_189_900_000, 1_704_268_800_000]
+    assert trade_rows(stored) == TRADES
+    assert [level["points"] for level in repository.list_equity_levels("job-1")] == [500, 2000, 3000]
+    full = repository.get_full_equity_level("job-1")
+    np.testing.assert_array_equal(full["t"], timestamps)
+    np.testing.assert_allclose(full["v"], values)
+    assert len(repository.get_equity_level("job-1", 500)["t"]) <= 500
+
+
+def test_prune_payloads_keeps_summaries_of_old_jobs(repository):
+    for job_id in ("old", "new"):
+        _save(repository, job_id)
+
+    pruned = repository.prune_payloads(finished_before=None, keep_latest=1)
+
+    assert pruned["jobs"] == 1
+    assert repository.get_job("old")["result"] == {"final_value": 101_000.0, "payloads_pruned": True}
+    assert repository.get_trades("old") is None
+    assert repository.list_equity_levels("old") == []
+    assert trade_rows(repository.get_trades("new")) == TRADES
+    assert "payloads_pruned" not in repository.get_job("new")["result"]
+
+
+def test_prune_payloads_by_age(repository):
+    _save(repository, "job-1")
+
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    assert repository.prune_payloads(finished_before=past, keep_latest=0)["jobs"] == 0
+    future = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    assert repository.prune_payloads(finished_before=future, keep_latest=0)["jobs"] == 1
+    assert repository.get_full_equity_level("job-1") is None
+    assert repository.compact() >= 0
+
+
+def test_prune_payloads_drops_old_walk_forward_curves(repository):
+    timestamps = np.arange(100, dtype=np.int64) * 300_000 + 1_704_067_200_000
+    repository.create_walk_forward("wf-1", {}, "net_profit", 6)
+    repository.save_walk_forward_result(
+        "wf-1", {"final_value": 1.0}, [], equity_levels=build_equity_levels_from_arrays(timestamps, np.ones(100))
+    )
+
+    future = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    assert repository.prune_payloads(finished_before=future, keep_latest=0)["walk_forward_levels"] == 1
+    assert repository.get_full_equity_level("wf-1") is None
+    assert repository.get_walk_forward("wf-1")["status"] == "completed"
+
+
+def test_compact_converts_an_older_database_to_incremental_vacuum(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+    conn.close()
+
+    repository = BacktestRepository(path)
+    try:
+        with repository._connect() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        repository.compact()
+        with repository._connect() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        repository.close()
+
+
+def test_legacy_trade_lists_convert_both_ways(repository):
+    repository.create_job("legacy", {"symbol": "XAUUSD"})
+    repository.save_result("legacy", {"final_value": 1.0, "trade_list": TRADES})
+
+    stored = repository.get_trades("legacy")
+    assert trade_rows(stored) == TRADES
+    assert trade_columns(stored) == trade_columns(TRADES)
+    assert trade_columns(trade_columns(TRADES)) == trade_columns(TRADES)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from ..backtest_engine.parity import compare_engines
+from ..backtest_engine.runner import available_engines, default_backtest_config_kwargs, run_backtest
+from ..models.backtest import BacktestConfig
+from ..schemas.backtest import BacktestRequest
+from ..services.backtest_service import BacktestService
+
+
+def _config(data_file: str, engine: str) -> BacktestConfig:
+    defaults = default_backtest_config_kwargs()
+    return BacktestConfig(
+        symbol="XAUUSD",
+        timeframe="1h",
+        start_date="2024-01-01",
+        end_date="2024-02-20",
+        data_file=data_file,
+        initial_cash=defaults["initial_cash"],
+        limit_bars=0,
+        run_dual_cerebro=False,
+        use_forex_position_calc=defaults["use_forex_position_calc"],
+        engine=engine,
+    )
+
+
+def test_vectorized_matches_backtrader_for_the_configured_strategy(standin_strategy, data_file):
+    expected = run_backtest(_config(data_file, "backtrader"))
+    actual = run_backtest(_config(data_file, "vectorized"))
+
+    assert expected.strategy_instance.trade_reports, "slice should produce trades"
+    assert compare_engines(expected, actual) == []
+
+
+def test_vectorized_dual_matches_backtrader(standin_strategy, data_file):
+    config = replace(_config(data_file, "backtrader"), run_dual_cerebro=True, dual_execution="sequential")
+    expected = run_backtest(config)
+    actual = run_backtest(replace(config, engine="vectorized"))
+
+    assert actual.final_value == pytest.approx(expected.final_value)
+    assert len(actual.strategy_instance.trade_reports) == len(expected.strategy_instance.trade_reports)
+
+
+def test_vectorized_rejects_strategies_without_vectorized_rules(original_strategy, data_file):
+    assert available_engines() == ["backtrader"]
+    with pytest.raises(ValueError, match="vectorized"):
+        run_backtest(_config(data_file, "vectorized"))
+    with pytest.raises(ValueError, match="vectorized"):
+        BacktestService(repository=None).check_engine(BacktestRequest(engine="vectorized"))
@@ -0,0 +1,66 @@
+"""Run backtest jobs from the shared database queue, outside the API process.
+
+Usage::
+
+    python -m backend.worker --processes 4
+
+Each process claims one job at a time, renews its lease while it runs, and
+requeues jobs whose worker stopped responding. Workers on several hosts can
+share one database (``BACKTEST_DATABASE_PATH``) as long as they see the same
+data files; start the API with ``BACKTEST_EMBEDDED_WORKERS=0`` to leave all
+jobs to them. SIGINT/SIGTERM let the current job finish before exiting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import threading
+
+from .services.executor import worker_context
+from .services.queue_worker import run_worker
+from .services.warmup import warm_process
+
+logger = logging.getLogger(__name__)
+
+
+def _serve() -> None:
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    try:
+        warm_process()
+    except Exception as exc:  # jobs report the underlying error themselves
+        logger.warning("Worker warm-up failed: %s", exc)
+    run_worker(stop)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=1, help="worker processes to run (one job each)")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    if args.processes <= 1:
+        _serve()
+        return 0
+
+    # Same start method as the API's pool: the engine is imported once in the
+    # forkserver and every worker forks from it.
+    context = worker_context()
+    processes = [context.Process(target=_serve, name=f"worker-{index}") for index in range(args.processes)]
+    for process in processes:
+        process.start()
+    # Pass stop signals on (terminate() sends SIGTERM, which each child
+    # handles by finishing its current job) and wait for the children.
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: [process.terminate() for process in processes])
+    for process in processes:
+        process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
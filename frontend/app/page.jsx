@@ -26,7 +26,7 @@ export default function DashboardPage() {
             localStorage.setItem("latestBacktestResult", JSON.stringify(job.result));
             return;
           }
-          if (job.status === "failed") {
+          if (job.error) {
             setError(job.error || "Latest backtest failed.");
           }
         }
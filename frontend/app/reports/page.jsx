@@ -28,7 +28,7 @@ export default function ReportsPage() {
 
         if (job.status === "completed") {
           setResult(job.result);
-        } else if (job.status === "failed") {
+        } else if (job.error) {
           setError(job.error || "Backtest failed.");
         } else {
           setError("Backtest is not finished yet.");
@@ -6,7 +6,7 @@ import AppShell from "../../components/dashboard/dashboard/common/AppShell";
 import EquityChart from "../../components/dashboard/dashboard/pages/EquityChart";
 import MetricCards from "../../components/dashboard/dashboard/pages/MetricCards";
 import TradesTable from "../../components/dashboard/dashboard/pages/TradesTable";
-import { getBacktestParameters, pollBacktest, runBacktest } from "../../lib/api";
+import { getBacktestParameters, runBacktest, watchBacktest } from "../../lib/api";
 
 function parseInput(raw, defaultValue) {
   if (typeof defaultValue === "boolean") return Boolean(raw);
@@ -31,6 +31,7 @@ export default function RunBacktestPage() {
   const [jobId, setJobId] = useState("");
   const [status, setStatus] = useState("idle");
   const [result, setResult] = useState(null);
+  const [progress, setProgress] = useState(null);
   const [loading, setLoading] = useState(false);
   const [bootLoading, setBootLoading] = useState(true);
   const [error, setError] = useState("");
@@ -60,6 +61,7 @@ export default function RunBacktestPage() {
     setError("");
     setLoading(true);
     setResult(null);
+    setProgress(null);
     setStatus("queued");
 
     try {
@@ -74,10 +76,14 @@ export default function RunBacktestPage() {
       setJobId(id);
       localStorage.setItem("latestBacktestJobId", id);
 
-      const completed = await pollBacktest(id, { intervalMs: 2000 });
+      const completed = await watchBacktest(id, {
+        intervalMs: 2000,
+        onStatus: setStatus,
+        onProgress: setProgress,
+      });
       setStatus(completed.status);
 
-      if (completed.status === "failed") {
+      if (completed.status !== "completed") {
         throw new Error(completed.error || "Backtest failed.");
       }
 
@@ -201,6 +207,14 @@ export default function RunBacktestPage() {
 
         {jobId ? <p className="notice">Job ID: {jobId}</p> : null}
         {status !== "idle" ? <p className="notice">Status: {status}</p> : null}
+        {progress && status === "running" ? (
+          <p className="notice">
+            {progress.percent ?? 0}% ({progress.bars_processed}/{progress.total_bars} bars)
+            {progress.current_date ? ` · ${progress.current_date.slice(0, 10)}` : ""}
+            {` · ${progress.trades} trades`}
+            {progress.eta_seconds != null ? ` · ETA ${Math.ceil(progress.eta_seconds)}s` : ""}
+          </p>
+        ) : null}
         {error ? <p className="error">{error}</p> : null}
       </section>
 
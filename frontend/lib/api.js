@@ -63,8 +63,12 @@ export function runBacktest(payload) {
   });
 }
 
-export function getBacktest(id) {
-  return request(`/api/backtest/${id}`);
+export function getBacktest(id, { view = "full" } = {}) {
+  return request(`/api/backtest/${id}?view=${view}`);
+}
+
+export function cancelBacktest(id) {
+  return request(`/api/backtest/${id}`, { method: "DELETE" });
 }
 
 export function getBacktestEquityCurve(id) {
@@ -75,8 +79,12 @@ export async function pollBacktest(id, { intervalMs = 2000, timeoutMs = 60 * 60
   const started = Date.now();
 
   while (true) {
-    const job = await getBacktest(id);
-    if (job.status === "completed" || job.status === "failed") {
+    // Summary polls skip the trade list and equity curve; fetch them once at the end.
+    const job = await getBacktest(id, { view: "summary" });
+    if (job.status === "completed") {
+      return getBacktest(id);
+    }
+    if (job.status === "failed" || job.status === "cancelled" || job.status === "timed_out") {
       return job;
     }
 
@@ -87,3 +95,35 @@ export async function pollBacktest(id, { intervalMs = 2000, timeoutMs = 60 * 60
     await new Promise((resolve) => setTimeout(resolve, intervalMs));
   }
 }
+
+export function watchBacktest(id, { onProgress, onStatus, ...pollOptions } = {}) {
+  if (typeof EventSource === "undefined" || !API_BASE_URL) {
+    return pollBacktest(id, pollOptions);
+  }
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/backtest/${id}/events`);
+    let received = false;
+
+    source.addEventListener("status", (event) => {
+      received = true;
+      if (onStatus) onStatus(JSON.parse(event.data).status);
+    });
+    source.addEventListener("progress", (event) => {
+      received = true;
+      if (onProgress) onProgress(JSON.parse(event.data));
+    });
+    source.addEventListener("done", (event) => {
+      source.close();
+      const { status } = JSON.parse(event.data);
+      (status === "completed" ? getBacktest(id) : getBacktest(id, { view: "summary" })).then(resolve, reject);
+    });
+    source.onerror = () => {
+      // EventSource reconnects on its own once streaming; only fall back to
+      // polling when the stream could not be opened at all.
+      if (received && source.readyState !== EventSource.CLOSED) return;
+      source.close();
+      pollBacktest(id, pollOptions).then(resolve, reject);
+    };
+  });
+}